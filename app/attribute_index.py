@@ -0,0 +1,221 @@
+"""
+KION RAG - Equipment Attribute Index
+
+하드 제약 조건(웨이퍼 사이즈, 재료, 카테고리, 기관, 온도 범위)을 만족하는 장비 집합 계산
+- 웨이퍼 사이즈 / 재료(소문자) / 카테고리 / 기관(정규화 키): 값별 행 비트맵 (bool 배열)
+- 기관은 부분 문자열 일치 (records.institution_matches) -> 요청 기관명을 포함하는 기관 키의 비트맵 합집합
+- 재료 정보가 없는 장비는 빈 값 비트맵 (재료 조건 통과, filters.check_materials와 동일)
+- 온도: 행별 장비 최저 / 최고 온도 배열 (정보가 없는 쪽은 records.temperature_bounds 기본값)
+
+조건 의미는 filter_planner.matches와 동일. 모든 필터 경로가 이 인덱스 하나를 사용
+- 필터 계획 (filter_planner): 레코드 저장소 순서
+- BM25 후보 (hybrid_search.IndexSnapshot): 문서 번호
+- NumPy 벡터 저장소 (rag.NumpyVectorStore): 저장소 행 번호
+행은 뒤에 추가만 하고 (갱신 / 삭제는 remove로 비우거나 각 사용처가 활성 행으로 처리),
+검색 시작 시점의 행 수(size)까지만 사용
+
+렉시컬 스냅샷 파일에는 비트맵 키(헤더) + (키 수, 행 수) 비트맵 행렬 / 온도 배열(배열 섹션)로 저장하고
+로드 시 메모리 매핑 그대로 사용 (메타데이터 JSON 디코딩 없음, 처음 변경할 때 복사)
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .records import EquipmentRecord, institution_matches, temperature_bounds
+
+
+class AttributeIndex:
+    """장비 속성 인덱스 (행 번호 = 추가 순서, 빈 행(None)은 어떤 조건도 만족하지 않음)"""
+
+    def __init__(self, records: Iterable[Optional[EquipmentRecord]] = ()):
+        self.ids: List[Optional[str]] = []
+        self.size = 0
+        self.num_live = 0  # 빈 행이 아닌 행 수
+        self._bitmaps: Dict[Tuple[str, str], np.ndarray] = {}
+        self._temp_min = np.zeros(0, dtype=np.float64)
+        self._temp_max = np.zeros(0, dtype=np.float64)
+        self._capacity = 0
+        self._shared = False  # 배열이 읽기 전용 메모리 매핑인지 (변경 전 복사)
+
+        records = list(records)
+        self._ensure_capacity(len(records))
+        for row, record in enumerate(records):
+            self.add(row, record)
+
+    @classmethod
+    def from_metadatas(
+        cls, ids: List[Optional[str]], metadatas: List[Optional[Dict[str, Any]]]
+    ) -> "AttributeIndex":
+        """행 순서의 ID / 메타데이터로 생성 (ID가 None인 행은 빈 행)"""
+        return cls(
+            EquipmentRecord(eq_id, metadata or {}) if eq_id is not None else None
+            for eq_id, metadata in zip(ids, metadatas)
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, ids: Any, num_live: int, keys: List[List[str]], arrays: Dict[str, np.ndarray]
+    ) -> "AttributeIndex":
+        """
+        export_arrays로 저장한 배열로 생성 (배열은 복사하지 않음 - 메모리 매핑 가능)
+
+        Args:
+            ids: 행별 장비 ID (빈 행은 None, list 또는 index_store.StringColumn)
+            num_live: 빈 행이 아닌 행 수
+            keys: 비트맵 키 목록 ([필드, 값], 비트맵 행렬의 행 순서)
+        """
+        index = cls()
+        index.ids = ids
+        index.size = len(ids)
+        index.num_live = num_live
+        bitmaps = arrays["attr_bitmaps"]
+        index._bitmaps = {(field, value): bitmaps[i] for i, (field, value) in enumerate(keys)}
+        index._temp_min = arrays["attr_temp_min"]
+        index._temp_max = arrays["attr_temp_max"]
+        index._capacity = index.size
+        index._shared = True
+        return index
+
+    def export_arrays(self) -> Tuple[List[List[str]], Dict[str, np.ndarray]]:
+        """스냅샷 저장용 (비트맵 키 목록, 배열 섹션)"""
+        keys = list(self._bitmaps)
+        bitmaps = np.zeros((len(keys), self.size), dtype=bool)
+        for i, key in enumerate(keys):
+            bitmaps[i] = self._bitmaps[key][:self.size]
+        arrays = {
+            "attr_bitmaps": bitmaps,
+            "attr_temp_min": np.array(self._temp_min[:self.size]),
+            "attr_temp_max": np.array(self._temp_max[:self.size]),
+        }
+        return [list(key) for key in keys], arrays
+
+    def add(self, row: int, record: Optional[EquipmentRecord]) -> None:
+        """행 추가 (행 번호는 순서대로 증가)"""
+        self._ensure_capacity(row + 1)
+        while len(self.ids) <= row:
+            self.ids.append(None)
+        self.size = max(self.size, row + 1)
+        if record is None:
+            # 빈 행: 온도 조건도 통과하지 않도록 범위를 비워 둠
+            self._temp_min[row], self._temp_max[row] = np.inf, -np.inf
+            return
+
+        self.ids[row] = record.equipment_id
+        self.num_live += 1
+        keys = [("category", record.category), ("institution", record.institution_key)]
+        keys += [("wafer_sizes", size) for size in record.wafer_size_set]
+        keys += [("materials", material) for material in record.material_set] or [("materials", "")]
+        for field, value in keys:
+            if value or field == "materials":
+                self._bitmap(field, value)[row] = True
+        self._temp_min[row], self._temp_max[row] = temperature_bounds(record.temp_min, record.temp_max)
+
+    def remove(self, row: int) -> None:
+        """행 비우기 (삭제 / 갱신 전 장비, 행 번호는 다시 사용하지 않음)"""
+        if row >= self.size or self.ids[row] is None:
+            return
+        self._unshare()
+        for bitmap in self._bitmaps.values():
+            bitmap[row] = False
+        self._temp_min[row], self._temp_max[row] = np.inf, -np.inf
+        self.ids[row] = None
+        self.num_live -= 1
+
+    def copy(self) -> "AttributeIndex":
+        """증분 갱신용 복사본"""
+        clone = copy.copy(self)
+        clone.ids = self.ids.copy()
+        clone._bitmaps = {key: bitmap.copy() for key, bitmap in self._bitmaps.items()}
+        clone._temp_min = self._temp_min.copy()
+        clone._temp_max = self._temp_max.copy()
+        clone._shared = False
+        return clone
+
+    def mask(self, filters: Dict[str, Any], size: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        조건을 모두 만족하는 행 마스크 (정규화된 필터, filter_planner.normalize_filters)
+
+        Args:
+            size: 앞에서부터 사용할 행 수 (기본값: 전체) - 검색 중 뒤에 행이 추가되어도
+                  검색 시작 시점의 행 수로 계산할 때 사용
+
+        Returns:
+            행별 bool 배열, 조건이 없으면 None
+        """
+        size = self.size if size is None else size
+        result = None
+        for key, value in filters.items():
+            if key == "temp_min":
+                # 장비 최고 온도 >= 요청 최소 온도
+                cond = self._temp_max[:size] >= value
+            elif key == "temp_max":
+                # 장비 최저 온도 <= 요청 최대 온도
+                cond = self._temp_min[:size] <= value
+            else:
+                if key == "materials":
+                    values = [v.lower() for v in value] + [""]
+                elif key == "institution":
+                    values = [
+                        inst for field, inst in list(self._bitmaps)
+                        if field == "institution" and any(institution_matches(v, inst) for v in value)
+                    ]
+                else:
+                    values = value
+                cond = np.zeros(size, dtype=bool)
+                for v in values:
+                    bitmap = self._bitmaps.get((key, str(v)))
+                    if bitmap is not None:
+                        cond |= bitmap[:size]
+            result = cond if result is None else result & cond
+        return result
+
+    def count(self, filters: Dict[str, Any]) -> int:
+        """조건을 만족하는 장비 수"""
+        mask = self.mask(filters)
+        if mask is None:
+            return self.num_live
+        return int(np.count_nonzero(mask))
+
+    def rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        """조건을 만족하는 행 번호 (오름차순)"""
+        mask = self.mask(filters)
+        if mask is None:
+            return np.array([row for row, eq_id in enumerate(self.ids) if eq_id is not None], dtype=np.int64)
+        return np.flatnonzero(mask)
+
+    def ids_for(self, filters: Dict[str, Any]) -> List[str]:
+        """조건을 만족하는 장비 ID"""
+        return [self.ids[row] for row in self.rows(filters)]
+
+    def _bitmap(self, field: str, value: str) -> np.ndarray:
+        key = (field, value)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = np.zeros(self._capacity, dtype=bool)
+            self._bitmaps[key] = bitmap
+        return bitmap
+
+    def _unshare(self) -> None:
+        if self._shared:
+            self._shared = False
+            self._bitmaps = {key: np.array(bitmap) for key, bitmap in self._bitmaps.items()}
+            self._temp_min = np.array(self._temp_min)
+            self._temp_max = np.array(self._temp_max)
+
+    def _ensure_capacity(self, size: int) -> None:
+        if size <= self._capacity:
+            self._unshare()
+            return
+        capacity = max(size, 2 * self._capacity, 16)
+        for key, bitmap in self._bitmaps.items():
+            grown = np.zeros(capacity, dtype=bool)
+            grown[:self._capacity] = bitmap
+            self._bitmaps[key] = grown
+        for name in ("_temp_min", "_temp_max"):
+            grown = np.zeros(capacity, dtype=np.float64)
+            grown[:self._capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self._capacity = capacity
+        self._shared = False
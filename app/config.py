@@ -3,7 +3,7 @@ KION RAG PoC - Configuration
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -18,13 +18,77 @@ class Settings(BaseSettings):
 
     # Embedding
     EMBEDDING_MODEL: str = "intfloat/multilingual-e5-large"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # 질의 임베딩 LRU 캐시 크기
+    QUERY_EMBEDDING_CACHE_TTL: int = 3600  # 질의 임베딩 캐시 유효 시간 (초)
+    EMBEDDING_CACHE_PATH: str = "./data/embedding_cache.sqlite"  # 문서 임베딩 영속 캐시 (모델 + 검색 텍스트 해시)
+    EMBEDDING_BATCH_SIZE: int = 32  # 문서 임베딩 배치 크기
+    # 임베딩 백엔드: "sentence_transformers" (PyTorch fp32) 또는 "onnx" (onnxruntime CPU, 변경 시 재색인 필요)
+    EMBEDDING_BACKEND: str = "sentence_transformers"
+    ONNX_MODEL_DIR: str = "./data/onnx/multilingual-e5-large"  # export_onnx_embedding.py 출력 디렉터리
+    ONNX_QUANTIZED: bool = True  # int8 동적 양자화 모델 사용
+    ONNX_NUM_THREADS: int = 0  # onnxruntime intra-op 스레드 수 (0이면 기본값)
+    QUERY_BATCHING: bool = False  # 동시 요청의 질의 임베딩을 모아 한 번에 인코딩 (사용 시 QUERY_BATCH_WINDOW_MS만큼 대기)
+    QUERY_BATCH_WINDOW_MS: float = 5.0  # 질의 배치를 모으는 최대 대기 시간 (밀리초)
+    QUERY_BATCH_MAX_SIZE: int = 32  # 질의 배치 최대 크기
+    # 공유 임베딩 서비스 (python -m app.embedding_service) - 둘 다 비어 있으면 프로세스 내 모델 사용
+    EMBEDDING_SERVICE_URL: str = ""  # 예: http://127.0.0.1:8001
+    EMBEDDING_SERVICE_SOCKET: str = ""  # Unix 소켓 경로 (지정 시 URL 대신 사용)
+    EMBEDDING_SERVICE_TIMEOUT: float = 10.0  # 요청 제한 시간 (초)
+    EMBEDDING_SERVICE_MAX_CONNECTIONS: int = 8  # 워커당 연결 풀 크기
+    EMBEDDING_SERVICE_FALLBACK: bool = True  # 서비스 실패 시 프로세스 내 모델로 대체
+    EMBEDDING_SERVICE_RETRY_INTERVAL: float = 30.0  # 대체 후 서비스 재시도까지 대기 시간 (초)
 
     # ChromaDB
     CHROMA_PERSIST_DIR: str = "./data/chroma_db"
     CHROMA_COLLECTION_NAME: str = "kion_equipment"
+    # Vector store: "chroma" (영속 컬렉션, HNSW) 또는 "numpy" (메모리 내 정확 검색, index_store 파일로 영속화)
+    VECTOR_BACKEND: str = "chroma"
+    VECTOR_STORE_PATH: str = "./data/vector_store.bin"
+    CATALOG_SYNC_BATCH_SIZE: int = 1000  # 카탈로그 동기화 시 조회 / upsert / 삭제 단위
+    # 증분 갱신 후 영속화 지연 (초) - NumPy 벡터 저장소 파일 / 카탈로그 해시 / BM25 스냅샷
+    # 그 사이 변경은 한 번에 저장, 종료 / 적재 완료 시 남은 변경 저장 (0이면 갱신마다 즉시)
+    PERSIST_DELAY: float = 30.0
+
+    # Bulk ingestion (app/ingest.py)
+    INGEST_CHUNK_SIZE: int = 256  # upsert 청크 크기
+    INGEST_QUEUE_SIZE: int = 4  # 단계 사이 큐에 쌓이는 최대 청크 수 (메모리 상한)
+    INGEST_VALIDATION_WORKERS: int = 2  # Pydantic 검증 프로세스 수 (0이면 읽기 스레드에서 검증)
+    INGEST_EMBEDDING_WORKERS: int = 0  # 임베딩 프로세스 수 (0이면 CPU 코어 4개당 1개)
+
+    # Lexical (BM25) index snapshot - 카탈로그 해시가 같으면 재구축 없이 메모리 매핑
+    LEXICAL_INDEX_PATH: str = "./data/lexical_index.bin"
 
     # RAG
     TOP_K: int = 5
+    HYBRID_FUSION: str = "weighted"  # 하이브리드 점수 결합: weighted, rrf, zscore
+    HYBRID_PARALLEL_LEGS: bool = True  # 벡터 / BM25 검색 동시 실행
+    VECTOR_LEG_TIMEOUT: float = 5.0  # 벡터 검색 제한 시간 (초, 초과 시 BM25 결과만 사용)
+    LEXICAL_LEG_TIMEOUT: float = 1.0  # BM25 검색 제한 시간 (초, 초과 시 벡터 결과만 사용)
+    RETRIEVAL_WORKERS: int = 8  # 검색 단계 실행 스레드 수
+    # 벡터 검색 필터 계획 (app/filter_planner.py)
+    FILTER_EXACT_MAX_CANDIDATES: int = 1000  # 조건 만족 장비가 이 이하로 추정되면 해당 장비만 전수 비교
+    FILTER_EXACT_MAX_CANDIDATES_REMOTE: int = 50  # ChromaDB (전수 비교 시 임베딩을 저장소에서 가져옴)
+    FILTER_POSTFILTER_MIN_SELECTIVITY: float = 0.3  # 선택도가 이 이상이면 필터 없이 검색 후 후처리
+    FILTER_MAX_CANDIDATE_POOL: int = 500  # 후처리용으로 늘린 후보 수 상한
+    FILTER_ALL_QUERY_CONSTRAINTS: bool = False  # 질의의 재료 / 온도 / 모든 기관 조건도 검색 필터로 사용
+
+    # Lexical scoring: "bm25" (검색 텍스트 전체) 또는 "bm25f" (필드 가중)
+    LEXICAL_SCORING: str = "bm25"
+    QUERY_TOKEN_CACHE_SIZE: int = 4096  # 질의 토큰화 LRU 캐시 크기
+    LEXICAL_TOPK_PRUNING: bool = True  # MaxScore 조기 종료 상위 K 검색
+    PHRASE_BOOST: float = 0.0  # 질의 인접 용어가 문서에서도 붙어 있을 때 BM25 가산 비율 (0이면 사용 안 함, 권장 0.5)
+    PHRASE_WINDOW: int = 4  # 근접 점수를 주는 최대 용어 거리
+    PHRASE_RERANK_DEPTH: int = 3  # 구문 재순위 후보 수 = top_k * depth
+    NGRAM_FALLBACK_MIN_HITS: int = 0  # BM25 결과가 이보다 적으면 한글 n-gram 인덱스로 보완 (0이면 사용 안 함, 권장 3)
+    NGRAM_FALLBACK_WEIGHT: float = 0.8  # n-gram으로만 찾은 결과 점수 상한 = 기본 결과 최저점 x 배율 (1 미만)
+    BM25F_FIELD_WEIGHTS: Dict[str, float] = {
+        "name": 3.0,
+        "tags": 2.5,
+        "category": 1.5,
+        "specs": 1.0,
+        "institution": 0.5,
+        "description": 1.0,
+    }
 
     class Config:
         env_file = ".env"
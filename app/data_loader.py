@@ -4,7 +4,7 @@ KION RAG PoC - Sample Data Loader
 
 import json
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from .models import Equipment
 from .rag import rag_pipeline
@@ -339,12 +339,28 @@ def load_sample_data() -> int:
     """샘플 장비 데이터 로드"""
     equipments = [Equipment(**eq) for eq in SAMPLE_EQUIPMENTS]
     count = rag_pipeline.add_equipments_batch(equipments)
+    rag_pipeline.flush()
     print(f"[DataLoader] {count}개 장비 데이터 로드 완료")
     return count
 
 
 def load_from_json(file_path: str) -> int:
     """JSON 파일에서 장비 데이터 로드"""
+    equipments = _read_json(file_path)
+    count = rag_pipeline.add_equipments_batch(equipments)
+    rag_pipeline.flush()
+    print(f"[DataLoader] {file_path}에서 {count}개 장비 데이터 로드 완료")
+    return count
+
+
+def sync_from_json(file_path: str) -> Dict[str, int]:
+    """JSON 파일 기준 카탈로그 동기화 (변경분만 반영, 없어진 장비 삭제)"""
+    counts = rag_pipeline.sync_catalog(_read_json(file_path))
+    print(f"[DataLoader] {file_path} 동기화 완료: {counts}")
+    return counts
+
+
+def _read_json(file_path: str) -> List[Equipment]:
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
@@ -352,10 +368,7 @@ def load_from_json(file_path: str) -> int:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    equipments = [Equipment(**eq) for eq in data]
-    count = rag_pipeline.add_equipments_batch(equipments)
-    print(f"[DataLoader] {file_path}에서 {count}개 장비 데이터 로드 완료")
-    return count
+    return [Equipment(**eq) for eq in data]
 
 
 if __name__ == "__main__":
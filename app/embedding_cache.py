@@ -0,0 +1,144 @@
+"""
+KION RAG - Embedding Cache
+
+질의 임베딩 캐시 (LRU + TTL)
+- 키: (임베딩 모델, 정규화된 질의)
+- 반복 질의("GaN MOCVD 장비" 등)는 SentenceTransformer 인코딩 생략
+- 적중/실패 횟수 집계
+
+문서 임베딩 저장소 (SQLite, 영속)
+- 키: hash(임베딩 모델, 검색 텍스트)
+- 재색인 시 내용이 바뀐 레코드만 인코딩
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """질의 정규화 (유니코드 NFKC + 공백 정리) - 캐시 키 및 인코딩 입력"""
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+class QueryEmbeddingCache:
+    """질의 임베딩 LRU + TTL 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = 1024, ttl: int = 3600):
+        """
+        Args:
+            max_size: 최대 항목 수 (LRU)
+            ttl: 항목 유효 시간 (초)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: str, query: str) -> Optional[np.ndarray]:
+        """캐시 조회 (query는 normalize_query 결과)"""
+        key = (model, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                embedding, created_at = entry
+                if time.time() - created_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, model: str, query: str, embedding: Any) -> np.ndarray:
+        """캐시 저장 (float32 배열로 보관), 저장된 배열 반환"""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._entries[(model, query)] = (embedding, time.time())
+            self._entries.move_to_end((model, query))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 집계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def embedding_key(model: str, text: str) -> str:
+    """문서 임베딩 키 (모델 + 검색 텍스트 해시)"""
+    return hashlib.sha1(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class DocumentEmbeddingStore:
+    """
+    문서 임베딩 영속 저장소 (SQLite, 스레드 안전)
+
+    임베딩은 float32 바이트로 저장 (차원은 배열 길이로 복원)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """저장된 임베딩 조회 (없는 키는 결과에서 제외)"""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, Any]]) -> None:
+        """임베딩 저장 (같은 키는 덮어씀)"""
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.count(), "hits": self.hits, "misses": self.misses}
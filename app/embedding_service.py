@@ -0,0 +1,80 @@
+"""
+KION RAG - Shared Embedding Service
+
+임베딩 모델을 하나의 프로세스에만 로드하고 API 워커들이 HTTP로 공유
+- uvicorn 워커 N개가 각자 모델(multilingual-e5-large)을 로드하지 않도록 분리
+- 여러 워커에서 동시에 들어온 요청은 EmbeddingBatcher로 모아 한 번에 인코딩
+- 응답 벡터는 float32 base64 (JSON 숫자 리스트보다 직렬화 비용이 작음)
+
+사용법:
+    python -m app.embedding_service    # EMBEDDING_SERVICE_SOCKET 또는 EMBEDDING_SERVICE_URL 주소로 실행
+
+API 워커에도 같은 EMBEDDING_SERVICE_SOCKET / EMBEDDING_SERVICE_URL을 설정하면
+create_embedding_function()이 서비스 클라이언트(RemoteEmbeddingFunction)를 반환
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from .config import settings
+from .embeddings import EmbeddingBatcher, create_embedding_function, embedding_model_key, encode_vectors
+
+# 서비스 프로세스의 배처 (시작 시 생성)
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _batcher
+    print(f"[EmbeddingService] Loading model: {embedding_model_key()}")
+    _batcher = EmbeddingBatcher(
+        create_embedding_function(local=True),
+        window_ms=settings.QUERY_BATCH_WINDOW_MS,
+        max_batch_size=settings.EMBEDDING_BATCH_SIZE
+    )
+    yield
+    _batcher.close()
+
+
+app = FastAPI(title="KION Embedding Service", lifespan=lifespan)
+
+
+@app.post("/embed")
+async def embed(request: EmbedRequest) -> Dict[str, Any]:
+    """텍스트 임베딩 (다른 요청과 함께 배치 인코딩)"""
+    if not request.texts:
+        return {"model": embedding_model_key(), "embeddings": encode_vectors([])}
+    try:
+        vectors = await asyncio.gather(*(asyncio.wrap_future(_batcher.submit(text)) for text in request.texts))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"model": embedding_model_key(), "embeddings": encode_vectors(vectors)}
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    return {"status": "healthy", "model": embedding_model_key(), "batching": _batcher.stats() if _batcher else None}
+
+
+def main() -> None:
+    import uvicorn
+
+    # 모델을 한 번만 로드하도록 단일 프로세스로 실행
+    if settings.EMBEDDING_SERVICE_SOCKET:
+        uvicorn.run(app, uds=settings.EMBEDDING_SERVICE_SOCKET)
+        return
+    url = urlparse(settings.EMBEDDING_SERVICE_URL or "http://127.0.0.1:8001")
+    uvicorn.run(app, host=url.hostname or "127.0.0.1", port=url.port or 8001)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+KION RAG - Embedding Backends
+
+임베딩 함수 생성 (settings.EMBEDDING_BACKEND)
+- sentence_transformers: PyTorch fp32 (기본)
+- onnx: onnxruntime CPU 추론 (export_onnx_embedding.py로 변환한 모델, 선택적으로 int8 양자화)
+
+ONNX 백엔드는 PyTorch 없이 tokenizers + onnxruntime만 로드 -> 메모리 사용량 / 시작 시간 감소
+
+질의 임베딩 마이크로 배칭 (EmbeddingBatcher)
+- 동시에 들어온 요청들의 질의를 짧은 시간 창(QUERY_BATCH_WINDOW_MS) 동안 모아 인코더 1회 호출
+- 배치 크기 / 대기 시간 집계
+
+공유 임베딩 서비스 클라이언트 (RemoteEmbeddingFunction)
+- EMBEDDING_SERVICE_URL / EMBEDDING_SERVICE_SOCKET 설정 시 모델을 로드하지 않고 app.embedding_service에 요청
+- 서비스 장애 시 프로세스 내 모델로 대체 (EMBEDDING_SERVICE_FALLBACK)
+"""
+
+import base64
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from .config import settings
+
+# export_onnx_embedding.py가 모델 디렉터리에 기록하는 설정 파일
+ONNX_CONFIG_FILE = "embedding_config.json"
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model_int8.onnx"
+
+EMBEDDING_BACKENDS = ("sentence_transformers", "onnx")
+
+
+def embedding_model_key() -> str:
+    """
+    임베딩 캐시 키에 쓰는 모델 식별자
+
+    백엔드마다 벡터가 조금씩 다르므로 (양자화 등) ONNX는 별도 키 사용
+    """
+    if settings.EMBEDDING_BACKEND == "onnx":
+        suffix = "onnx-int8" if settings.ONNX_QUANTIZED else "onnx"
+        return f"{settings.EMBEDDING_MODEL}@{suffix}"
+    return settings.EMBEDDING_MODEL
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction):
+    """
+    ONNX 문장 임베딩 (mean pooling + L2 정규화, SentenceTransformer e5 설정과 동일)
+
+    길이순으로 정렬해 배치를 만들어 패딩 연산을 줄임
+    """
+
+    def __init__(self, model_dir: Path, quantized: bool = False, num_threads: int = 0, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / ONNX_CONFIG_FILE, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        self.model_name = config["model"]
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_id"], pad_token=config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        model_file = model_dir / (ONNX_QUANTIZED_FILE if quantized else ONNX_MODEL_FILE)
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        print(f"[Embeddings] ONNX model loaded: {model_file}")
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            pooled = self._encode([texts[i] for i in batch])
+            if vectors.shape[1] == 0:
+                vectors = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            vectors[batch] = pooled
+        return vectors.tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+
+        # mean pooling (패딩 제외) + L2 정규화
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def encode_vectors(vectors: Any) -> str:
+    """임베딩 행렬 -> base64 (float32) - 임베딩 서비스 응답 형식"""
+    return base64.b64encode(np.ascontiguousarray(vectors, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_vectors(data: str, count: int) -> np.ndarray:
+    """encode_vectors의 역변환 ((count x 차원) float32 행렬)"""
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).reshape(count, -1)
+
+
+class RemoteEmbeddingFunction(EmbeddingFunction):
+    """
+    공유 임베딩 서비스 클라이언트 (연결 풀 재사용, 스레드 안전)
+
+    서비스의 모델 식별자가 embedding_model_key()와 다르면 (캐시 / 색인 벡터와 호환되지 않으므로) 오류로 처리.
+    응답 형식이 잘못되었거나 벡터 수 / 차원이 맞지 않으면 ValueError.
+    실패하면 프로세스 내 모델을 처음 필요할 때 로드해 사용하고, retry_interval 후 서비스를 다시 시도
+    (fallback=False면 httpx.HTTPError / ValueError를 그대로 전달)
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        socket_path: str = "",
+        timeout: float = 10.0,
+        max_connections: int = 8,
+        fallback: bool = True,
+        retry_interval: float = 30.0
+    ):
+        import httpx
+
+        self._errors = (httpx.HTTPError, ValueError)
+        transport = httpx.HTTPTransport(uds=socket_path) if socket_path else None
+        self.client = httpx.Client(
+            base_url=url or "http://embedding-service",
+            transport=transport,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self.model_key = embedding_model_key()
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self._dim = 0  # 첫 정상 응답의 임베딩 차원 (이후 응답 검증용)
+        self._local = None
+        self._local_lock = threading.Lock()
+        print(f"[Embeddings] Using embedding service: {socket_path or url}")
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+
+        if time.monotonic() >= self._retry_at:
+            try:
+                return self._remote(texts).tolist()
+            except self._errors as e:
+                if not self.fallback:
+                    raise
+                self._retry_at = time.monotonic() + self.retry_interval
+                print(
+                    f"[Embeddings] Embedding service unavailable ({e}), "
+                    f"using in-process model for {self.retry_interval:.0f}s"
+                )
+        return self._local_fn()(texts)
+
+    def _remote(self, texts: List[str]) -> np.ndarray:
+        response = self.client.post("/embed", json={"texts": texts})
+        response.raise_for_status()
+        return self._decode_response(response.json(), len(texts))
+
+    def _decode_response(self, data: Any, count: int) -> np.ndarray:
+        """서비스 응답 검증 후 (count x 차원) 행렬로 변환 (형식 / 모델 / 벡터 수 / 차원 불일치는 ValueError)"""
+        valid = (
+            isinstance(data, dict)
+            and isinstance(data.get("model"), str)
+            and isinstance(data.get("embeddings"), str)
+        )
+        if not valid:
+            raise ValueError("invalid embedding service response: expected {'model': str, 'embeddings': str}")
+        if data["model"] != self.model_key:
+            raise ValueError(f"embedding service model mismatch: {data['model']} != {self.model_key}")
+
+        # base64 / 길이 오류는 decode_vectors에서 ValueError (binascii.Error 포함)
+        vectors = decode_vectors(data["embeddings"], count)
+        dim = vectors.shape[1] if vectors.size else 0
+        if not dim or (self._dim and dim != self._dim):
+            raise ValueError(
+                f"embedding service returned {vectors.size} values for {count} texts "
+                f"(expected dimension {self._dim or 'unknown'})"
+            )
+        self._dim = dim
+        return vectors
+
+    def _local_fn(self) -> Any:
+        if self._local is None:
+            with self._local_lock:
+                if self._local is None:
+                    self._local = create_embedding_function(local=True)
+        return self._local
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_embedding_function(backend: Optional[str] = None, local: bool = False) -> Any:
+    """
+    임베딩 함수 생성 (ChromaDB EmbeddingFunction 호환)
+
+    임베딩 서비스가 설정되어 있으면 서비스 클라이언트 반환 (local=True면 항상 모델 직접 로드)
+    """
+    if not local and (settings.EMBEDDING_SERVICE_URL or settings.EMBEDDING_SERVICE_SOCKET):
+        return RemoteEmbeddingFunction(
+            url=settings.EMBEDDING_SERVICE_URL,
+            socket_path=settings.EMBEDDING_SERVICE_SOCKET,
+            timeout=settings.EMBEDDING_SERVICE_TIMEOUT,
+            max_connections=settings.EMBEDDING_SERVICE_MAX_CONNECTIONS,
+            fallback=settings.EMBEDDING_SERVICE_FALLBACK,
+            retry_interval=settings.EMBEDDING_SERVICE_RETRY_INTERVAL
+        )
+
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "sentence_transformers":
+        from chromadb.utils import embedding_functions
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDING_MODEL)
+    if backend == "onnx":
+        return OnnxEmbeddingFunction(
+            Path(settings.ONNX_MODEL_DIR),
+            quantized=settings.ONNX_QUANTIZED,
+            num_threads=settings.ONNX_NUM_THREADS,
+            batch_size=settings.EMBEDDING_BATCH_SIZE
+        )
+    raise ValueError(f"Unknown embedding backend: {backend} (available: {list(EMBEDDING_BACKENDS)})")
+
+
+# 배처 종료 표시
+_STOP = None
+
+
+class EmbeddingBatcher:
+    """
+    질의 임베딩 마이크로 배처 (스레드 안전)
+
+    첫 질의가 도착한 뒤 window_ms 동안(또는 max_batch_size개가 찰 때까지) 들어온 질의를 모아
+    한 번에 인코딩하고 각 호출자의 Future에 결과 전달. 같은 텍스트는 한 번만 인코딩
+    """
+
+    def __init__(self, encode: Callable[[List[str]], Any], window_ms: float = 5.0, max_batch_size: int = 32):
+        """
+        Args:
+            encode: 텍스트 리스트 -> 임베딩 리스트 (임베딩 함수)
+            window_ms: 배치를 모으는 최대 대기 시간 (밀리초)
+            max_batch_size: 배치당 최대 질의 수
+        """
+        self.encode_fn = encode
+        self.window = window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue: queue.Queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        # 종료 여부 확인 + 큐 넣기를 close() / 작업 스레드 종료와 직렬화 (종료 후 들어온 질의가 큐에 남지 않도록)
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.queries = 0
+        self.encoded = 0
+        self.max_batch = 0
+        # 최근 질의별 대기 시간 (초, 큐 진입 -> 인코딩 시작)
+        self._delays: deque = deque(maxlen=1024)
+        self._encode_time = 0.0
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """질의 하나 제출 (결과는 float32 배열)"""
+        future: Future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, texts: List[str]) -> List[np.ndarray]:
+        """질의 여러 개 제출 후 결과 대기 (다른 요청의 질의와 함께 배치될 수 있음)"""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """대기 중인 배치를 처리한 뒤 작업 스레드 종료"""
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._worker.join()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+
+                batch = [item]
+                deadline = item[2] + self.window
+                stop = False
+                while len(batch) < self.max_batch_size:
+                    # 시간 창이 지났어도 이미 큐에 쌓인 질의는 함께 처리
+                    remaining = deadline - time.perf_counter()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                self._encode_batch(batch)
+                if stop:
+                    return
+        finally:
+            # 작업 스레드가 끝난 뒤(종료 / BaseException) 남은 질의는 예외로 완료
+            # (잠금 안에서 닫으므로 이후 submit은 큐에 넣지 않고 예외 -> 아래에서 모두 비움)
+            with self._submit_lock:
+                self._closed = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP and not item[1].done():
+                    item[1].set_exception(RuntimeError("EmbeddingBatcher is closed"))
+
+    def _encode_batch(self, batch: List[Any]) -> None:
+        """
+        배치 인코딩 후 각 Future에 결과 전달
+
+        인코더 예외(BaseException 포함) / 결과 수 불일치 시에도 모든 Future를 완료 상태로 만듦
+        (결과를 받지 못한 Future에는 예외 설정 -> 호출자가 무한 대기하지 않음)
+        """
+        start = time.perf_counter()
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        error: Optional[BaseException] = None
+        try:
+            embeddings = list(self.encode_fn(texts))
+            if len(embeddings) != len(texts):
+                raise RuntimeError(
+                    f"embedding count mismatch: expected {len(texts)}, got {len(embeddings)}"
+                )
+            vectors = dict(zip(texts, embeddings))
+            for text, future, _ in batch:
+                future.set_result(np.asarray(vectors[text], dtype=np.float32))
+        except Exception as e:
+            error = e
+        except BaseException as e:
+            # KeyboardInterrupt / SystemExit 등은 대기 중인 호출자에게 전달한 뒤 작업 스레드 종료
+            error = e
+            raise
+        finally:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error or RuntimeError("embedding batch was not completed"))
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.batches += 1
+                self.queries += len(batch)
+                self.encoded += len(texts)
+                self.max_batch = max(self.max_batch, len(batch))
+                self._delays.extend(start - enqueued for _, _, enqueued in batch)
+                self._encode_time += elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 크기 / 대기 시간 집계 (대기 시간은 최근 질의 기준, 밀리초)"""
+        with self._stats_lock:
+            delays = np.asarray(self._delays, dtype=np.float64) * 1000
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "queries": self.queries,
+                "encoded": self.encoded,
+                "mean_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "queue_delay_ms_mean": round(float(delays.mean()), 3) if delays.size else 0.0,
+                "queue_delay_ms_p95": round(float(np.percentile(delays, 95)), 3) if delays.size else 0.0,
+                "queue_delay_ms_max": round(float(delays.max()), 3) if delays.size else 0.0,
+                "encode_ms_mean": round(self._encode_time / self.batches * 1000, 3) if self.batches else 0.0,
+            }
@@ -0,0 +1,216 @@
+"""
+KION RAG - Filter Planner
+
+검색 필터 정규화 + 질의별 벡터 검색 실행 계획
+- 요청 / ParsedQuery 필터의 모든 조건을 같은 키로 정규화
+  (wafer_sizes, materials, category, institution, temp_min, temp_max)
+- 장비 속성 인덱스(AttributeIndex)로 조건을 만족하는 장비 수 / 집합을 바로 계산
+- 계획 종류
+  - unfiltered: 조건 없음
+  - pushdown: 벡터 저장소 필터로 실행 (NumPy 저장소의 AttributeIndex / ChromaDB where),
+    저장소가 처리하지 못하는 조건은 후보를 늘려 검색한 뒤 후처리
+  - exact: 조건을 만족하는 장비가 적으면 해당 장비만 전수 비교 (정확한 상위 K,
+    만족하는 장비가 없으면 질의 임베딩 / 벡터 검색 생략)
+  - postfilter: 조건이 넓으면 필터 없이 늘린 후보에서 후처리 (필터된 HNSW의 재현율 손실 방지)
+
+조건 의미는 filters.apply_hard_filters와 동일 (재료 정보가 없는 장비는 재료 조건 통과,
+기관은 부분 문자열 일치 - records.institution_matches)
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional
+
+from .attribute_index import AttributeIndex
+from .records import (
+    EquipmentRecord,
+    EquipmentRecordStore,
+    institution_matches,
+    temperature_bounds,
+)
+
+# 정규화된 필터 키 (다중 값 키는 값 중 하나만 만족하면 통과)
+FILTER_KEYS = ("wafer_sizes", "materials", "category", "institution", "temp_min", "temp_max")
+MULTI_VALUE_KEYS = ("wafer_sizes", "materials", "category", "institution")
+_ALIASES = {
+    "wafer_size": "wafer_sizes",
+    "material": "materials",
+    "categories": "category",
+    "institutions": "institution",
+}
+
+FILTER_PLANS = ("unfiltered", "pushdown", "exact", "postfilter")
+
+# 후처리 시 근사(HNSW) 검색 누락을 감안한 후보 여유 배율
+POOL_MARGIN = 1.5
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    필터 정규화 (별칭 키 통합, 다중 값은 튜플, 온도는 float, 빈 조건 / 알 수 없는 키 제외)
+
+    예: {"wafer_size": "6 inch", "categories": ["증착"]} -> {"wafer_sizes": ("6 inch",), "category": ("증착",)}
+    """
+    normalized: Dict[str, Any] = {}
+    for key, value in (filters or {}).items():
+        key = _ALIASES.get(key, key)
+        if key not in FILTER_KEYS or value is None or value == "":
+            continue
+        if key in MULTI_VALUE_KEYS:
+            values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            merged = normalized.get(key, ()) + tuple(str(v).strip() for v in values if str(v).strip())
+            if merged:
+                normalized[key] = tuple(dict.fromkeys(merged))
+        else:
+            normalized[key] = float(value)
+    return normalized
+
+
+def matches(record: EquipmentRecord, filters: Dict[str, Any]) -> bool:
+    """
+    레코드가 정규화된 필터 조건을 모두 만족하는지
+
+    온도 정보가 없는 장비 / 기관명 비교는 records 모듈의 공통 규칙 (temperature_bounds, institution_matches)
+    """
+    for key, value in filters.items():
+        if key == "wafer_sizes":
+            if record.wafer_size_set.isdisjoint(value):
+                return False
+        elif key == "materials":
+            if record.material_set and not any(m.lower() in record.material_set for m in value):
+                return False
+        elif key == "category":
+            if record.category not in value:
+                return False
+        elif key == "institution":
+            if not any(institution_matches(v, record.institution_key) for v in value):
+                return False
+        elif key == "temp_min":
+            if temperature_bounds(record.temp_min, record.temp_max)[1] < value:
+                return False
+        elif key == "temp_max":
+            if temperature_bounds(record.temp_min, record.temp_max)[0] > value:
+                return False
+    return True
+
+
+@dataclass
+class FilterPlan:
+    """질의별 벡터 검색 실행 계획"""
+    strategy: str
+    filters: Dict[str, Any] = field(default_factory=dict)  # 전체 조건 (정규화)
+    pushdown: Dict[str, Any] = field(default_factory=dict)  # 벡터 저장소 필터로 넘길 조건
+    residual: Dict[str, Any] = field(default_factory=dict)  # 검색 후 확인할 조건
+    candidate_k: int = 0  # 벡터 저장소에서 가져올 후보 수
+    feasible: int = 0  # 조건을 만족하는 장비 수
+    candidate_ids: Optional[List[str]] = None  # exact 계획의 전수 비교 대상
+
+
+class FilterPlanner:
+    """
+    필터 선택도에 따라 벡터 검색 방식 선택
+
+    - 조건을 만족하는 장비가 없으면: 빈 exact (검색 생략)
+    - 저장소가 모든 조건을 정확히 처리하면 (NumPy 속성 인덱스 + 전수 비교) 항상 pushdown
+    - 조건을 만족하는 장비 수 <= exact_max_candidates (저장소별로 지정 가능): exact
+    - 선택도 >= postfilter_min_selectivity: postfilter
+    - 그 외: 저장소가 처리할 수 있는 조건은 pushdown, 나머지는 늘린 후보에서 후처리
+    """
+
+    def __init__(
+        self,
+        exact_max_candidates: int = 1000,
+        postfilter_min_selectivity: float = 0.3,
+        max_candidate_pool: int = 500
+    ):
+        self.exact_max_candidates = exact_max_candidates
+        self.postfilter_min_selectivity = postfilter_min_selectivity
+        self.max_candidate_pool = max_candidate_pool
+        self._index: Optional[AttributeIndex] = None
+        self._index_version = -1
+        self._lock = threading.Lock()
+        self.plan_counts: Dict[str, int] = {name: 0 for name in FILTER_PLANS}
+
+    def index(self, records: EquipmentRecordStore) -> AttributeIndex:
+        """장비 속성 인덱스 (레코드가 바뀐 뒤 처음 사용할 때 다시 생성)"""
+        if self._index is None or self._index_version != records.version:
+            with self._lock:
+                if self._index is None or self._index_version != records.version:
+                    version = records.version
+                    self._index = AttributeIndex(records.all())
+                    self._index_version = version
+        return self._index
+
+    def set_index(self, index: AttributeIndex, version: int) -> None:
+        """
+        현재 레코드와 같은 내용으로 이미 만들어진 속성 인덱스 사용 (예: 렉시컬 스냅샷에서 로드한 인덱스,
+        레코드를 모두 파싱하지 않음). version은 인덱스와 같은 내용일 때의 레코드 저장소 버전,
+        이후 레코드가 바뀌면 index()에서 다시 생성
+        """
+        with self._lock:
+            self._index = index
+            self._index_version = version
+
+    def plan(
+        self,
+        filters: Optional[Dict[str, Any]],
+        top_k: int,
+        records: EquipmentRecordStore,
+        pushable: Collection[str],
+        exact_store: bool = False,
+        exact_max_candidates: Optional[int] = None
+    ) -> FilterPlan:
+        """
+        Args:
+            filters: 검색 필터 (정규화 전이어도 됨)
+            top_k: 반환할 결과 수
+            records: 장비 레코드 저장소 (속성 인덱스 생성)
+            pushable: 벡터 저장소가 필터로 처리할 수 있는 조건 키
+            exact_store: 벡터 저장소 필터 검색이 전수 비교인지 (재현율 손실 없음)
+            exact_max_candidates: exact 계획 최대 장비 수 (기본값: 생성 시 지정한 값)
+        """
+        if exact_max_candidates is None:
+            exact_max_candidates = self.exact_max_candidates
+        filters = normalize_filters(filters)
+        if not filters:
+            return self._count(FilterPlan("unfiltered", candidate_k=top_k))
+
+        index = self.index(records)
+        feasible = index.count(filters)
+        pushdown = {k: v for k, v in filters.items() if k in pushable}
+        residual = {k: v for k, v in filters.items() if k not in pushable}
+
+        if feasible == 0:
+            return self._count(FilterPlan("exact", filters, candidate_k=top_k, candidate_ids=[]))
+
+        if exact_store and not residual:
+            return self._count(FilterPlan("pushdown", filters, pushdown, {}, top_k, feasible))
+
+        if feasible <= exact_max_candidates:
+            return self._count(FilterPlan(
+                "exact", filters, candidate_k=top_k, feasible=feasible, candidate_ids=index.ids_for(filters)
+            ))
+
+        selectivity = feasible / index.num_live
+        if selectivity >= self.postfilter_min_selectivity:
+            return self._count(FilterPlan(
+                "postfilter", filters, {}, filters, self._pool(top_k, selectivity), feasible
+            ))
+
+        # 저장소 필터로 줄어든 후보 중 나머지 조건도 만족하는 비율만큼 후보 확대
+        candidate_k = self._pool(top_k, feasible / index.count(pushdown)) if residual else top_k
+        return self._count(FilterPlan("pushdown", filters, pushdown, residual, candidate_k, feasible))
+
+    def candidate_ids(self, filters: Dict[str, Any], records: EquipmentRecordStore) -> List[str]:
+        """조건을 만족하는 장비 ID 전체 (정규화된 필터)"""
+        return self.index(records).ids_for(filters)
+
+    def _pool(self, top_k: int, selectivity: float) -> int:
+        if selectivity <= 0:
+            return self.max_candidate_pool
+        return max(top_k, min(self.max_candidate_pool, math.ceil(top_k / selectivity * POOL_MARGIN)))
+
+    def _count(self, plan: FilterPlan) -> FilterPlan:
+        self.plan_counts[plan.strategy] += 1
+        return plan
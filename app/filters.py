@@ -6,6 +6,7 @@ Policy DB 통합: 정책 설정, 기관 우선순위 적용
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from .query_parser import ParsedQuery
+from .records import institution_matches, temperature_bounds
 
 
 @dataclass
@@ -36,6 +37,14 @@ def get_institution_priority():
         return None
 
 
+def _material_set(equipment: Dict[str, Any]):
+    """소문자 재료 집합 (레코드 참조 결과면 미리 계산된 frozenset 사용)"""
+    record = getattr(equipment, "record", None)
+    if record is not None:
+        return record.material_set
+    return {m.lower() for m in equipment.get("materials", [])}
+
+
 def check_wafer_size(equipment: Dict[str, Any], required_sizes: List[str]) -> FilterResult:
     """
     웨이퍼 사이즈 필터
@@ -67,30 +76,29 @@ def check_temperature(
     """
     온도 범위 필터
     장비가 요청된 온도 범위를 지원하는지 확인
+    (온도 정보가 없는 쪽은 기본값으로 판정, records.temperature_bounds와 동일)
     """
     if temp_min is None and temp_max is None:
         return FilterResult(passed=True)
 
     eq_temp_min = equipment.get("temp_min")
     eq_temp_max = equipment.get("temp_max")
-
-    if eq_temp_min is None or eq_temp_max is None:
-        return FilterResult(passed=False, reason="온도 정보 없음")
+    low, high = temperature_bounds(eq_temp_min, eq_temp_max)
 
     # 요청 최소 온도 체크: 장비가 해당 온도 이상 지원해야 함
     if temp_min is not None:
-        if eq_temp_max < temp_min:
+        if high < temp_min:
             return FilterResult(
                 passed=False,
-                reason=f"최대 {eq_temp_max}℃까지만 지원 (요청: {temp_min}℃ 이상)"
+                reason=f"최대 {high:g}℃까지만 지원 (요청: {temp_min}℃ 이상)"
             )
 
     # 요청 최대 온도 체크: 장비가 해당 온도 이하도 지원해야 함
     if temp_max is not None:
-        if eq_temp_min > temp_max:
+        if low > temp_max:
             return FilterResult(
                 passed=False,
-                reason=f"최소 {eq_temp_min}℃부터 지원 (요청: {temp_max}℃ 이하)"
+                reason=f"최소 {low:g}℃부터 지원 (요청: {temp_max}℃ 이하)"
             )
 
     return FilterResult(passed=True)
@@ -110,7 +118,7 @@ def check_materials(equipment: Dict[str, Any], required_materials: List[str]) ->
         return FilterResult(passed=True)
 
     # 대소문자 무시 비교
-    eq_materials_lower = [m.lower() for m in eq_materials]
+    eq_materials_lower = _material_set(equipment)
 
     for material in required_materials:
         if material.lower() in eq_materials_lower:
@@ -160,6 +168,7 @@ def check_category(
 def check_institution(equipment: Dict[str, Any], required_institutions: List[str]) -> FilterResult:
     """
     기관 필터
+    요청 기관명이 장비 기관명에 포함되면 통과 (공백 / 대소문자 무시, records.institution_matches)
     """
     if not required_institutions:
         return FilterResult(passed=True)
@@ -167,7 +176,7 @@ def check_institution(equipment: Dict[str, Any], required_institutions: List[str
     eq_institution = equipment.get("institution", "")
 
     for inst in required_institutions:
-        if inst in eq_institution:
+        if institution_matches(inst, eq_institution):
             return FilterResult(passed=True)
 
     return FilterResult(
@@ -263,7 +272,7 @@ def calculate_match_score(equipment: Dict[str, Any], parsed_query: ParsedQuery)
     # 재료 매칭 (가중치: 0.25)
     if parsed_query.materials:
         max_score += 0.25
-        eq_materials = [m.lower() for m in equipment.get("materials", [])]
+        eq_materials = _material_set(equipment)
         if any(m.lower() in eq_materials for m in parsed_query.materials):
             score += 0.25
 
@@ -276,7 +285,7 @@ def calculate_match_score(equipment: Dict[str, Any], parsed_query: ParsedQuery)
     # 기관 매칭 (가중치: 0.1)
     if parsed_query.institutions:
         max_score += 0.1
-        if any(inst in equipment.get("institution", "") for inst in parsed_query.institutions):
+        if any(institution_matches(inst, equipment.get("institution", "")) for inst in parsed_query.institutions):
             score += 0.1
 
     if max_score == 0:
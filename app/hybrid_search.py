@@ -7,126 +7,1460 @@ KION RAG - Hybrid Search (BM25 + Vector Search)
 - 두 결과를 결합하여 최종 순위 결정
 """
 
-from typing import List, Dict, Any, Optional
-from rank_bm25 import BM25Okapi
-import re
-from collections import defaultdict
+from collections.abc import MutableMapping
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from pathlib import Path
+import copy
+import json
+import threading
+import numpy as np
+from scipy import sparse
 
+from .attribute_index import AttributeIndex
+from .config import settings
+from .filter_planner import normalize_filters
+from .index_store import StringColumn, encode_strings, write_snapshot, read_snapshot
+from .records import EquipmentRecord
+from .tokenizer import Vocabulary, hangul_ngrams, sorted_term_order, tokenize, tokenize_query
 
-class HybridSearcher:
-    """하이브리드 검색 (BM25 + Vector)"""
+_EMPTY_TERMS = np.zeros(0, dtype=np.int32)
+
+
+class BM25Index:
+    """
+    역색인 기반 BM25 (Okapi)
+
+    - 용어별 포스팅(문서 번호, 빈도)을 CSR 형태의 NumPy 배열로 보관
+    - 질의 용어를 포함한 문서만 점수 누적 (전체 코퍼스 스캔 없음)
+    - 점수 계산식은 rank_bm25.BM25Okapi와 동일 (k1, b, epsilon 기본값 포함)
+    - 용어는 공유 Vocabulary의 int32 ID, 문서는 ID 배열로 입력
+    - 증분 추가/삭제: 기본 세그먼트(CSR)는 그대로 두고 델타 포스팅 + 삭제 마스크로 관리,
+      통계(DF, 문서 길이 합)는 변경분만 갱신하고 IDF는 질의 시점에 필요할 때만 재계산
+    - 용어별 점수 상한(최대 빈도 / 최소 문서 길이)을 보관하여 MaxScore 상위 K 검색 지원
+    """
+
+    # 델타 포스팅이 이 크기(또는 기본 세그먼트의 일정 비율)를 넘으면 CSR로 병합
+    DELTA_MERGE_MIN = 4096
+    DELTA_MERGE_RATIO = 0.25
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        # 기본 세그먼트 (CSR)
+        self.term_offsets = np.zeros(1, dtype=np.int64)  # term id -> 포스팅 시작 위치
+        self.post_docs = np.zeros(0, dtype=np.int32)     # 문서 번호
+        self.post_tfs = np.zeros(0, dtype=np.int32)      # 용어 빈도
+        # 델타 세그먼트: term id -> ([문서 번호], [빈도])
+        self._delta: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._delta_size = 0
+
+        # 문서 번호별 길이 / 활성 여부 (용량을 두 배씩 늘려 추가 비용 상각)
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._live = np.zeros(0, dtype=bool)
+        self._num_slots = 0
+        self._num_live = 0
+        self._total_len = 0
+
+        # 용어별 문서 빈도 (활성 문서 기준)
+        self._df: List[int] = []
+        # 용어별 점수 상한 계산용: 최대 빈도 / 최소 문서 길이 (삭제 시에는 갱신하지 않음 -> 보수적 상한)
+        self._max_tf: List[int] = []
+        self._min_len: List[int] = []
+
+        self.idf = np.zeros(0, dtype=np.float64)
+        self.avgdl = 0.0
+        self._dirty = False
+        self._matrix: Optional[sparse.csr_matrix] = None  # 용어 x 문서 BM25 가중치 (일괄 질의용)
+
+    @property
+    def num_docs(self) -> int:
+        """활성 문서 수"""
+        return self._num_live
+
+    @property
+    def num_slots(self) -> int:
+        """할당된 문서 번호 수 (삭제된 문서 포함)"""
+        return self._num_slots
+
+    @property
+    def doc_len(self) -> np.ndarray:
+        return self._doc_len[:self._num_slots]
+
+    def build(self, doc_terms: List[np.ndarray], num_terms: int = 0) -> None:
+        """
+        역색인 생성
+
+        Args:
+            doc_terms: 문서 번호 순서의 용어 ID 배열
+            num_terms: 용어 사전 크기
+        """
+        counted = [np.unique(terms, return_counts=True) for terms in doc_terms]
+        term_col = np.concatenate([u for u, _ in counted]).astype(np.int64) if counted else np.zeros(0, dtype=np.int64)
+        tf_col = np.concatenate([c for _, c in counted]) if counted else np.zeros(0, dtype=np.int64)
+        doc_col = np.repeat(
+            np.arange(len(doc_terms), dtype=np.int32), [len(u) for u, _ in counted]
+        )
+        if len(term_col):
+            num_terms = max(num_terms, int(term_col.max()) + 1)
+
+        # 용어 ID 순으로 정렬 (같은 용어 안에서는 문서 번호 오름차순 유지)
+        order = np.argsort(term_col, kind="stable")
+        df = np.bincount(term_col, minlength=num_terms)
+        self.term_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=self.term_offsets[1:])
+        self.post_docs = doc_col[order].astype(np.int32)
+        self.post_tfs = tf_col[order].astype(np.int32)
+        self._delta = {}
+        self._delta_size = 0
+
+        self._doc_len = np.array([len(t) for t in doc_terms], dtype=np.float64)
+        self._live = np.ones(len(doc_terms), dtype=bool)
+        self._num_slots = len(doc_terms)
+        self._num_live = len(doc_terms)
+        self._total_len = sum(len(t) for t in doc_terms)
+        self._df = df.tolist()
+        max_tf, min_len = self._bounds(self.term_offsets, self.post_docs, self.post_tfs)
+        self._max_tf, self._min_len = max_tf.tolist(), min_len.tolist()
+
+        self._dirty = True
+        self._refresh_stats()
+
+    def export_arrays(self) -> Dict[str, np.ndarray]:
+        """스냅샷 저장용 배열 반환 - 델타/삭제를 병합한 포스팅 (인덱스 자체는 변경하지 않음)"""
+        term_offsets, post_docs, post_tfs = self._merged_postings()
+        max_tf, min_len = self._bounds(term_offsets, post_docs, post_tfs)
+
+        return {
+            "term_offsets": term_offsets,
+            "post_docs": post_docs,
+            "post_tfs": post_tfs,
+            "doc_len": self.doc_len,
+            "live": self._live[:self._num_slots],
+            "df": np.array(self._df, dtype=np.int64),
+            "max_tf": max_tf,
+            "min_len": min_len,
+        }
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: Dict[str, np.ndarray],
+        params: Optional[Dict[str, float]] = None
+    ) -> "BM25Index":
+        """
+        스냅샷 배열로 인덱스 복원
+
+        포스팅 배열은 전달받은 그대로(메모리 매핑 가능) 사용하고,
+        갱신 대상인 문서 길이/활성 여부만 복사
+        """
+        index = cls(**(params or {}))
+        index.term_offsets = arrays["term_offsets"]
+        index.post_docs = arrays["post_docs"]
+        index.post_tfs = arrays["post_tfs"]
+
+        index._doc_len = np.array(arrays["doc_len"], dtype=np.float64)
+        index._live = np.array(arrays["live"], dtype=bool)
+        index._num_slots = len(index._doc_len)
+        index._num_live = int(index._live.sum())
+        index._total_len = int(index._doc_len[index._live].sum())
+        index._df = np.asarray(arrays["df"]).tolist()
+        if "max_tf" in arrays:
+            index._max_tf = np.asarray(arrays["max_tf"]).tolist()
+            index._min_len = np.asarray(arrays["min_len"]).tolist()
+        else:
+            max_tf, min_len = index._bounds(index.term_offsets, index.post_docs, index.post_tfs)
+            index._max_tf, index._min_len = max_tf.tolist(), min_len.tolist()
+
+        index._dirty = True
+        index._refresh_stats()
+        return index
+
+    # === 증분 갱신 ===
+
+    def add(self, terms: np.ndarray) -> int:
+        """문서(용어 ID 배열) 추가 (O(문서 길이)), 새 문서 번호 반환"""
+        doc_no = self._num_slots
+        self._ensure_capacity(doc_no + 1)
+        self._doc_len[doc_no] = len(terms)
+        self._live[doc_no] = True
+        self._num_slots += 1
+        self._num_live += 1
+        self._total_len += len(terms)
+
+        uniq, counts = np.unique(terms, return_counts=True)
+        if len(uniq) and uniq[-1] >= len(self._df):
+            grow = int(uniq[-1]) + 1 - len(self._df)
+            self._df.extend([0] * grow)
+            self._max_tf.extend([0] * grow)
+            self._min_len.extend([len(terms)] * grow)
+        for tid, tf in zip(uniq.tolist(), counts.tolist()):
+            self._df[tid] += 1
+            self._max_tf[tid] = max(self._max_tf[tid], tf)
+            self._min_len[tid] = min(self._min_len[tid], len(terms))
+            docs, tfs = self._delta.setdefault(tid, ([], []))
+            docs.append(doc_no)
+            tfs.append(tf)
+            self._delta_size += 1
+
+        self._dirty = True
+        if self._delta_size > max(self.DELTA_MERGE_MIN, self.DELTA_MERGE_RATIO * len(self.post_docs)):
+            self.merge_delta()
+        return doc_no
+
+    def remove(self, doc_no: int, terms: np.ndarray) -> None:
+        """
+        문서 삭제 (O(문서 길이))
+
+        포스팅은 삭제 마스크로 가려두고 merge_delta() 시 실제로 제거
+        """
+        if doc_no >= self._num_slots or not self._live[doc_no]:
+            return
+
+        self._live[doc_no] = False
+        self._num_live -= 1
+        self._total_len -= len(terms)
+        for tid in np.unique(terms).tolist():
+            self._df[tid] -= 1
+
+        self._dirty = True
+
+    def copy(self) -> "BM25Index":
+        """
+        증분 갱신용 복사본 (copy-on-write)
+
+        기본 세그먼트(CSR) 배열은 공유하고 갱신되는 상태(델타, 통계, 문서 길이)만 복사
+        """
+        clone = copy.copy(self)
+        clone._delta = {tid: (list(docs), list(tfs)) for tid, (docs, tfs) in self._delta.items()}
+        clone._doc_len = self._doc_len.copy()
+        clone._live = self._live.copy()
+        clone._df = list(self._df)
+        clone._max_tf = list(self._max_tf)
+        clone._min_len = list(self._min_len)
+        return clone
+
+    def merge_delta(self) -> None:
+        """델타 포스팅과 삭제 마스크를 기본 세그먼트(CSR)에 병합"""
+        self.term_offsets, self.post_docs, self.post_tfs = self._merged_postings()
+        self._delta = {}
+        self._delta_size = 0
+        max_tf, min_len = self._bounds(self.term_offsets, self.post_docs, self.post_tfs)
+        self._max_tf, self._min_len = max_tf.tolist(), min_len.tolist()
+
+    def _merged_postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """델타와 삭제 마스크를 반영한 CSR 포스팅 (term_offsets, post_docs, post_tfs)"""
+        if not self._delta and self._num_live == self._num_slots:
+            return self.term_offsets, self.post_docs, self.post_tfs
+
+        num_terms = len(self._df)
+        docs_parts = []
+        tfs_parts = []
+        lengths = np.zeros(num_terms, dtype=np.int64)
+
+        for tid in range(num_terms):
+            docs, tfs = self._raw_postings(tid)
+            if len(docs) and not self._live[docs].all():
+                keep = self._live[docs]
+                docs, tfs = docs[keep], tfs[keep]
+            docs_parts.append(docs)
+            tfs_parts.append(tfs)
+            lengths[tid] = len(docs)
+
+        term_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(lengths, out=term_offsets[1:])
+        post_docs = np.concatenate(docs_parts).astype(np.int32) if docs_parts else np.zeros(0, dtype=np.int32)
+        post_tfs = np.concatenate(tfs_parts).astype(np.int32) if tfs_parts else np.zeros(0, dtype=np.int32)
+        return term_offsets, post_docs, post_tfs
+
+    def _bounds(
+        self,
+        term_offsets: np.ndarray,
+        post_docs: np.ndarray,
+        post_tfs: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR 포스팅(델타 없음)의 용어별 최대 빈도 / 최소 문서 길이"""
+        num_terms = len(self._df)
+        term_col = np.repeat(np.arange(num_terms), np.diff(term_offsets[:num_terms + 1]))
+        max_tf = np.zeros(num_terms, dtype=np.int64)
+        min_len = np.full(num_terms, np.iinfo(np.int64).max, dtype=np.int64)
+        np.maximum.at(max_tf, term_col, post_tfs)
+        np.minimum.at(min_len, term_col, self._doc_len[post_docs].astype(np.int64))
+        min_len[max_tf == 0] = 0
+        return max_tf, min_len
+
+    def _ensure_capacity(self, size: int) -> None:
+        if size <= len(self._doc_len):
+            return
+        capacity = max(size, 2 * len(self._doc_len), 16)
+        doc_len = np.zeros(capacity, dtype=np.float64)
+        doc_len[:self._num_slots] = self._doc_len[:self._num_slots]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._num_slots] = self._live[:self._num_slots]
+        self._doc_len, self._live = doc_len, live
+
+    def _refresh_stats(self) -> None:
+        """IDF / 평균 문서 길이 재계산 (변경이 있었을 때만)"""
+        if not self._dirty:
+            return
+        self._matrix = None
+
+        n = self._num_live
+        self.avgdl = self._total_len / n if n else 0.0
+
+        # IDF 계산 (음수 IDF는 epsilon * 평균 IDF로 대체, BM25Okapi와 동일)
+        df = np.array(self._df, dtype=np.float64)
+        idf = np.log(n - df + 0.5) - np.log(df + 0.5)
+        present = df > 0
+        if present.any():
+            average_idf = idf[present].sum() / present.sum()
+            idf[present & (idf < 0)] = self.epsilon * average_idf
+        idf[~present] = 0.0
+        self.idf = idf
+        self._dirty = False
+
+    # === 검색 ===
+
+    def _raw_postings(self, tid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """기본 세그먼트 + 델타 포스팅 (삭제 마스크 적용 전)"""
+        if tid + 1 < len(self.term_offsets):
+            start, end = self.term_offsets[tid], self.term_offsets[tid + 1]
+            docs, tfs = self.post_docs[start:end], self.post_tfs[start:end]
+        else:
+            docs, tfs = self.post_docs[:0], self.post_tfs[:0]
+
+        delta = self._delta.get(tid)
+        if delta:
+            docs = np.concatenate([docs, np.array(delta[0], dtype=np.int32)])
+            tfs = np.concatenate([tfs, np.array(delta[1], dtype=np.int32)])
+        return docs, tfs
+
+    def postings(self, tid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """활성 문서의 포스팅 (문서 번호 오름차순, 빈도)"""
+        docs, tfs = self._raw_postings(tid)
+        if self._num_live < self._num_slots and len(docs):
+            keep = self._live[docs]
+            docs, tfs = docs[keep], tfs[keep]
+        return docs, tfs
+
+    def score(self, tids: List[int], mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의 용어의 BM25 점수 계산
+
+        Args:
+            tids: 질의 용어 ID (중복 허용)
+            mask: 문서 번호별 후보 여부 (메타데이터 필터), None이면 전체
+
+        Returns:
+            (문서 번호 배열(오름차순), 점수 배열) - 질의 용어를 포함한 (후보) 문서만
+        """
+        tids = [tid for tid in tids if tid < len(self._df)]
+        if not tids or not self._num_live:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+
+        self._refresh_stats()
+
+        docs_parts = []
+        contrib_parts = []
+        for tid in tids:
+            docs, tfs = self.postings(tid)
+            if mask is not None:
+                # 필터 밖 문서는 점수 계산 전에 제외
+                keep = mask[docs]
+                docs, tfs = docs[keep], tfs[keep]
+            tf = tfs.astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[docs] / self.avgdl)
+            docs_parts.append(docs)
+            contrib_parts.append(self.idf[tid] * (tf * (self.k1 + 1) / (tf + norm)))
+
+        docs = np.concatenate(docs_parts)
+        contrib = np.concatenate(contrib_parts)
+
+        # 문서별 누적 (질의 용어 순서대로 합산 -> BM25Okapi와 동일한 부동소수 결과)
+        doc_nos, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=contrib, minlength=len(doc_nos))
+        return doc_nos, scores
+
+    def top_k(self, tids: List[int], k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """점수 상위 k개 (MaxScore 조기 종료), 형식은 (점수 내림차순 문서 번호, 점수)"""
+        tids = [tid for tid in tids if tid < len(self._df) and self._df[tid] > 0]
+        if not tids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+        self._refresh_stats()
+        return max_score_top_k(self, tids, k, mask)
+
+    def weight_matrix(self) -> sparse.csr_matrix:
+        """
+        용어 x 문서 BM25 가중치 희소 행렬 (CSR, 인덱스 변경 시 다시 생성)
+
+        질의 용어 빈도 행렬과 곱하면 질의별 BM25 점수
+        """
+        self._refresh_stats()
+        matrix = self._matrix
+        if matrix is None:
+            term_offsets, post_docs, post_tfs = self._merged_postings()
+            term_col = np.repeat(np.arange(len(self._df)), np.diff(term_offsets))
+            tf = post_tfs.astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[post_docs] / self.avgdl)
+            weights = self.idf[term_col] * (tf * (self.k1 + 1) / (tf + norm))
+            matrix = sparse.csr_matrix(
+                (weights, np.asarray(post_docs), np.asarray(term_offsets)),
+                shape=(len(self._df), self._num_slots)
+            )
+            self._matrix = matrix
+        return matrix
+
+    def upper_bounds(self, tids: np.ndarray) -> np.ndarray:
+        """용어별 문서 점수 상한 (최대 빈도 + 최소 문서 길이 조합)"""
+        tf = np.array([self._max_tf[t] for t in tids], dtype=np.float64)
+        dl = np.array([self._min_len[t] for t in tids], dtype=np.float64)
+        norm = self.k1 * (1 - self.b + self.b * dl / self.avgdl)
+        return self.idf[tids] * (tf * (self.k1 + 1) / (tf + norm))
+
+    def term_scores(self, tid: int, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        """포스팅의 용어 점수 (postings() 결과 일부)"""
+        tf = tfs.astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * self._doc_len[docs] / self.avgdl)
+        return self.idf[tid] * (tf * (self.k1 + 1) / (tf + norm))
+
+
+class BM25FIndex:
+    """
+    필드 가중 BM25 (BM25F)
+
+    장비명 / 태그 / 카테고리 / 스펙 / 기관 / 설명을 별도 필드로 보고
+    필드별 길이 정규화 + 부스트를 적용한 가중 빈도를 인덱스 생성 시 미리 계산
+    (질의 시에는 용어별 포스팅에서 포화 함수만 적용)
+
+        tf~(t, d) = Σ_f w_f * tf_f(t, d) / (1 - b + b * len_f(d) / avglen_f)
+        score(d)  = Σ_t idf(t) * tf~ * (k1 + 1) / (k1 + tf~)
+    """
+
+    def __init__(self, field_weights: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.field_weights = dict(field_weights)
+        self.k1 = k1
+        self.b = b
+
+        self.term_offsets = np.zeros(1, dtype=np.int64)
+        self.post_docs = np.zeros(0, dtype=np.int32)
+        self.post_weights = np.zeros(0, dtype=np.float64)  # 가중 빈도 tf~
+        self.max_weights = np.zeros(0, dtype=np.float64)   # 용어별 최대 tf~ (점수 상한)
+        self.idf = np.zeros(0, dtype=np.float64)
+        self.num_slots = 0
+        self._matrix: Optional[sparse.csr_matrix] = None
+
+    def build(self, field_tokens: List[Optional[Dict[str, np.ndarray]]], num_terms: int = 0) -> None:
+        """
+        Args:
+            field_tokens: 문서 번호 순서의 {필드: 용어 ID 배열} (삭제된 문서는 None)
+            num_terms: 용어 사전 크기
+        """
+        fields = list(self.field_weights)
+        live = [ft for ft in field_tokens if ft is not None]
+        self.num_slots = len(field_tokens)
+        self._matrix = None
+        avg_len = {
+            f: (sum(len(ft.get(f, [])) for ft in live) / len(live)) if live else 0.0
+            for f in fields
+        }
+
+        doc_parts, term_parts, weight_parts = [], [], []
+        for doc_no, ft in enumerate(field_tokens):
+            if ft is None:
+                continue
+            weighted: Dict[int, float] = {}
+            for f in fields:
+                terms = ft.get(f)
+                if terms is None or not len(terms) or not avg_len[f]:
+                    continue
+                norm = 1 - self.b + self.b * len(terms) / avg_len[f]
+                boost = self.field_weights[f] / norm
+                for tid in terms.tolist():
+                    weighted[tid] = weighted.get(tid, 0.0) + boost
+            doc_parts.append(np.full(len(weighted), doc_no, dtype=np.int32))
+            term_parts.append(np.fromiter(weighted.keys(), dtype=np.int64, count=len(weighted)))
+            weight_parts.append(np.fromiter(weighted.values(), dtype=np.float64, count=len(weighted)))
+
+        term_col = np.concatenate(term_parts) if term_parts else np.zeros(0, dtype=np.int64)
+        if len(term_col):
+            num_terms = max(num_terms, int(term_col.max()) + 1)
+        order = np.argsort(term_col, kind="stable")
+        lengths = np.bincount(term_col, minlength=num_terms)
+        self.term_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.term_offsets[1:])
+        self.post_docs = np.concatenate(doc_parts)[order] if doc_parts else np.zeros(0, dtype=np.int32)
+        self.post_weights = np.concatenate(weight_parts)[order] if weight_parts else np.zeros(0, dtype=np.float64)
+        self.max_weights = np.zeros(num_terms, dtype=np.float64)
+        np.maximum.at(self.max_weights, term_col, np.concatenate(weight_parts) if weight_parts else self.post_weights)
+
+        # 필드 구분 없이 용어를 포함한 문서 수 기준 IDF (항상 양수)
+        n = len(live)
+        df = lengths.astype(np.float64)
+        self.idf = np.log((n - df + 0.5) / (df + 0.5) + 1)
+
+    def score(self, tids: List[int], mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25Index.score와 같은 형식 (문서 번호 오름차순, 점수)"""
+        tids = [tid for tid in tids if tid < len(self.idf)]
+        if not tids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+
+        docs_parts = []
+        contrib_parts = []
+        for tid in tids:
+            start, end = self.term_offsets[tid], self.term_offsets[tid + 1]
+            docs, w = self.post_docs[start:end], self.post_weights[start:end]
+            if mask is not None:
+                keep = mask[docs]
+                docs, w = docs[keep], w[keep]
+            docs_parts.append(docs)
+            contrib_parts.append(self.idf[tid] * w * (self.k1 + 1) / (self.k1 + w))
+
+        doc_nos, inverse = np.unique(np.concatenate(docs_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contrib_parts), minlength=len(doc_nos))
+        return doc_nos, scores
+
+    def top_k(self, tids: List[int], k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25Index.top_k와 같은 형식"""
+        tids = [tid for tid in tids if tid < len(self.idf) and self.max_weights[tid] > 0]
+        if not tids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+        return max_score_top_k(self, tids, k, mask)
+
+    def weight_matrix(self) -> sparse.csr_matrix:
+        """BM25Index.weight_matrix와 같은 형식"""
+        if self._matrix is None:
+            term_col = np.repeat(np.arange(len(self.idf)), np.diff(self.term_offsets))
+            w = self.post_weights
+            self._matrix = sparse.csr_matrix(
+                (self.idf[term_col] * w * (self.k1 + 1) / (self.k1 + w), self.post_docs, self.term_offsets),
+                shape=(len(self.idf), self.num_slots)
+            )
+        return self._matrix
+
+    def upper_bounds(self, tids: np.ndarray) -> np.ndarray:
+        w = self.max_weights[tids]
+        return self.idf[tids] * w * (self.k1 + 1) / (self.k1 + w)
+
+    def postings(self, tid: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.term_offsets[tid], self.term_offsets[tid + 1]
+        return self.post_docs[start:end], self.post_weights[start:end]
+
+    def term_scores(self, tid: int, docs: np.ndarray, w: np.ndarray) -> np.ndarray:
+        return self.idf[tid] * w * (self.k1 + 1) / (self.k1 + w)
+
+
+def _offset_dtype(size: int) -> type:
+    """오프셋 배열 dtype (가능하면 int32)"""
+    return np.int32 if size <= np.iinfo(np.int32).max else np.int64
+
+
+class PositionalIndex:
+    """
+    위치 포스팅 (구문 / 근접 점수용)
+
+    - 용어별 (문서 번호, 위치 목록)을 CSR로 보관: term_offsets -> post_docs, pos_offsets -> positions
+    - 위치는 문서 길이가 허용하면 uint16으로 저장 (메모리 절약)
+    - 추가 문서는 델타에 보관 후 일정 크기를 넘으면 병합
+    - 삭제 문서는 조회 대상(활성 후보 문서)에서 빠지므로 별도 처리 없음
+    """
+
+    DELTA_MERGE_MIN = 4096
+    DELTA_MERGE_RATIO = 0.25
 
     def __init__(self):
-        self.bm25 = None
-        self.documents = []  # 원본 문서 (토큰화 전)
-        self.doc_ids = []    # 문서 ID
-        self.doc_metadata = {}  # ID -> metadata
-        self.tokenized_docs = []  # 토큰화된 문서
-        self._initialized = False
+        self.term_offsets = np.zeros(1, dtype=np.int64)
+        self.post_docs = np.zeros(0, dtype=np.int32)
+        self.pos_offsets = np.zeros(1, dtype=np.int64)
+        self.positions = np.zeros(0, dtype=np.uint16)
+        # 델타: term id -> {문서 번호: 위치 배열}
+        self._delta: Dict[int, Dict[int, np.ndarray]] = {}
+        self._delta_size = 0
 
-    def initialize(self, documents: List[Dict[str, Any]]) -> None:
+    @property
+    def nbytes(self) -> int:
+        """기본 세그먼트 메모리 사용량 (바이트)"""
+        return sum(a.nbytes for a in (self.term_offsets, self.post_docs, self.pos_offsets, self.positions))
+
+    def build(self, doc_terms: List[np.ndarray], num_terms: int = 0) -> None:
+        """문서 번호 순서의 용어 ID 배열(토큰 순서 = 위치)로 생성"""
+        lengths = [len(t) for t in doc_terms]
+        term_col = np.concatenate(doc_terms).astype(np.int64) if doc_terms else np.zeros(0, dtype=np.int64)
+        doc_col = np.repeat(np.arange(len(doc_terms), dtype=np.int32), lengths)
+        pos_col = np.concatenate([np.arange(n) for n in lengths]) if doc_terms else np.zeros(0, dtype=np.int64)
+        if len(term_col):
+            num_terms = max(num_terms, int(term_col.max()) + 1)
+
+        # (용어, 문서, 위치) 순 정렬 - 문서/위치는 이미 오름차순이므로 용어로 안정 정렬
+        order = np.argsort(term_col, kind="stable")
+        term_col, doc_col, pos_col = term_col[order], doc_col[order], pos_col[order]
+
+        # (용어, 문서) 쌍마다 포스팅 하나
+        starts = np.flatnonzero(np.concatenate((
+            [True], (term_col[1:] != term_col[:-1]) | (doc_col[1:] != doc_col[:-1])
+        ))) if len(term_col) else np.zeros(0, dtype=np.int64)
+        self.post_docs = doc_col[starts].astype(np.int32)
+        self.pos_offsets = np.append(starts, len(pos_col)).astype(_offset_dtype(len(pos_col)))
+        self.term_offsets = np.searchsorted(term_col[starts], np.arange(num_terms + 1)).astype(np.int64)
+        dtype = np.uint16 if max(lengths, default=0) <= np.iinfo(np.uint16).max else np.int32
+        self.positions = pos_col.astype(dtype)
+        self._delta = {}
+        self._delta_size = 0
+
+    def add(self, doc_no: int, terms: np.ndarray) -> None:
+        """문서 추가 (문서 번호는 기존보다 커야 함)"""
+        if not len(terms):
+            return
+        order = np.argsort(terms, kind="stable")
+        sorted_terms = terms[order]
+        bounds = np.flatnonzero(np.diff(sorted_terms)) + 1
+        for tid, pos in zip(sorted_terms[np.concatenate(([0], bounds))].tolist(), np.split(order, bounds)):
+            self._delta.setdefault(tid, {})[doc_no] = pos.astype(np.int32)
+            self._delta_size += 1
+
+        if self._delta_size > max(self.DELTA_MERGE_MIN, self.DELTA_MERGE_RATIO * len(self.post_docs)):
+            self._merge_delta()
+
+    def copy(self) -> "PositionalIndex":
+        """증분 갱신용 복사본 (기본 세그먼트 공유, 델타만 복사)"""
+        clone = copy.copy(self)
+        clone._delta = {tid: dict(docs) for tid, docs in self._delta.items()}
+        return clone
+
+    def positions_in(self, tid: int, doc_nos: np.ndarray) -> List[np.ndarray]:
+        """용어의 문서별 위치 배열 (doc_nos 순서, 없으면 빈 배열)"""
+        result = [_EMPTY_TERMS] * len(doc_nos)
+        if tid + 1 < len(self.term_offsets):
+            start, end = self.term_offsets[tid], self.term_offsets[tid + 1]
+            docs = self.post_docs[start:end]
+            if len(docs):
+                idx = np.minimum(np.searchsorted(docs, doc_nos), len(docs) - 1)
+                for i in np.flatnonzero(docs[idx] == doc_nos).tolist():
+                    p = start + idx[i]
+                    result[i] = self.positions[self.pos_offsets[p]:self.pos_offsets[p + 1]]
+
+        delta = self._delta.get(tid)
+        if delta:
+            for i, doc_no in enumerate(doc_nos.tolist()):
+                pos = delta.get(doc_no)
+                if pos is not None:
+                    result[i] = pos
+        return result
+
+    def proximity(self, pairs: List[Tuple[int, int]], doc_nos: np.ndarray, window: int) -> np.ndarray:
         """
-        BM25 인덱스 초기화
+        질의 인접 용어 쌍의 근접도 평균 (0~1)
+
+        - 같은 순서로 바로 붙어 있으면 (구문 일치) 1.0
+        - 순서 무관 거리 d <= window이면 0.5 * (window - d + 1) / window
+        """
+        result = np.zeros(len(doc_nos), dtype=np.float64)
+        if not pairs or not len(doc_nos):
+            return result
+
+        for a, b in pairs:
+            for i, (pa, pb) in enumerate(zip(self.positions_in(a, doc_nos), self.positions_in(b, doc_nos))):
+                if not len(pa) or not len(pb):
+                    continue
+                gaps = pb.astype(np.int64)[None, :] - pa.astype(np.int64)[:, None]
+                if (gaps == 1).any():
+                    result[i] += 1.0
+                    continue
+                distance = int(np.abs(gaps).min())
+                if distance <= window:
+                    result[i] += 0.5 * (window - distance + 1) / window
+        return result / len(pairs)
+
+    def _merge_delta(self) -> None:
+        num_terms = max(len(self.term_offsets) - 1, max(self._delta, default=-1) + 1)
+        docs_parts, pos_parts, pos_lengths, term_lengths = [], [], [], np.zeros(num_terms, dtype=np.int64)
+        for tid in range(num_terms):
+            if tid + 1 < len(self.term_offsets):
+                start, end = self.term_offsets[tid], self.term_offsets[tid + 1]
+                docs_parts.append(self.post_docs[start:end])
+                pos_parts.append(self.positions[self.pos_offsets[start]:self.pos_offsets[end]])
+                pos_lengths.append(np.diff(self.pos_offsets[start:end + 1]))
+                term_lengths[tid] += end - start
+            for doc_no, pos in sorted(self._delta.get(tid, {}).items()):
+                docs_parts.append(np.array([doc_no], dtype=np.int32))
+                pos_parts.append(pos)
+                pos_lengths.append(np.array([len(pos)], dtype=np.int64))
+                term_lengths[tid] += 1
+
+        self.term_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(term_lengths, out=self.term_offsets[1:])
+        self.post_docs = np.concatenate(docs_parts).astype(np.int32) if docs_parts else np.zeros(0, dtype=np.int32)
+        lengths = np.concatenate(pos_lengths) if pos_lengths else np.zeros(0, dtype=np.int64)
+        self.pos_offsets = np.zeros(len(lengths) + 1, dtype=_offset_dtype(int(lengths.sum())))
+        np.cumsum(lengths, out=self.pos_offsets[1:])
+        positions = np.concatenate(pos_parts) if pos_parts else np.zeros(0, dtype=np.int64)
+        dtype = np.uint16 if not len(positions) or positions.max() <= np.iinfo(np.uint16).max else np.int32
+        self.positions = positions.astype(dtype)
+        self._delta = {}
+        self._delta_size = 0
+
+
+def top_k_indices(scores: np.ndarray, k: int, tiebreak: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    점수 상위 k개 인덱스 (내림차순)
+
+    argpartition으로 후보를 좁힌 뒤 후보만 정렬, 동점은 tiebreak(기본: 배열 순서) 오름차순
+    """
+    n = len(scores)
+    if tiebreak is None:
+        tiebreak = np.arange(n)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((tiebreak[candidates], -scores[candidates]))
+    return candidates[order][:k]
+
+
+def max_score_top_k(
+    index: Any,
+    tids: List[int],
+    k: int,
+    mask: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MaxScore 동적 가지치기 상위 K 검색 (용어 단위, NumPy 벡터화)
+
+    점수 상한이 큰(희귀) 용어부터 처리하면서 현재 k번째 점수(임계값)를 갱신
+    - 남은 용어 상한 합 < 임계값: 새 문서는 상위 K에 들 수 없으므로 기존 후보만 갱신
+      (흔한 용어의 긴 포스팅은 후보 문서 위치만 이진 탐색)
+    - 후보 점수 + 남은 상한 합 < 임계값: 후보에서 제외
+    전체 점수 계산 후 정렬한 결과와 같은 상위 K (동점은 문서 번호 순)
+
+    Args:
+        index: upper_bounds / postings / term_scores / score를 제공하는 인덱스
+        tids: 질의 용어 ID (중복 허용, 중복 수만큼 가중)
+    """
+    empty = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+    if k <= 0:
+        return empty
+
+    uniq, counts = np.unique(np.asarray(tids, dtype=np.int64), return_counts=True)
+    bounds = index.upper_bounds(uniq) * counts
+    if (bounds <= 0).any():
+        # 음수/0 기여 용어가 있으면 상한 논리가 성립하지 않으므로 전체 계산
+        doc_nos, scores = index.score(tids, mask)
+        positive = scores > 0
+        doc_nos, scores = doc_nos[positive], scores[positive]
+        order = top_k_indices(scores, k)
+        return doc_nos[order], scores[order]
+
+    order = np.argsort(-bounds, kind="stable")
+    # remaining[i]: i번째 이후(포함) 용어 상한 합
+    remaining = np.append(np.cumsum(bounds[order][::-1])[::-1], 0.0)
+
+    cand_docs, cand_scores = empty
+    threshold = 0.0
+    for i, j in enumerate(order.tolist()):
+        tid = int(uniq[j])
+        docs, payload = index.postings(tid)
+
+        if len(cand_docs) < k or remaining[i] >= threshold:
+            # 새 문서도 상위 K에 들 수 있음 -> 포스팅 전체 점수 계산
+            if mask is not None:
+                keep = mask[docs]
+                docs, payload = docs[keep], payload[keep]
+            contrib = index.term_scores(tid, docs, payload) * counts[j]
+            cand_docs, inverse = np.unique(np.concatenate([cand_docs, docs]), return_inverse=True)
+            cand_scores = np.bincount(
+                inverse, weights=np.concatenate([cand_scores, contrib]), minlength=len(cand_docs)
+            )
+        elif len(docs):
+            # 기존 후보만 갱신 (포스팅은 문서 번호 오름차순)
+            pos = np.minimum(np.searchsorted(docs, cand_docs), len(docs) - 1)
+            hit = docs[pos] == cand_docs
+            if hit.any():
+                pos = pos[hit]
+                cand_scores[hit] += index.term_scores(tid, docs[pos], payload[pos]) * counts[j]
+
+        if len(cand_docs) >= k:
+            threshold = np.partition(cand_scores, len(cand_scores) - k)[len(cand_scores) - k]
+            keep = cand_scores + remaining[i + 1] >= threshold
+            cand_docs, cand_scores = cand_docs[keep], cand_scores[keep]
+
+    top = top_k_indices(cand_scores, k)
+    return cand_docs[top], cand_scores[top]
+
+
+# === 점수 결합 (Fusion) 전략 ===
+# 입력: 후보 문서별로 정렬된 배열
+#   vec, bm25: 각 검색의 점수 (없으면 0)
+#   vec_rank, bm25_rank: 각 검색의 순위 (1부터, 없으면 0)
+# 출력: 0~1 범위의 결합 점수
+
+RRF_K = 60
+
+
+def count_hits(index: Any, tids: List[int], mask: Optional[np.ndarray] = None, limit: int = 1) -> int:
+    """
+    점수가 0보다 큰 (후보) 문서 수, limit 이상이 되면 바로 반환
+
+    MaxScore 결과는 상위 K로 잘려 전체 결과 수를 알 수 없으므로, 결과 수로 판단하는 경우
+    (n-gram 보완) 포스팅이 긴 용어부터 합집합을 만들어 limit까지만 확인
+    (IDF가 양수인 용어를 포함한 문서만 점수가 양수)
+    """
+    postings = [
+        index.postings(tid)[0] for tid in set(tids)
+        if tid < len(index.idf) and index.idf[tid] > 0
+    ]
+    hits = np.zeros(0, dtype=np.int32)
+    for docs in sorted(postings, key=len, reverse=True):
+        if mask is not None:
+            docs = docs[mask[docs]]
+        hits = np.union1d(hits, docs)
+        if len(hits) >= limit:
+            break
+    return len(hits)
+
+
+def _fuse_weighted(vec, bm25, vec_rank, bm25_rank, vector_weight, bm25_weight):
+    """가중합 (기존 방식)"""
+    return vec * vector_weight + bm25 * bm25_weight
+
+
+def _fuse_rrf(vec, bm25, vec_rank, bm25_rank, vector_weight, bm25_weight):
+    """Reciprocal Rank Fusion (두 검색 모두 1위일 때 1.0이 되도록 정규화)"""
+    fused = np.zeros(len(vec))
+    for ranks, weight in ((vec_rank, vector_weight), (bm25_rank, bm25_weight)):
+        hit = ranks > 0
+        fused[hit] += weight / (RRF_K + ranks[hit])
+    max_score = (vector_weight + bm25_weight) / (RRF_K + 1)
+    return fused / max_score if max_score > 0 else fused
+
+
+def _fuse_zscore(vec, bm25, vec_rank, bm25_rank, vector_weight, bm25_weight):
+    """검색별 z-score 정규화 후 가중합 (결과에 없는 문서는 해당 검색의 최저 z-score), 시그모이드로 0~1 변환"""
+    fused = np.zeros(len(vec))
+    for scores, ranks, weight in ((vec, vec_rank, vector_weight), (bm25, bm25_rank, bm25_weight)):
+        hit = ranks > 0
+        if not hit.any():
+            continue
+        values = scores[hit]
+        std = values.std()
+        z = (values - values.mean()) / std if std > 0 else np.zeros(len(values))
+        leg = np.full(len(vec), z.min())
+        leg[hit] = z
+        fused += weight * leg
+    return 1 / (1 + np.exp(-fused))
+
+
+FUSION_STRATEGIES = {
+    "weighted": _fuse_weighted,
+    "rrf": _fuse_rrf,
+    "zscore": _fuse_zscore,
+}
+
+
+class SnapshotMetadata(MutableMapping):
+    """
+    스냅샷 파일에서 로드한 문서 메타데이터 (ID -> dict)
+
+    - 기본 값은 메모리 매핑된 JSON 문자열 열 (읽을 때 디코딩)
+    - 갱신 / 삭제는 복사본별 오버레이에 기록 (삭제는 None)
+    """
+
+    def __init__(self, rows: Dict[str, int], column: StringColumn):
+        self._rows = rows  # ID -> 열 번호 (로드 시점, 변경하지 않음)
+        self._column = column
+        self._overlay: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def __getitem__(self, doc_id: str) -> Dict[str, Any]:
+        if doc_id in self._overlay:
+            metadata = self._overlay[doc_id]
+            if metadata is None:
+                raise KeyError(doc_id)
+            return metadata
+        return json.loads(self._column[self._rows[doc_id]])
+
+    def __setitem__(self, doc_id: str, metadata: Dict[str, Any]) -> None:
+        self._overlay[doc_id] = metadata
+
+    def __delitem__(self, doc_id: str) -> None:
+        if doc_id not in self:
+            raise KeyError(doc_id)
+        self._overlay[doc_id] = None
+
+    def __contains__(self, doc_id: object) -> bool:
+        if doc_id in self._overlay:
+            return self._overlay[doc_id] is not None
+        return doc_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        for doc_id in self._rows:
+            if doc_id not in self._overlay:
+                yield doc_id
+        for doc_id, metadata in self._overlay.items():
+            if metadata is not None:
+                yield doc_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> "SnapshotMetadata":
+        clone = copy.copy(self)
+        clone._overlay = dict(self._overlay)
+        return clone
+
+
+class IndexSnapshot:
+    """
+    렉시컬 인덱스 스냅샷 (게시 후에는 변경하지 않음)
+
+    - 검색은 시작 시점의 스냅샷 참조 하나만 사용 -> 재색인 중에도 일관된 결과 (잠금 없음)
+    - 재구축은 새 스냅샷을 만들고, 증분 갱신은 copy()로 복사본을 수정한 뒤
+      HybridSearcher가 참조 한 번으로 교체 (copy-on-write)
+    - BM25F / n-gram / 위치 포스팅은 스냅샷 내용에서 결정되는 파생 인덱스로 필요할 때 생성
+      (동시에 생성되어도 결과가 같으므로 마지막 대입만 남음)
+    """
+
+    def __init__(self, scoring: str = "bm25", field_weights: Optional[Dict[str, float]] = None):
+        self.bm25: Optional[BM25Index] = None
+        # 스냅샷 파일에서 로드하면 문서 / ID는 StringColumn, 메타데이터는 SnapshotMetadata (메모리 매핑)
+        self.documents: List[str] = []  # 원본 문서 (토큰화 전)
+        self.doc_ids: List[Optional[str]] = []  # 문서 ID (삭제된 번호는 None)
+        self.doc_metadata: Dict[str, Dict[str, Any]] = {}  # ID -> metadata
+        self.tokenized_docs: List[Optional[np.ndarray]] = []  # 용어 ID int32 배열 (None이면 필요할 때 토큰화)
+        self.vocab = Vocabulary()  # 용어 <-> ID (추가만 하므로 스냅샷 간 공유)
+        self.id_to_doc: Dict[str, int] = {}  # ID -> 문서 번호
+        self.attributes = AttributeIndex()  # 필터 조건용 장비 속성 인덱스 (문서 번호 기준)
+        self.num_deleted = 0  # 삭제되어 비어 있는 문서 번호 수
+        # 렉시컬 점수 방식: "bm25" (단일 텍스트) 또는 "bm25f" (필드 가중)
+        self.scoring = scoring
+        self.field_weights = dict(field_weights or settings.BM25F_FIELD_WEIGHTS)
+
+        # 파생 인덱스 (필요 시 생성)
+        self.bm25f: Optional[BM25FIndex] = None
+        self.ngram: Optional[Tuple[Vocabulary, BM25Index]] = None  # 한글 글자 n-gram (사전, 인덱스)
+        self.positional: Optional[PositionalIndex] = None
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: List[Dict[str, Any]],
+        scoring: str = "bm25",
+        field_weights: Optional[Dict[str, float]] = None
+    ) -> "IndexSnapshot":
+        """
+        문서 목록으로 새 스냅샷 생성
 
         Args:
             documents: [{"id": "...", "text": "...", "metadata": {...}}, ...]
         """
-        self.documents = []
-        self.doc_ids = []
-        self.doc_metadata = {}
-        self.tokenized_docs = []
-
+        snap = cls(scoring, field_weights)
         for doc in documents:
             doc_id = doc.get("id", "")
             text = doc.get("text", "")
-            metadata = doc.get("metadata", {})
 
-            self.doc_ids.append(doc_id)
-            self.documents.append(text)
-            self.doc_metadata[doc_id] = metadata
+            snap.id_to_doc[doc_id] = len(snap.doc_ids)
+            snap.doc_ids.append(doc_id)
+            snap.documents.append(text)
+            snap.doc_metadata[doc_id] = doc.get("metadata", {})
 
-            # 토큰화 (한국어 + 영어 + 숫자 + 특수 단위)
-            tokens = self._tokenize(text)
-            self.tokenized_docs.append(tokens)
+            # 토큰화 (한국어 + 영어 + 숫자 + 특수 단위) -> 용어 ID 배열
+            snap.tokenized_docs.append(snap.vocab.encode(tokenize(text)))
 
-        # BM25 인덱스 생성
-        if self.tokenized_docs:
-            self.bm25 = BM25Okapi(self.tokenized_docs)
+        # BM25 역색인 + 필터용 속성 인덱스 생성
+        snap.bm25 = snap._build_index(snap.tokenized_docs)
+        snap._rebuild_attributes()
+        return snap
 
-        self._initialized = True
-        print(f"[HybridSearch] Initialized with {len(self.doc_ids)} documents")
+    @property
+    def num_live(self) -> int:
+        return len(self.id_to_doc)
+
+    def copy(self) -> "IndexSnapshot":
+        """증분 갱신용 복사본 (문서 수에 비례하는 참조 복사, 포스팅 배열은 공유)"""
+        clone = copy.copy(self)
+        clone.bm25 = self.bm25.copy() if self.bm25 is not None else None
+        clone.documents = self.documents.copy()
+        clone.doc_ids = self.doc_ids.copy()
+        clone.doc_metadata = self.doc_metadata.copy()
+        clone.tokenized_docs = list(self.tokenized_docs)
+        clone.id_to_doc = dict(self.id_to_doc)
+        clone.attributes = self.attributes.copy()
+        # BM25F는 문서 변경 시 전체 재생성, n-gram / 위치 포스팅은 증분 갱신
+        clone.bm25f = None
+        if self.ngram is not None:
+            clone.ngram = (self.ngram[0], self.ngram[1].copy())
+        if self.positional is not None:
+            clone.positional = self.positional.copy()
+        return clone
+
+    def prepare(self) -> "IndexSnapshot":
+        """게시 전 준비: 검색 시 상태 변경이 없도록 통계 / BM25F를 미리 계산"""
+        if self.bm25 is not None:
+            self.bm25._refresh_stats()
+        if self.ngram is not None:
+            self.ngram[1]._refresh_stats()
+        self.lexical_index()
+        return self
+
+    # === 증분 갱신 (게시 전 복사본에만 사용) ===
 
-    def _tokenize(self, text: str) -> List[str]:
+    def upsert(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """
-        텍스트 토큰화 (기술 용어 보존)
+        문서 추가/갱신 (인덱스 재구축 없이 O(문서 길이))
 
-        - 숫자+단위 보존 (6inch, 400℃, 5nm 등)
-        - 영문 약어 보존 (MOCVD, RTA, PECVD 등)
-        - 한글 단어 분리
+        기존 문서는 삭제 처리 후 새 문서 번호로 다시 추가
         """
-        if not text:
-            return []
+        self.remove(doc_id)
+
+        terms = self.vocab.encode(tokenize(text))
+        if self.bm25 is None:
+            self.bm25 = BM25Index()
+
+        doc_no = self.bm25.add(terms)
+        if self.ngram is not None:
+            self.ngram[1].add(self.ngram_terms(text))
+        if self.positional is not None:
+            self.positional.add(doc_no, terms)
+        self.id_to_doc[doc_id] = doc_no
+        self.doc_ids.append(doc_id)
+        self.documents.append(text)
+        self.doc_metadata[doc_id] = metadata or {}
+        self.attributes.add(doc_no, EquipmentRecord(doc_id, metadata or {}))
+        self.bm25f = None
+        self.tokenized_docs.append(terms)
+
+    def remove(self, doc_id: str) -> bool:
+        """문서 삭제 (O(문서 길이)), 삭제 여부 반환"""
+        doc_no = self.id_to_doc.pop(doc_id, None)
+        if doc_no is None:
+            return False
+
+        self.bm25.remove(doc_no, self.doc_tokens(doc_no))
+        if self.ngram is not None:
+            self.ngram[1].remove(doc_no, self.ngram_terms(self.documents[doc_no]))
+        self.doc_ids[doc_no] = None
+        self.documents[doc_no] = ""
+        self.tokenized_docs[doc_no] = _EMPTY_TERMS
+        self.doc_metadata.pop(doc_id, None)
+        self.attributes.remove(doc_no)
+        self.num_deleted += 1
+        self.bm25f = None
+        return True
+
+    def compacted(self) -> "IndexSnapshot":
+        """삭제된 문서 번호를 정리한 새 스냅샷 (역색인 재구축)"""
+        live = [i for i, doc_id in enumerate(self.doc_ids) if doc_id is not None]
+        snap = IndexSnapshot(self.scoring, self.field_weights)
+        snap.vocab = self.vocab
+        snap.doc_ids = [self.doc_ids[i] for i in live]
+        snap.documents = [self.documents[i] for i in live]
+        snap.doc_metadata = self.doc_metadata.copy()
+        snap.tokenized_docs = [self.doc_tokens(i) for i in live]
+        snap.id_to_doc = {doc_id: i for i, doc_id in enumerate(snap.doc_ids)}
+        snap.bm25 = snap._build_index(snap.tokenized_docs)
+        snap._rebuild_attributes()
+        return snap
+
+    # === 파생 인덱스 ===
+
+    def lexical_index(self):
+        """점수 계산에 사용할 인덱스 (bm25f 모드면 필요 시 BM25F 생성)"""
+        if self.scoring != "bm25f" or self.bm25 is None:
+            return self.bm25
+
+        bm25f = self.bm25f
+        if bm25f is None:
+            bm25f = BM25FIndex(self.field_weights)
+            field_terms = [
+                self.field_terms(doc_id) if doc_id is not None else None
+                for doc_id in self.doc_ids
+            ]
+            bm25f.build(field_terms, len(self.vocab))
+            self.bm25f = bm25f
+        return bm25f
+
+    def ngram_index(self) -> Tuple[Vocabulary, BM25Index]:
+        """한글 n-gram (사전, 인덱스) - 문서 번호는 기본 인덱스와 동일"""
+        ngram = self.ngram
+        if ngram is None:
+            vocab = Vocabulary()
+            index = BM25Index()
+            index.build(
+                [vocab.encode(hangul_ngrams(tokenize(text))) for text in self.documents], len(vocab)
+            )
+            for doc_no, doc_id in enumerate(self.doc_ids):
+                if doc_id is None:
+                    index.remove(doc_no, _EMPTY_TERMS)
+            index._refresh_stats()
+            ngram = (vocab, index)
+            self.ngram = ngram
+        return ngram
+
+    def positional_index(self) -> PositionalIndex:
+        """위치 포스팅 (문서 번호는 기본 인덱스와 동일, 삭제된 문서는 빈 문서)"""
+        positional = self.positional
+        if positional is None:
+            positional = PositionalIndex()
+            positional.build(
+                [self.doc_tokens(i) if doc_id is not None else _EMPTY_TERMS for i, doc_id in enumerate(self.doc_ids)],
+                len(self.vocab)
+            )
+            self.positional = positional
+        return positional
+
+    def ngram_terms(self, text: str) -> np.ndarray:
+        return self.ngram_index()[0].encode(hangul_ngrams(tokenize(text)))
+
+    def field_terms(self, doc_id: str) -> Dict[str, np.ndarray]:
+        """메타데이터에서 BM25F 필드별 용어 ID 추출 (필드 정보가 없으면 전체 텍스트를 설명으로)"""
+        meta = self.doc_metadata.get(doc_id, {})
+        if not meta.get("name"):
+            return {"description": self.doc_tokens(self.id_to_doc[doc_id])}
+
+        def terms(*keys):
+            text = " ".join(str(meta.get(k) or "").replace(",", " ") for k in keys)
+            return self.vocab.encode(tokenize(text))
+
+        return {
+            "name": terms("name", "name_en"),
+            "tags": terms("tags"),
+            "category": terms("category", "part"),
+            "specs": terms("wafer_sizes", "materials"),
+            "institution": terms("institution"),
+            "description": terms("description"),
+        }
+
+    def doc_tokens(self, doc_no: int) -> np.ndarray:
+        """문서 용어 ID 배열 (스냅샷 파일에서 로드한 문서는 필요할 때 토큰화)"""
+        terms = self.tokenized_docs[doc_no]
+        if terms is None:
+            terms = self.vocab.encode(tokenize(self.documents[doc_no]))
+            self.tokenized_docs[doc_no] = terms
+        return terms
+
+    def _rebuild_attributes(self) -> None:
+        self.attributes = AttributeIndex.from_metadatas(
+            self.doc_ids, [self.doc_metadata.get(doc_id) if doc_id is not None else None for doc_id in self.doc_ids]
+        )
+
+    def _build_index(self, tokenized_docs: List[np.ndarray]) -> Optional[BM25Index]:
+        """BM25 역색인 생성 (문서가 없으면 None)"""
+        if not tokenized_docs:
+            return None
+        index = BM25Index()
+        index.build(tokenized_docs, len(self.vocab))
+        return index
+
+
+class HybridSearcher:
+    """
+    하이브리드 검색 (BM25 + Vector)
+
+    인덱스 상태는 IndexSnapshot 하나로 보관하고 갱신 시 참조를 통째로 교체
+    - 검색: 잠금 없이 현재 스냅샷 참조만 사용
+    - 갱신(초기화 / 추가 / 삭제 / 재구축 / 로드): 쓰기 잠금으로 직렬화, 새 스냅샷을 만든 뒤 게시
+    """
+
+    # 삭제된 문서 번호가 이 수와 활성 문서 수를 모두 넘으면 문서 번호를 압축
+    COMPACT_MIN_DELETED = 256
+    # 스냅샷 파일 배치 버전 (용어 / 문서 / 메타데이터 / 속성 인덱스를 배열 섹션으로 저장)
+    SNAPSHOT_LAYOUT = 3
+
+    def __init__(self):
+        # 렉시컬 점수 방식: "bm25" (단일 텍스트) 또는 "bm25f" (필드 가중) - 다음 초기화부터 적용
+        self.scoring = settings.LEXICAL_SCORING
+        self.field_weights = dict(settings.BM25F_FIELD_WEIGHTS)
+        self._snapshot = IndexSnapshot(self.scoring, self.field_weights)
+        self._write_lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 같은 임시 파일에 동시에 쓰지 않도록
+        self._initialized = False
+
+    @property
+    def snapshot(self) -> IndexSnapshot:
+        """현재 게시된 인덱스 스냅샷 (변경 금지)"""
+        return self._snapshot
+
+    @property
+    def bm25(self) -> Optional[BM25Index]:
+        return self._snapshot.bm25
 
-        text = text.lower()
+    @property
+    def doc_ids(self) -> List[Optional[str]]:
+        return self._snapshot.doc_ids
 
-        # 특수 패턴 보존 (숫자+단위)
-        # 6 inch -> 6inch, 400 ℃ -> 400℃
-        text = re.sub(r'(\d+)\s*(inch|인치|nm|um|mm|cm|℃|도|°c|°)', r'\1\2', text)
+    @property
+    def documents(self) -> List[str]:
+        return self._snapshot.documents
 
-        # 토큰 분리
-        # 영문, 숫자+단위, 한글 단어 추출
-        tokens = re.findall(r'[a-zA-Z]+[\d]*|[\d]+[a-zA-Z℃°]+|[가-힣]+', text)
+    @property
+    def doc_metadata(self) -> Dict[str, Dict[str, Any]]:
+        return self._snapshot.doc_metadata
+
+    def _publish(self, snap: IndexSnapshot) -> None:
+        """스냅샷 게시 (참조 교체 한 번, 쓰기 잠금 안에서 호출)"""
+        self._snapshot = snap.prepare()
+        self._initialized = True
 
-        # 불용어 제거
-        stopwords = {'의', '가', '이', '은', '는', '을', '를', '에', '에서', '로', '으로',
-                     '와', '과', '도', '만', '까지', 'the', 'a', 'an', 'is', 'are', 'for'}
-        tokens = [t for t in tokens if t not in stopwords and len(t) > 1]
+    def initialize(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        BM25 인덱스 초기화 (새 스냅샷을 만든 뒤 교체 - 생성 중에도 기존 인덱스로 검색)
 
-        return tokens
+        Args:
+            documents: [{"id": "...", "text": "...", "metadata": {...}}, ...]
+        """
+        snap = IndexSnapshot.from_documents(documents, self.scoring, self.field_weights)
+        with self._write_lock:
+            self._publish(snap)
+        print(f"[HybridSearch] Initialized with {len(snap.doc_ids)} documents")
 
-    def search_bm25(self, query: str, top_k: int = 20) -> List[Dict[str, Any]]:
+    def search_bm25(
+        self,
+        query: str,
+        top_k: int = 20,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         BM25 키워드 검색
 
+        Args:
+            query: 검색 쿼리
+            top_k: 반환할 결과 수
+            filters: 메타데이터 필터 (벡터 검색과 같은 키: category, institution, wafer_size, material, temp_min, temp_max)
+
         Returns:
             [{"id": "...", "score": 0.85, "metadata": {...}}, ...]
         """
-        if not self._initialized or not self.bm25:
-            return []
+        snap = self._snapshot
+        return self._format_bm25(snap, *self._bm25_top_k(snap, query, top_k, filters))
 
-        query_tokens = self._tokenize(query)
-        if not query_tokens:
-            return []
+    def search_bm25_many(
+        self,
+        queries: List[str],
+        top_k: int = 20,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        BM25 일괄 검색 (평가 / 캐시 예열용)
 
-        # BM25 점수 계산
-        scores = self.bm25.get_scores(query_tokens)
+        질의 용어 빈도 행렬 x 용어-문서 가중치 행렬의 희소 행렬 곱 한 번으로
+        모든 질의 점수를 계산한 뒤 질의별 상위 K 선택 (결과는 search_bm25와 동일)
 
-        # 결과 정렬
-        scored_docs = list(zip(self.doc_ids, scores))
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            질의 순서대로 search_bm25 결과 목록
+        """
+        snap = self._snapshot
+        return [
+            self._format_bm25(snap, *hits)
+            for hits in self._bm25_top_k_many(snap, queries, top_k, filters)
+        ]
 
-        # 상위 K개 반환
+    def _format_bm25(self, snap: IndexSnapshot, doc_nos: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
         results = []
-        max_score = max(scores) if scores.any() else 1
+        for doc_no, score in zip(doc_nos.tolist(), scores.tolist()):
+            doc_id = snap.doc_ids[doc_no]
+            results.append({
+                "id": doc_id,
+                "bm25_score": round(score, 4),
+                "metadata": snap.doc_metadata.get(doc_id, {})
+            })
+        return results
 
-        for doc_id, score in scored_docs[:top_k]:
-            if score > 0:  # 0점 제외
-                normalized_score = score / max_score if max_score > 0 else 0
-                results.append({
-                    "id": doc_id,
-                    "bm25_score": round(normalized_score, 4),
-                    "metadata": self.doc_metadata.get(doc_id, {})
-                })
+    def _bm25_top_k(
+        self,
+        snap: IndexSnapshot,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 상위 K개 (문서 번호, 최고점 대비 정규화 점수) - 점수 내림차순
+        """
+        empty = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+        if not snap.bm25:
+            return empty
+
+        # 질의 토큰화 (LRU 캐시) -> 용어 ID (사전에 없는 용어 제외)
+        query_tokens = tokenize_query(query)
+        if not query_tokens:
+            return empty
+        query_terms = snap.vocab.lookup(query_tokens)
+
+        # 필터 후보 집합 (속성 인덱스, 벡터 검색 필터와 같은 규칙)
+        mask = snap.attributes.mask(normalize_filters(filters))
+        if mask is not None and not mask.any():
+            return empty
+
+        # BM25(F) 점수 계산 (질의 용어를 포함한 후보 문서만)
+        index = snap.lexical_index()
+        pairs = self._query_pairs(snap, query_tokens) if settings.PHRASE_BOOST > 0 else []
+        # 구문 재순위 시에는 더 넓은 후보에서 상위 K 선택
+        pool_k = top_k * settings.PHRASE_RERANK_DEPTH if pairs else top_k
+        num_hits = None
+        if settings.LEXICAL_TOPK_PRUNING:
+            # MaxScore: 상위 K에 들 수 없는 문서는 점수 계산 생략
+            doc_nos, scores = index.top_k(query_terms, pool_k, mask)
+            if len(doc_nos) < settings.NGRAM_FALLBACK_MIN_HITS:
+                # 상위 K로 잘리기 전 결과 수 (n-gram 보완 여부는 전체 결과 수로 판단)
+                num_hits = count_hits(index, query_terms, mask, settings.NGRAM_FALLBACK_MIN_HITS)
+        else:
+            doc_nos, scores = index.score(query_terms, mask)
 
+        return self._finish_bm25(snap, query_tokens, mask, pairs, pool_k, top_k, doc_nos, scores, num_hits)
+
+    def _bm25_top_k_many(
+        self,
+        snap: IndexSnapshot,
+        queries: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """_bm25_top_k의 일괄 버전 (희소 행렬 곱 한 번)"""
+        empty = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+        if not snap.bm25 or not queries:
+            return [empty] * len(queries)
+
+        mask = snap.attributes.mask(normalize_filters(filters))
+        if mask is not None and not mask.any():
+            return [empty] * len(queries)
+
+        matrix = snap.lexical_index().weight_matrix()
+        num_terms = matrix.shape[0]
+
+        # 질의 x 용어 빈도 행렬 (중복 용어는 합산)
+        token_lists = [tokenize_query(q) for q in queries]
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            tids = [tid for tid in snap.vocab.lookup(tokens) if tid < num_terms]
+            rows.extend([row] * len(tids))
+            cols.extend(tids)
+        query_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(queries), num_terms)
+        )
+        scores_matrix = (query_matrix @ matrix).tocsr()
+        scores_matrix.sort_indices()
+
+        results = []
+        indptr, indices, data = scores_matrix.indptr, scores_matrix.indices, scores_matrix.data
+        for row, tokens in enumerate(token_lists):
+            if not tokens:
+                results.append(empty)
+                continue
+            doc_nos = indices[indptr[row]:indptr[row + 1]].astype(np.int32)
+            scores = data[indptr[row]:indptr[row + 1]]
+            if mask is not None:
+                keep = mask[doc_nos]
+                doc_nos, scores = doc_nos[keep], scores[keep]
+
+            pairs = self._query_pairs(snap, tokens) if settings.PHRASE_BOOST > 0 else []
+            pool_k = top_k * settings.PHRASE_RERANK_DEPTH if pairs else top_k
+            results.append(self._finish_bm25(snap, tokens, mask, pairs, pool_k, top_k, doc_nos, scores))
         return results
 
+    def _finish_bm25(
+        self,
+        snap: IndexSnapshot,
+        query_tokens: Tuple[str, ...],
+        mask: Optional[np.ndarray],
+        pairs: List[Tuple[int, int]],
+        pool_k: int,
+        top_k: int,
+        doc_nos: np.ndarray,
+        scores: np.ndarray,
+        num_hits: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 후보 점수 후처리: 구문 가산 -> 정규화 -> n-gram 보완 -> 상위 K
+
+        Args:
+            num_hits: 후보가 상위 K로 잘린 경우 잘리기 전 결과 수 (None이면 후보 수)
+        """
+        empty = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+
+        # 0점 이하 제외
+        positive = scores > 0
+        doc_nos, scores = doc_nos[positive], scores[positive]
+        if num_hits is None:
+            num_hits = len(doc_nos)
+
+        # 구문 / 근접 가산 (질의의 인접 용어가 문서에서도 붙어 있으면 가산)
+        if pairs and len(doc_nos):
+            if len(doc_nos) > pool_k:
+                pool = top_k_indices(scores, pool_k)
+                doc_nos, scores = doc_nos[pool], scores[pool]
+            proximity = snap.positional_index().proximity(pairs, doc_nos, settings.PHRASE_WINDOW)
+            scores = scores * (1 + settings.PHRASE_BOOST * proximity)
+
+        # 최고점 대비 정규화
+        if len(scores):
+            scores = scores / scores.max()
+
+        # 결과가 적으면 한글 n-gram 인덱스로 보완 (띄어쓰기가 다른 복합명사)
+        if num_hits < settings.NGRAM_FALLBACK_MIN_HITS:
+            doc_nos, scores = self._merge_ngram_hits(snap, query_tokens, mask, doc_nos, scores)
+
+        if not len(scores):
+            return empty
+
+        # 점수 내림차순 (동점은 문서 순서 유지)
+        order = top_k_indices(scores, top_k)
+        return doc_nos[order], scores[order]
+
+    def _query_pairs(self, snap: IndexSnapshot, query_tokens: Tuple[str, ...]) -> List[Tuple[int, int]]:
+        """질의에서 인접한 (사전에 있는) 용어 ID 쌍"""
+        tids = [snap.vocab.get(token) for token in query_tokens]
+        return [
+            (a, b) for a, b in zip(tids, tids[1:])
+            if a is not None and b is not None and a != b
+        ]
+
+    def _merge_ngram_hits(
+        self,
+        snap: IndexSnapshot,
+        query_tokens: Tuple[str, ...],
+        mask: Optional[np.ndarray],
+        doc_nos: np.ndarray,
+        scores: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        n-gram 검색 결과를 기본 결과에 병합
+
+        n-gram으로만 찾은 문서는 최고점 대비 정규화 후 (기본 결과 최저점 x NGRAM_FALLBACK_WEIGHT)로
+        축소하여 항상 기본 검색에서 찾은 문서보다 뒤에 두고, 겹치는 문서는 기본 점수 사용
+        """
+        ngram_vocab, index = snap.ngram_index()
+        gram_terms = ngram_vocab.lookup(hangul_ngrams(query_tokens))
+        if not gram_terms:
+            return doc_nos, scores
+
+        gram_docs, gram_scores = index.score(gram_terms, mask)
+        positive = gram_scores > 0
+        gram_docs, gram_scores = gram_docs[positive], gram_scores[positive]
+        if not len(gram_scores):
+            return doc_nos, scores
+        ceiling = scores.min() if len(scores) else 1.0
+        gram_scores = gram_scores / gram_scores.max() * (ceiling * settings.NGRAM_FALLBACK_WEIGHT)
+
+        extra = ~np.isin(gram_docs, doc_nos)
+        merged_docs = np.concatenate([doc_nos, gram_docs[extra]])
+        merged_scores = np.concatenate([scores, gram_scores[extra]])
+        # 문서 번호 순 (동점일 때 문서 순서 유지)
+        order = np.argsort(merged_docs, kind="stable")
+        return merged_docs[order], merged_scores[order]
+
     def hybrid_search(
         self,
         query: str,
         vector_results: List[Dict[str, Any]],
         top_k: int = 10,
         vector_weight: float = 0.5,
-        bm25_weight: float = 0.5
+        bm25_weight: float = 0.5,
+        fusion: str = "weighted",
+        candidate_k: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        lexical: Optional[Tuple[IndexSnapshot, np.ndarray, np.ndarray]] = None
     ) -> List[Dict[str, Any]]:
         """
         하이브리드 검색 (BM25 + Vector 결합)
@@ -137,79 +1471,260 @@ class HybridSearcher:
             top_k: 반환할 결과 수
             vector_weight: 벡터 검색 가중치 (기본 0.5)
             bm25_weight: BM25 가중치 (기본 0.5)
+            fusion: 점수 결합 방식 ("weighted", "rrf", "zscore")
+            candidate_k: BM25 후보 수 (기본 top_k * 2)
+            filters: 메타데이터 필터 (BM25도 벡터 검색과 같은 후보 집합에서 검색)
+            lexical: 미리 계산한 BM25 후보 (lexical_candidates 결과, 없으면 여기서 검색)
 
         Returns:
             결합된 결과 (hybrid_score 포함)
         """
-        # BM25 검색
-        bm25_results = self.search_bm25(query, top_k=top_k * 2)
+        fuse = FUSION_STRATEGIES.get(fusion)
+        if fuse is None:
+            raise ValueError(f"Unknown fusion strategy: {fusion} (available: {list(FUSION_STRATEGIES)})")
 
-        # 결과 통합을 위한 딕셔너리
-        combined = defaultdict(lambda: {
-            "vector_score": 0,
-            "bm25_score": 0,
-            "data": None
-        })
+        # BM25 검색 (검색 동안 같은 스냅샷 사용 -> 재색인과 무관하게 일관된 결과)
+        if lexical is None:
+            lexical = self.lexical_candidates(query, candidate_k or top_k * 2, filters)
+        snap, bm25_docs, bm25_scores = lexical
 
-        # 벡터 검색 결과 추가
-        for item in vector_results:
+        # 벡터 결과를 내부 문서 번호로 변환 (인덱스에 없는 문서는 임시 번호 부여)
+        num_slots = len(snap.doc_ids)
+        vec_docs = np.empty(len(vector_results), dtype=np.int64)
+        extra: Dict[str, int] = {}
+        for i, item in enumerate(vector_results):
             eq_id = item.get("equipment_id", "")
-            combined[eq_id]["vector_score"] = item.get("score", 0)
-            combined[eq_id]["data"] = item
-
-        # BM25 결과 추가
-        for item in bm25_results:
-            eq_id = item.get("id", "")
-            combined[eq_id]["bm25_score"] = item.get("bm25_score", 0)
-            if combined[eq_id]["data"] is None:
-                # 벡터 검색에 없던 항목 (BM25에서만 발견)
-                combined[eq_id]["data"] = {
-                    "equipment_id": eq_id,
-                    **item.get("metadata", {})
-                }
+            doc_no = snap.id_to_doc.get(eq_id)
+            if doc_no is None:
+                doc_no = extra.setdefault(eq_id, num_slots + len(extra))
+            vec_docs[i] = doc_no
+        # 같은 장비가 벡터 결과에 여러 번 있으면 첫 (상위) 항목만 사용 (점수 / 순위 / 결과 항목 일치)
+        _, first = np.unique(vec_docs, return_index=True)
+        if len(first) < len(vec_docs):
+            keep = np.sort(first)
+            vec_docs = vec_docs[keep]
+            vector_results = [vector_results[i] for i in keep.tolist()]
+        vec_scores = np.fromiter(
+            (item.get("score", 0) for item in vector_results), dtype=np.float64, count=len(vector_results)
+        )
 
-        # 하이브리드 점수 계산
-        results = []
-        for eq_id, scores in combined.items():
-            if scores["data"] is None:
-                continue
+        # 후보 문서 정렬 (벡터 결과 순서 -> BM25 전용 결과 순서)
+        all_docs = np.concatenate([vec_docs, bm25_docs.astype(np.int64)])
+        if not len(all_docs):
+            return []
+        candidates, first_pos, inverse = np.unique(all_docs, return_index=True, return_inverse=True)
+        n = len(candidates)
+        vec_inv, bm25_inv = inverse[:len(vec_docs)], inverse[len(vec_docs):]
 
-            hybrid_score = (
-                scores["vector_score"] * vector_weight +
-                scores["bm25_score"] * bm25_weight
-            )
+        vec = np.zeros(n)
+        vec_rank = np.zeros(n, dtype=np.int64)
+        vec[vec_inv] = vec_scores
+        vec_rank[vec_inv] = np.arange(1, len(vec_inv) + 1)
+
+        bm25 = np.zeros(n)
+        bm25_rank = np.zeros(n, dtype=np.int64)
+        bm25[bm25_inv] = bm25_scores
+        bm25_rank[bm25_inv] = np.arange(1, len(bm25_inv) + 1)
+
+        # 점수 결합 + 상위 K개
+        hybrid = fuse(vec, bm25, vec_rank, bm25_rank, vector_weight, bm25_weight)
+        selected = top_k_indices(hybrid, top_k, tiebreak=first_pos)
+
+        # 결과 구성 (선택된 K개만 dict 생성)
+        vec_item = dict(zip(vec_inv.tolist(), vector_results))
 
-            result = scores["data"].copy()
-            result["hybrid_score"] = round(hybrid_score, 4)
-            result["vector_score"] = round(scores["vector_score"], 4)
-            result["bm25_score"] = round(scores["bm25_score"], 4)
+        results = []
+        for c in selected.tolist():
+            item = vec_item.get(c)
+            if item is not None:
+                result = item.copy()
+            else:
+                # 벡터 검색에 없던 항목 (BM25에서만 발견)
+                eq_id = snap.doc_ids[candidates[c]]
+                result = {"equipment_id": eq_id, **snap.doc_metadata.get(eq_id, {})}
+
+            result["hybrid_score"] = round(float(hybrid[c]), 4)
+            result["vector_score"] = round(float(vec[c]), 4)
+            result["bm25_score"] = round(float(bm25[c]), 4)
 
             # 기존 score를 hybrid_score로 대체
             result["score"] = result["hybrid_score"]
 
             results.append(result)
 
-        # 하이브리드 점수로 정렬
-        results.sort(key=lambda x: x["hybrid_score"], reverse=True)
+        return results
 
-        return results[:top_k]
+    def lexical_candidates(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[IndexSnapshot, np.ndarray, np.ndarray]:
+        """
+        하이브리드 검색의 BM25 단계만 실행 (벡터 검색과 병렬 실행용)
+
+        Returns:
+            (사용한 스냅샷, 문서 번호, 정규화 점수) - hybrid_search(lexical=...)에 전달
+        """
+        snap = self._snapshot
+        return (snap, *self._bm25_top_k(snap, query, top_k, filters))
+
+    def lexical_candidates_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[IndexSnapshot, np.ndarray, np.ndarray]]:
+        """lexical_candidates 일괄 실행 (희소 행렬 곱 한 번, 모든 질의가 같은 스냅샷 사용)"""
+        snap = self._snapshot
+        return [(snap, *hits) for hits in self._bm25_top_k_many(snap, queries, top_k, filters)]
 
     def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None) -> None:
-        """단일 문서 추가 (인덱스 재구축 필요)"""
-        self.doc_ids.append(doc_id)
-        self.documents.append(text)
-        self.doc_metadata[doc_id] = metadata or {}
-        self.tokenized_docs.append(self._tokenize(text))
+        """단일 문서 추가 (같은 ID가 있으면 갱신)"""
+        self.upsert_document(doc_id, text, metadata)
+
+    def upsert_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None) -> None:
+        """문서 추가/갱신 (upsert_documents 참고)"""
+        self.upsert_documents([{"id": doc_id, "text": text, "metadata": metadata}])
+
+    def upsert_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        문서 일괄 추가/갱신
+
+        현재 스냅샷의 복사본에 반영한 뒤 한 번에 게시
+        (복사 비용이 문서 수에 비례하므로 가능하면 일괄로 호출)
+
+        Args:
+            documents: [{"id": "...", "text": "...", "metadata": {...}}, ...]
+        """
+        with self._write_lock:
+            snap = self._snapshot.copy()
+            for doc in documents:
+                snap.upsert(doc.get("id", ""), doc.get("text", ""), doc.get("metadata") or {})
+            self._publish(self._compact_if_needed(snap))
+        return len(documents)
+
+    def delete_document(self, doc_id: str) -> bool:
+        """문서 삭제, 삭제 여부 반환"""
+        return self.delete_documents([doc_id]) > 0
+
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """문서 일괄 삭제 (복사본에 반영 후 게시), 삭제된 수 반환"""
+        with self._write_lock:
+            snap = self._snapshot.copy()
+            removed = sum(1 for doc_id in doc_ids if snap.remove(doc_id))
+            if removed:
+                self._publish(self._compact_if_needed(snap))
+        return removed
 
-        # BM25 재구축
-        if self.tokenized_docs:
-            self.bm25 = BM25Okapi(self.tokenized_docs)
+    def _compact_if_needed(self, snap: IndexSnapshot) -> IndexSnapshot:
+        """삭제된 문서 번호가 충분히 쌓이면 재구축으로 정리 (비용 상각)"""
+        if snap.num_deleted > max(self.COMPACT_MIN_DELETED, snap.num_live):
+            return snap.compacted()
+        return snap
 
     def rebuild_index(self) -> None:
-        """BM25 인덱스 재구축"""
-        if self.tokenized_docs:
-            self.bm25 = BM25Okapi(self.tokenized_docs)
-            print(f"[HybridSearch] Index rebuilt with {len(self.doc_ids)} documents")
+        """BM25 인덱스 재구축 (삭제된 문서 번호 정리, 새 스냅샷으로 교체)"""
+        with self._write_lock:
+            snap = self._snapshot.compacted()
+            self._publish(snap)
+        if snap.bm25 is not None:
+            print(f"[HybridSearch] Index rebuilt with {len(snap.doc_ids)} documents")
+
+    # === 스냅샷 (영속화) ===
+
+    def save_snapshot(self, path: Path, content_hash: str, snapshot: Optional[IndexSnapshot] = None) -> None:
+        """
+        인덱스 스냅샷을 파일로 저장 (압축 / 재구축 없이 삭제된 문서 번호도 그대로 기록)
+
+        게시된 스냅샷은 변경되지 않으므로 쓰기 잠금 없이 직렬화 (저장 중에도 갱신 가능)
+
+        Args:
+            path: 스냅샷 파일 경로
+            content_hash: 인덱스가 반영하는 카탈로그의 내용 해시
+            snapshot: 저장할 스냅샷 (기본값: 현재 게시된 스냅샷)
+        """
+        snap = snapshot or self._snapshot
+        index = snap.bm25 or BM25Index()
+        arrays = index.export_arrays()
+        # 사전은 스냅샷 간 공유되어 저장 중에도 용어가 추가될 수 있으므로 현재 크기까지만 기록
+        terms = [snap.vocab.terms[tid] for tid in range(len(snap.vocab))]
+        for name, values in (
+            ("terms", terms),
+            ("doc_ids", snap.doc_ids),
+            ("documents", snap.documents),
+            ("metadata", (
+                json.dumps(snap.doc_metadata.get(doc_id, {}), ensure_ascii=False) if doc_id is not None else ""
+                for doc_id in snap.doc_ids
+            )),
+        ):
+            arrays[f"{name}_offsets"], arrays[f"{name}_blob"] = encode_strings(values)
+        arrays["term_order"] = sorted_term_order(terms)
+        attribute_keys, attribute_arrays = snap.attributes.export_arrays()
+        arrays.update(attribute_arrays)
+        header = {
+            "layout": self.SNAPSHOT_LAYOUT,
+            "content_hash": content_hash,
+            "params": {"k1": index.k1, "b": index.b, "epsilon": index.epsilon},
+            "attribute_keys": attribute_keys,
+        }
+        with self._save_lock:
+            write_snapshot(Path(path), header, arrays)
+        print(f"[HybridSearch] Snapshot saved: {path} ({snap.num_live} documents)")
+
+    def load_snapshot(self, path: Path, content_hash: Optional[str] = None) -> bool:
+        """
+        스냅샷 파일에서 인덱스 로드 (포스팅 / 용어 / 문서 / 메타데이터 / 속성 인덱스는 메모리 매핑)
+
+        Args:
+            path: 스냅샷 파일 경로
+            content_hash: 기대하는 카탈로그 내용 해시 (다르면 로드하지 않음)
+
+        Returns:
+            로드 성공 여부
+        """
+        snapshot = read_snapshot(Path(path))
+        if snapshot is None:
+            return False
+
+        header, arrays = snapshot
+        if header.get("layout") != self.SNAPSHOT_LAYOUT:
+            print(f"[HybridSearch] Incompatible snapshot layout: {path}")
+            return False
+        if content_hash is not None and header.get("content_hash") != content_hash:
+            print("[HybridSearch] Snapshot is stale (catalog changed)")
+            return False
+
+        def column(name: str) -> StringColumn:
+            return StringColumn(arrays[f"{name}_offsets"], arrays[f"{name}_blob"])
+
+        snap = IndexSnapshot(self.scoring, self.field_weights)
+        snap.vocab = Vocabulary.from_column(column("terms"), arrays["term_order"])
+        snap.doc_ids = column("doc_ids")
+        snap.documents = column("documents")
+        snap.tokenized_docs = [None] * len(snap.doc_ids)
+
+        live = np.asarray(arrays["live"], dtype=bool)
+        for doc_no in np.flatnonzero(~live).tolist():
+            # 삭제된 문서 번호 (저장 시 압축하지 않음)
+            snap.doc_ids[doc_no] = None
+            snap.tokenized_docs[doc_no] = _EMPTY_TERMS
+        snap.num_deleted = int((~live).sum())
+        snap.id_to_doc = {doc_id: i for i, doc_id in enumerate(snap.doc_ids) if doc_id is not None}
+        snap.doc_metadata = SnapshotMetadata(dict(snap.id_to_doc), column("metadata"))
+        snap.bm25 = (
+            BM25Index.from_arrays(arrays, header.get("params"))
+            if len(snap.doc_ids) else None
+        )
+        # 속성 인덱스도 메모리 매핑 (메타데이터 JSON 디코딩 없음)
+        snap.attributes = AttributeIndex.from_arrays(
+            snap.doc_ids.copy(), snap.num_live, header["attribute_keys"], arrays
+        )
+
+        with self._write_lock:
+            self._publish(snap)
+        print(f"[HybridSearch] Snapshot loaded: {path} ({snap.num_live} documents)")
+        return True
 
 
 # 싱글톤 인스턴스
@@ -0,0 +1,182 @@
+"""
+KION RAG - Lexical Index Snapshot Store
+
+BM25 역색인을 단일 바이너리 파일로 저장/로드
+- 헤더(JSON) + 64바이트 정렬된 NumPy 배열 섹션
+- 로드 시 배열은 np.memmap (읽기 전용)으로 매핑 -> 워커 프로세스 간 페이지 공유
+- 임시 파일에 쓴 뒤 os.replace로 교체 (원자적 갱신)
+- 문자열 목록은 (오프셋, UTF-8 바이트) 배열 섹션으로 저장하고 StringColumn으로 읽음
+  (헤더 JSON에 넣으면 워커마다 전체를 파싱해 개별 힙에 보관하게 됨)
+"""
+
+import copy
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b"KIONLEX\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# magic(8) + version(uint32) + reserved(uint32) + header 길이(uint64)
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(path: Path, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    스냅샷 파일 저장
+
+    Args:
+        path: 저장 경로
+        header: JSON 직렬화 가능한 헤더 (버전/해시/파라미터 등)
+        arrays: 이름 -> 1차원 NumPy 배열
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # 배열 배치 계산 (헤더 길이가 오프셋에 영향을 주므로 상대 오프셋으로 기록)
+    layout = {}
+    relative = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": relative}
+        relative = _align(relative + arr.nbytes)
+
+    header_bytes = json.dumps(
+        {**header, "arrays": layout}, ensure_ascii=False
+    ).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = path.with_name(path.name + f".tmp{os.getpid()}")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(arr.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """
+    스냅샷 파일 로드 (배열은 메모리 매핑)
+
+    Returns:
+        (header, arrays) 또는 None (파일 없음 / 형식·버전 불일치)
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            magic, version, _, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                print(f"[IndexStore] Incompatible snapshot format: {path}")
+                return None
+            header = json.loads(f.read(header_len).decode("utf-8"))
+    except (OSError, struct.error, ValueError) as e:
+        print(f"[IndexStore] Snapshot read error: {e}")
+        return None
+
+    data_start = _align(_PREAMBLE.size + header_len)
+    arrays = {}
+    for name, spec in header.pop("arrays", {}).items():
+        shape = tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.zeros(shape, dtype=np.dtype(spec["dtype"]))
+            continue
+        arrays[name] = np.memmap(
+            path,
+            dtype=np.dtype(spec["dtype"]),
+            mode="r",
+            offset=data_start + spec["offset"],
+            shape=shape,
+        )
+
+    return header, arrays
+
+
+def encode_strings(values: Iterable[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    문자열 목록 -> 배열 섹션 (None은 빈 문자열)
+
+    Returns:
+        (오프셋 int64 (개수 + 1), UTF-8 바이트 uint8)
+    """
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+class StringColumn:
+    """
+    배열 섹션(오프셋 + UTF-8 바이트) 위의 문자열 열 (읽을 때 디코딩)
+
+    - 기본 배열은 메모리 매핑 그대로 사용 (읽기 전용, 워커 간 페이지 공유)
+    - 덮어쓰기 / 추가는 열 복사본별 오버레이에만 기록 (list와 같은 인덱싱 / append / copy 지원)
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self._offsets = offsets
+        self._blob = blob
+        self._base_size = len(offsets) - 1
+        self._overrides: Dict[int, Optional[str]] = {}
+        self._tail: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return self._base_size + len(self._tail)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if i < 0:
+            i += len(self)
+        if i >= self._base_size:
+            return self._tail[i - self._base_size]
+        if i < 0:
+            raise IndexError("StringColumn index out of range")
+        if i in self._overrides:
+            return self._overrides[i]
+        return self.raw(i).decode("utf-8")
+
+    def __setitem__(self, i: int, value: Optional[str]) -> None:
+        if i < 0:
+            i += len(self)
+        if i >= self._base_size:
+            self._tail[i - self._base_size] = value
+        elif i < 0:
+            raise IndexError("StringColumn index out of range")
+        else:
+            self._overrides[i] = value
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, value: Optional[str]) -> None:
+        self._tail.append(value)
+
+    def raw(self, i: int) -> bytes:
+        """기본 배열의 i번째 값 (UTF-8 바이트, 오버레이 무시)"""
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].tobytes()
+
+    def copy(self) -> "StringColumn":
+        """오버레이만 복사 (기본 배열은 공유)"""
+        clone = copy.copy(self)
+        clone._overrides = dict(self._overrides)
+        clone._tail = list(self._tail)
+        return clone
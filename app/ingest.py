@@ -0,0 +1,362 @@
+"""
+KION RAG - Bulk Ingestion Pipeline
+
+대량 장비 카탈로그 적재 (청크 단위 스트리밍)
+- 1단계: 레코드 읽기 (JSON Lines는 한 줄씩, JSON 배열은 청크 단위 증분 디코딩)
+- 2단계: Pydantic 검증 + 메타데이터 생성 프로세스 풀 (잘못된 레코드는 건너뛰고 집계)
+- 3단계: 임베딩 프로세스 풀 (문서 임베딩 캐시에 없는 텍스트만 인코딩)
+- 4단계: 청크 단위 upsert (ChromaDB + BM25 증분, 스냅샷은 마지막에 한 번 저장)
+
+단계 사이는 크기 제한 큐 / 진행 중 작업 수 제한으로 연결 -> 카탈로그 크기와 무관하게 메모리 사용량 일정
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from .config import settings
+from .embedding_cache import embedding_key
+from .embeddings import create_embedding_function, embedding_model_key
+from .models import Equipment
+from .rag import rag_pipeline
+
+# 읽기 단계 종료 표시
+_DONE = None
+
+# JSON 배열 증분 디코딩 시 한 번에 읽는 문자 수
+_READ_CHUNK_CHARS = 1 << 16
+
+# 임베딩 워커 프로세스별 임베딩 함수
+_worker_embedding_fn = None
+
+
+def _init_embedding_worker(backend: str, num_threads: int) -> None:
+    """임베딩 워커 초기화 (프로세스당 모델 1회 로드, 코어 과할당 방지)"""
+    global _worker_embedding_fn
+    if backend == "onnx":
+        settings.ONNX_NUM_THREADS = num_threads
+    else:
+        try:
+            import torch
+            torch.set_num_threads(num_threads)
+        except ImportError:
+            pass
+
+    # 워커 프로세스는 대량 인코딩용이므로 공유 임베딩 서비스 대신 모델을 직접 로드
+    _worker_embedding_fn = create_embedding_function(backend, local=True)
+
+
+def _embed_texts(texts: List[str]) -> np.ndarray:
+    """워커 프로세스에서 텍스트 인코딩 (float32 배열로 반환 -> 전송량 축소)"""
+    return np.asarray(_worker_embedding_fn(texts), dtype=np.float32)
+
+
+def _validate_rows(rows: List[Any]) -> Tuple[List[str], Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+    """
+    검증 워커 프로세스에서 청크 검증 + (ID, 검색 텍스트, 메타데이터) 변환
+
+    Returns:
+        (잘못된 레코드 메시지 목록, prepare_records 결과)
+    """
+    equipments = []
+    errors = []
+    for row in rows:
+        try:
+            equipments.append(Equipment(**row))
+        except (ValidationError, TypeError) as e:
+            errors.append(f"{row.get('equipment_id') if isinstance(row, dict) else row}: {e}")
+    return errors, rag_pipeline.prepare_records(equipments)
+
+
+def iter_records(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    장비 레코드 읽기 (파일 전체를 메모리에 올리지 않음)
+
+    .jsonl은 한 줄씩, 그 외(JSON 배열)는 요소 단위로 증분 디코딩
+    """
+    path = Path(file_path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def _iter_json_array(f: TextIO, chunk_chars: int = _READ_CHUNK_CHARS) -> Iterator[Any]:
+    """
+    JSON 배열 요소를 하나씩 디코딩 (JSONDecoder.raw_decode, 버퍼에는 읽는 중인 요소만 유지)
+
+    Raises:
+        ValueError: 배열 형식이 아니거나 파일이 중간에 끝난 경우
+    """
+    decoder = json.JSONDecoder()
+    buf, pos = "", 0
+
+    def fill() -> bool:
+        """다음 청크를 버퍼에 추가 (이미 디코딩한 부분은 버림), 파일 끝이면 False"""
+        nonlocal buf, pos
+        chunk = f.read(chunk_chars)
+        buf, pos = buf[pos:] + chunk, 0
+        return bool(chunk)
+
+    def peek() -> str:
+        """공백이 아닌 다음 문자 (파일 끝이면 빈 문자열)"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                return buf[pos:pos + 1]
+
+    if peek() != "[":
+        raise ValueError("JSON 배열 또는 JSON Lines(.jsonl) 파일만 지원합니다")
+    pos += 1
+    if peek() == "]":
+        return
+
+    while True:
+        peek()
+        # 요소가 버퍼 끝에서 잘렸을 수 있으면 더 읽고 다시 디코딩 (파일 끝이면 디코딩 오류 그대로)
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end < len(buf):
+                    break
+            except json.JSONDecodeError:
+                pass
+            if not fill():
+                value, end = decoder.raw_decode(buf, pos)
+                break
+        pos = end
+        yield value
+
+        separator = peek()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"JSON 배열 요소 뒤에 ',' 또는 ']'가 필요합니다: {separator or '파일 끝'}")
+        pos += 1
+
+
+def _chunked(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    """큐에서 꺼내기 (다른 단계가 실패하면 종료 표시 반환)"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _embedding_workers() -> int:
+    """임베딩 프로세스 수 (설정값 0이면 코어 4개당 1개)"""
+    if settings.INGEST_EMBEDDING_WORKERS > 0:
+        return settings.INGEST_EMBEDDING_WORKERS
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+def _print_progress(stats: Dict[str, Any]) -> None:
+    rate = stats["upserted"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    print(
+        f"[Ingest] {stats['upserted']}개 적재 (읽음 {stats['read']}, 오류 {stats['invalid']}, "
+        f"인코딩 {stats['embedded']}, 캐시 {stats['cached']}) {rate:.1f}건/초"
+    )
+
+
+class BulkIngestor:
+    """청크 단위 병렬 적재 파이프라인"""
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        validation_workers: Optional[int] = None,
+        embedding_workers: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = _print_progress
+    ):
+        """
+        Args:
+            chunk_size: upsert 청크 크기 (기본 settings.INGEST_CHUNK_SIZE)
+            queue_size: 단계 사이 큐에 쌓을 수 있는 최대 청크 수
+            validation_workers: Pydantic 검증 프로세스 수 (0이면 읽기 스레드에서 검증)
+            embedding_workers: 임베딩 프로세스 수 (0이면 현재 프로세스에서 인코딩)
+            progress: 청크 적재마다 호출되는 진행 상황 콜백
+        """
+        self.chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.validation_workers = (
+            settings.INGEST_VALIDATION_WORKERS if validation_workers is None else validation_workers
+        )
+        self.embedding_workers = _embedding_workers() if embedding_workers is None else embedding_workers
+        self.progress = progress
+
+    def run(self, records: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        레코드 스트림 적재
+
+        Returns:
+            read / valid / invalid / embedded / cached / upserted / elapsed 집계
+        """
+        rag_pipeline.initialize()
+
+        stats = {"read": 0, "valid": 0, "invalid": 0, "embedded": 0, "cached": 0, "upserted": 0, "elapsed": 0.0}
+        errors: List[BaseException] = []
+        # 검증 작업 (읽은 순서, Future) - 크기 제한으로 읽기가 적재보다 너무 앞서지 않도록
+        validated: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        start = time.perf_counter()
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            # 하위 단계가 실패하면 상위 단계가 큐에서 막히지 않도록 주기적으로 확인
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        # 검증 / 임베딩은 CPU 작업이므로 프로세스 풀에서 실행 (GIL 경합 없음)
+        validator = None
+        if self.validation_workers > 0:
+            validator = ProcessPoolExecutor(
+                max_workers=self.validation_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        executor = None
+        if self.embedding_workers > 0:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.embedding_workers)
+            executor = ProcessPoolExecutor(
+                max_workers=self.embedding_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_embedding_worker,
+                initargs=(settings.EMBEDDING_BACKEND, threads_per_worker)
+            )
+
+        def read() -> None:
+            try:
+                for rows in _chunked(records, self.chunk_size):
+                    stats["read"] += len(rows)
+                    if validator is None:
+                        job = Future()
+                        job.set_result(_validate_rows(rows))
+                    else:
+                        job = validator.submit(_validate_rows, rows)
+                    if not put(validated, job):
+                        return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(validated, _DONE)
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+
+        # 인코딩 중인 청크 (순서 유지, 프로세스 수 * 2개까지)
+        in_flight: deque = deque()
+        max_in_flight = max(1, self.embedding_workers) * 2
+        try:
+            while True:
+                job = _get(validated, stop)
+                if job is _DONE:
+                    break
+                invalid, batch = job.result()
+                for message in invalid:
+                    print(f"[Ingest] 잘못된 레코드 건너뜀 ({message})")
+                stats["invalid"] += len(invalid)
+                stats["valid"] += len(batch[0])
+                if not batch[0]:
+                    continue
+                in_flight.append(self._submit(executor, batch, stats))
+                while len(in_flight) >= max_in_flight:
+                    self._upsert(in_flight.popleft(), stats, start)
+            while in_flight and not stop.is_set():
+                self._upsert(in_flight.popleft(), stats, start)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for pool in (validator, executor):
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+            reader.join()
+
+        if errors:
+            raise errors[0]
+
+        rag_pipeline.flush()
+        rag_pipeline.build_attribute_index()
+        stats["elapsed"] = time.perf_counter() - start
+        print(f"[Ingest] 완료: {stats}")
+        return stats
+
+    def _submit(self, executor: Optional[ProcessPoolExecutor], batch: Any, stats: Dict[str, Any]) -> Any:
+        """캐시에 없는 텍스트만 임베딩 작업으로 제출"""
+        ids, documents, metadatas = batch
+        keys = [embedding_key(embedding_model_key(), text) for text in documents]
+        cached = rag_pipeline.embedding_store.get_many(keys)
+        missing = list(dict.fromkeys((key, text) for key, text in zip(keys, documents) if key not in cached))
+        stats["cached"] += len(documents) - len(missing)
+        stats["embedded"] += len(missing)
+
+        texts = [text for _, text in missing]
+        if not texts:
+            future = None
+        elif executor is None:
+            future = Future()
+            future.set_result(np.asarray(rag_pipeline.embedding_fn(texts), dtype=np.float32))
+        else:
+            future = executor.submit(_embed_texts, texts)
+        return batch, keys, cached, missing, future
+
+    def _upsert(self, job: Any, stats: Dict[str, Any], start: float) -> None:
+        """임베딩 완료된 청크 upsert (BM25 스냅샷 저장은 적재 종료 시 한 번)"""
+        (ids, documents, metadatas), keys, cached, missing, future = job
+        if future is not None:
+            encoded = [(key, vector) for (key, _), vector in zip(missing, future.result())]
+            rag_pipeline.embedding_store.put_many(encoded)
+            cached.update(encoded)
+
+        embeddings = [cached[key].tolist() for key in keys]
+        stats["upserted"] += rag_pipeline.upsert_records(ids, documents, metadatas, embeddings, persist=False)
+        stats["elapsed"] = time.perf_counter() - start
+        if self.progress:
+            self.progress(dict(stats))
+
+
+def ingest_file(file_path: str, **kwargs: Any) -> Dict[str, Any]:
+    """파일에서 장비 데이터 대량 적재 (BulkIngestor 인자 전달)"""
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+    return BulkIngestor(**kwargs).run(iter_records(file_path))
+
+
+if __name__ == "__main__":
+    import sys
+
+    ingest_file(sys.argv[1])
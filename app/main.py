@@ -8,6 +8,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 
 from .config import settings
@@ -25,6 +26,7 @@ import json
 # Static files directory
 STATIC_DIR = Path(__file__).parent.parent / "static"
 DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_FILE = DATA_DIR / "kion_equipment.json"  # 장비 카탈로그 (run.py와 동일)
 
 
 @asynccontextmanager
@@ -33,6 +35,7 @@ async def lifespan(app: FastAPI):
     # Startup
     print(f"[{settings.APP_NAME}] Starting up...")
     rag_pipeline.initialize()
+    rag_pipeline.initialize_hybrid_search()  # BM25 스냅샷 로드 (없거나 오래되면 재구축)
 
     # Policy DB 초기화
     pm = get_policy_manager()
@@ -43,6 +46,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print(f"[{settings.APP_NAME}] Shutting down...")
+    rag_pipeline.flush()  # 지연 영속화 중인 쓰기 반영
+    if rag_pipeline.query_batcher:
+        rag_pipeline.query_batcher.close()
 
 
 app = FastAPI(
@@ -164,13 +170,15 @@ async def chat(request: ChatRequest):
         if mapped_cats:
             print(f"[Chat] Policy DB 매핑: {mapped_cats}")
 
-        # 1. 하이브리드 검색 (벡터 + BM25)
-        search_results = rag_pipeline.hybrid_search(
+        # 1. 하이브리드 검색 (벡터 + BM25, 스레드 풀에서 실행 -> 동시 요청의 질의 임베딩 배치 가능)
+        search_results = await run_in_threadpool(
+            rag_pipeline.hybrid_search_hits,
             query=search_query,  # 의도 파악된 검색 쿼리 사용
             top_k=(request.top_k or settings.TOP_K) * 2,  # 필터링 고려해 2배로 검색
             filters=chroma_filters if chroma_filters else None,
             vector_weight=0.5,
-            bm25_weight=0.5
+            bm25_weight=0.5,
+            fusion=request.fusion or settings.HYBRID_FUSION
         )
 
         if not search_results:
@@ -293,13 +301,15 @@ async def chat_stream(request: ChatRequest):
     if request.filters:
         chroma_filters.update(request.filters)
 
-    # 1. 하이브리드 검색 (벡터 + BM25)
-    search_results = rag_pipeline.hybrid_search(
+    # 1. 하이브리드 검색 (벡터 + BM25, 스레드 풀에서 실행)
+    search_results = await run_in_threadpool(
+        rag_pipeline.hybrid_search_hits,
         query=search_query,
         top_k=(request.top_k or settings.TOP_K) * 2,
         filters=chroma_filters if chroma_filters else None,
         vector_weight=0.5,
-        bm25_weight=0.5
+        bm25_weight=0.5,
+        fusion=request.fusion or settings.HYBRID_FUSION
     )
 
     # 1.5. 필터 + 리랭킹
@@ -376,6 +386,27 @@ async def reload_equipment():
     return {"message": f"{count}개 장비 데이터가 로드되었습니다."}
 
 
+@app.post("/equipment/sync", tags=["Equipment"])
+async def sync_equipment():
+    """장비 카탈로그 파일(data/kion_equipment.json) 기준 동기화 (변경분만 upsert, 없어진 장비 삭제)"""
+    from .data_loader import sync_from_json
+    if not DATA_FILE.exists():
+        raise HTTPException(status_code=404, detail=f"카탈로그 파일이 없습니다: {DATA_FILE.name}")
+    # 임베딩 / 색인은 블로킹 작업 -> 스레드 풀에서 실행 (이벤트 루프 차단 방지)
+    counts = await run_in_threadpool(sync_from_json, str(DATA_FILE))
+    return {"counts": counts}
+
+
+@app.get("/cache/stats", tags=["Cache"])
+async def get_cache_stats():
+    """임베딩 캐시 적중/실패 통계 (질의 / 문서) + 질의 배치 크기 / 대기 시간"""
+    return {
+        "query_embedding": rag_pipeline.query_cache.stats(),
+        "document_embedding": rag_pipeline.embedding_store.stats() if rag_pipeline.embedding_store else None,
+        "query_batching": rag_pipeline.query_batcher.stats() if rag_pipeline.query_batcher else None,
+    }
+
+
 # === Policy DB Admin API ===
 @app.post("/policy/reload", tags=["Policy"])
 async def reload_policy():
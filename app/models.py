@@ -3,7 +3,7 @@ KION RAG PoC - Pydantic Models
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 
 # === Equipment Models ===
@@ -34,6 +34,7 @@ class ChatRequest(BaseModel):
     filters: Optional[Dict[str, Any]] = Field(None, description="필터 조건")
     top_k: Optional[int] = Field(5, description="추천 장비 수", ge=1, le=10)
     session_id: Optional[str] = Field(None, description="대화 세션 ID (연계 질의용)")
+    fusion: Optional[Literal["weighted", "rrf", "zscore"]] = Field(None, description="하이브리드 점수 결합 방식")
 
 
 class RecommendedEquipment(BaseModel):
@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
+from .config import settings
+
 
 @dataclass
 class ParsedQuery:
@@ -237,12 +239,28 @@ def parse_query(query: str) -> ParsedQuery:
 
 
 def parsed_to_filters(parsed: ParsedQuery) -> Dict[str, Any]:
-    """ParsedQuery를 ChromaDB 필터 조건으로 변환"""
+    """
+    ParsedQuery를 검색 필터 조건으로 변환 (키와 의미는 filter_planner.normalize_filters 참고)
+
+    기본은 웨이퍼 사이즈 / 카테고리 / 첫 번째 기관만 검색 필터로 사용 (재료 / 온도는 apply_hard_filters에서 확인)
+    FILTER_ALL_QUERY_CONSTRAINTS이면 재료 / 온도 / 모든 기관도 포함 (다중 값은 하나만 만족해도 통과)
+    """
     filters = {}
+    all_constraints = settings.FILTER_ALL_QUERY_CONSTRAINTS
 
     if parsed.wafer_sizes:
         filters["wafer_sizes"] = parsed.wafer_sizes
 
+    if all_constraints:
+        if parsed.materials:
+            filters["materials"] = parsed.materials
+
+        if parsed.temp_min is not None:
+            filters["temp_min"] = parsed.temp_min
+
+        if parsed.temp_max is not None:
+            filters["temp_max"] = parsed.temp_max
+
     # 카테고리: 명시적 카테고리 > Policy DB 매핑 카테고리
     if parsed.categories:
         filters["category"] = parsed.categories[0]
@@ -251,7 +269,7 @@ def parsed_to_filters(parsed: ParsedQuery) -> Dict[str, Any]:
         filters["category"] = parsed.mapped_categories[0]
 
     if parsed.institutions:
-        filters["institution"] = parsed.institutions[0]
+        filters["institution"] = parsed.institutions if all_constraints else parsed.institutions[0]
 
     return filters
 
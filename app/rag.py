@@ -1,88 +1,588 @@
 """
-KION RAG PoC - RAG Pipeline (ChromaDB + Embeddings + Hybrid Search)
+KION RAG PoC - RAG Pipeline (Vector Store + Embeddings + Hybrid Search)
 """
 
+import abc
 import chromadb
-from chromadb.utils import embedding_functions
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import hashlib
 import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 
+import numpy as np
+
 from .config import settings
 from .models import Equipment
-from .hybrid_search import hybrid_searcher
+from .attribute_index import AttributeIndex
+from .hybrid_search import hybrid_searcher, top_k_indices
+from .index_store import read_snapshot, write_snapshot
+from .embedding_cache import DocumentEmbeddingStore, QueryEmbeddingCache, embedding_key, normalize_query
+from .embeddings import EmbeddingBatcher, create_embedding_function, embedding_model_key
+from .filter_planner import FILTER_KEYS, FilterPlan, FilterPlanner, matches, normalize_filters
+from .records import MISSING_TEMP_MAX, MISSING_TEMP_MIN, EquipmentHit, EquipmentRecord, EquipmentRecordStore
+
+# 카탈로그 내용 해시 저장 파일 (CHROMA_PERSIST_DIR 내부)
+CATALOG_STATE_FILE = "catalog_state.json"
+_HASH_MOD = 1 << 64
+
+
+def content_hash(doc_id: str, text: str, metadata: Dict[str, Any]) -> str:
+    """장비 레코드 내용 해시 (검색 텍스트 + 메타데이터, content_hash 필드 제외)"""
+    fields = {k: v for k, v in metadata.items() if k != "content_hash"}
+    payload = json.dumps([doc_id, text, fields], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _to_dicts(hits: List[Any]) -> List[Dict[str, Any]]:
+    """공개 검색 결과 형식으로 변환 (EquipmentHit -> 일반 dict, 목록 필드는 list)"""
+    return [hit.to_dict() if isinstance(hit, EquipmentHit) else hit for hit in hits]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (영벡터는 그대로)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1)).astype(np.float32, copy=False)
+
+
+def _rank_rows(
+    ids: List[str],
+    metadatas: List[Dict[str, Any]],
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    top_k: int
+) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+    """정규화된 후보 행렬 x 질의 행렬 -> 질의별 상위 K (ID, 메타데이터, 코사인 유사도)"""
+    queries = _normalize_rows(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+    if not ids:
+        return [[] for _ in range(len(queries))]
+
+    scores = matrix @ queries.T
+    results = []
+    for q in range(len(queries)):
+        column = scores[:, q]
+        results.append([
+            (ids[i], metadatas[i], max(0.0, float(column[i]))) for i in top_k_indices(column, top_k)
+        ])
+    return results
+
+
+class VectorStore(abc.ABC):
+    """
+    벡터 저장소 인터페이스
+
+    - get()은 ChromaDB와 같은 형태 ({"ids", "documents", "metadatas"})로 반환
+    - query()는 (ID, 메타데이터, 코사인 유사도) 목록을 유사도 내림차순으로 반환
+    - filters는 filter_planner.normalize_filters 형식이고, pushable_filters에 있는 키만 전달됨
+    - 쓰기를 모아서 영속화하는 저장소는 dirty / flush()로 보류 중인 쓰기를 알리고 저장
+    """
+
+    # 카탈로그 내용 해시 저장 파일
+    catalog_state_path: Path
+    # 필터로 처리할 수 있는 조건 키 / 필터 검색이 전수 비교인지 (FilterPlanner 계획 선택용)
+    pushable_filters: Tuple[str, ...] = ()
+    exact_filters = False
+
+    @property
+    def exact_max_candidates(self) -> int:
+        """ID 지정 전수 비교(query_ids_many)를 사용할 최대 장비 수 (임베딩이 메모리에 있는 저장소 기준)"""
+        return settings.FILTER_EXACT_MAX_CANDIDATES
+
+    @property
+    def dirty(self) -> bool:
+        """영속화되지 않은 쓰기가 있는지"""
+        return False
+
+    def flush(self) -> None:
+        """보류 중인 쓰기 영속화 (쓰기마다 영속화하는 저장소는 할 일 없음)"""
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """저장된 벡터 수"""
+
+    @abc.abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """벡터 추가/갱신"""
+
+    @abc.abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """벡터 삭제 (없는 ID는 무시)"""
+
+    @abc.abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Dict[str, list]:
+        """ID 목록 또는 페이지 단위 조회 (임베딩 제외)"""
+
+    @abc.abstractmethod
+    def query(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, Dict[str, Any], float]]:
+        """질의 벡터 하나 검색"""
+
+    def query_many(
+        self,
+        embeddings: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """질의 벡터 여러 개 검색 (질의 순서대로 query 결과 목록)"""
+        return [self.query(embedding, top_k, filters) for embedding in embeddings]
+
+    @abc.abstractmethod
+    def query_ids_many(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        top_k: int
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """지정한 장비 ID만 전수 비교 (질의 순서대로 query 결과 형식)"""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """모든 벡터 삭제"""
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB 영속 컬렉션 (HNSW)"""
+
+    # 쉼표로 연결된 다중 값(wafer_sizes / materials)과 기관 부분 문자열 일치는 where로 표현할 수 없음
+    pushable_filters = ("category", "temp_min", "temp_max")
+
+    @property
+    def exact_max_candidates(self) -> int:
+        # 전수 비교는 후보 임베딩을 컬렉션에서 가져와야 하므로 후보가 아주 적을 때만 사용
+        return settings.FILTER_EXACT_MAX_CANDIDATES_REMOTE
+
+    def __init__(self, persist_dir: Path, collection_name: str, embedding_fn: Any):
+        persist_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog_state_path = persist_dir / CATALOG_STATE_FILE
+        self.collection_name = collection_name
+        self.embedding_fn = embedding_fn
+        self.client = chromadb.PersistentClient(path=str(persist_dir))
+        self.collection = self._get_collection()
+
+    def _get_collection(self):
+        return self.client.get_or_create_collection(
+            name=self.collection_name,
+            embedding_function=self.embedding_fn,
+            metadata={"description": "KION 팹서비스 장비 데이터"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def upsert(self, ids, documents, metadatas, embeddings) -> None:
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def delete(self, ids: List[str]) -> None:
+        self.collection.delete(ids=ids)
+
+    def get(self, ids=None, limit=None, offset=0) -> Dict[str, list]:
+        return self.collection.get(
+            ids=ids,
+            limit=limit,
+            offset=offset or None,
+            include=["documents", "metadatas"]
+        )
+
+    def query(self, embedding, top_k, filters=None):
+        return self.query_many(np.asarray(embedding)[None, :], top_k, filters)[0]
+
+    def query_many(self, embeddings, top_k, filters=None):
+        results = self.collection.query(
+            query_embeddings=np.asarray(embeddings).tolist(),
+            n_results=top_k,
+            where=self._where(filters),
+            include=["metadatas", "distances"]
+        )
+
+        hits = [[] for _ in range(len(embeddings))]
+        for q, ids in enumerate((results or {}).get("ids") or []):
+            for i, eq_id in enumerate(ids):
+                distance = results["distances"][q][i] if results["distances"] else 0
+                # 유사도 점수 계산 (거리 → 유사도)
+                hits[q].append((eq_id, results["metadatas"][q][i], max(0, 1 - distance / 2)))
+        return hits
+
+    def query_ids_many(self, embeddings, ids, top_k):
+        if not ids:
+            return [[] for _ in range(len(embeddings))]
+        results = self.collection.get(ids=list(ids), include=["embeddings", "metadatas"])
+        matrix = _normalize_rows(np.asarray(results["embeddings"], dtype=np.float32))
+        return _rank_rows(results["ids"], results["metadatas"], matrix, embeddings, top_k)
+
+    def clear(self) -> None:
+        # 컬렉션 삭제 후 재생성
+        self.client.delete_collection(self.collection_name)
+        self.collection = self._get_collection()
+
+    @staticmethod
+    def _where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """ChromaDB where 필터 구성"""
+        if not filters:
+            return None
+
+        where_conditions = []
+        for key, value in filters.items():
+            # 온도 정보가 없는 레코드는 기본값이 저장되어 있어 통과 (records.temperature_bounds 규칙과 동일)
+            if key == "temp_min":
+                where_conditions.append({"temp_max": {"$gte": value}})
+            elif key == "temp_max":
+                where_conditions.append({"temp_min": {"$lte": value}})
+            elif key == "category":
+                values = list(value)
+                where_conditions.append({key: {"$eq": values[0]} if len(values) == 1 else {"$in": values}})
+
+        if len(where_conditions) == 1:
+            return where_conditions[0]
+        if len(where_conditions) > 1:
+            return {"$and": where_conditions}
+        return None
+
+
+class _VectorTable:
+    """
+    NumpyVectorStore 검색 상태 (쓰기마다 새로 게시, 검색은 게시된 상태 하나만 사용)
+
+    행렬 / 목록 / 비트맵은 다음 상태와 공유하며 size 이후 행에만 추가되므로,
+    size까지의 행과 live / rows는 게시 후 바뀌지 않음
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        size: int,
+        live: np.ndarray,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        rows: Dict[str, int],
+        attributes: AttributeIndex
+    ):
+        self.matrix = matrix  # (용량, 차원) 정규화된 float32, 앞 size행만 사용
+        self.size = size  # 사용 중인 행 수 (삭제된 행 포함)
+        self.live = live  # 행별 활성 여부 (삭제 / 갱신 전 행은 False)
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.rows = rows  # 활성 ID -> 행 번호
+        self.attributes = attributes  # 필터 조건용 장비 속성 인덱스 (행 번호 기준)
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        matrix: np.ndarray
+    ) -> "_VectorTable":
+        return cls(
+            matrix, len(ids), np.ones(len(ids), dtype=bool), list(ids), list(documents), list(metadatas),
+            {doc_id: row for row, doc_id in enumerate(ids)}, AttributeIndex.from_metadatas(ids, metadatas)
+        )
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    메모리 내 정확 검색 (정규화 float32 행렬 x 질의 벡터 내적 -> 상위 K)
+
+    - 행은 뒤에 추가만 (용량을 두 배씩 늘려 복사 비용 상각), 갱신은 기존 행을 삭제 표시한 뒤 새 행 추가,
+      삭제는 활성 마스크만 변경 -> 쓰기 비용은 변경된 행 수에 비례
+    - 삭제된 행이 COMPACT_MIN_DELETED와 활성 행 수를 모두 넘으면 압축
+    - 필터는 AttributeIndex 마스크로 적용 (BM25 / 필터 계획과 같은 구현)
+    - 검색은 잠금 없이 게시된 _VectorTable 하나만 사용
+    - 영속화는 flush()에서 한 번 (index_store 형식, 활성 행만 저장), 시작 시 임베딩 행렬은 메모리 매핑
+    """
+
+    pushable_filters = FILTER_KEYS
+    exact_filters = True
+
+    COMPACT_MIN_DELETED = 1024
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.catalog_state_path = self.path.with_name(f"{self.path.stem}_{CATALOG_STATE_FILE}")
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._table = self._load()
+
+    @staticmethod
+    def _empty_table() -> _VectorTable:
+        return _VectorTable.build([], [], [], np.zeros((0, 0), dtype=np.float32))
+
+    def _load(self) -> _VectorTable:
+        snapshot = read_snapshot(self.path)
+        if snapshot is None:
+            return self._empty_table()
+        header, arrays = snapshot
+        print(f"[VectorStore] Loaded: {self.path} ({len(header['ids'])} vectors)")
+        return _VectorTable.build(header["ids"], header["documents"], header["metadatas"], arrays["embeddings"])
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def flush(self) -> None:
+        """보류 중인 쓰기를 파일로 저장 (활성 행만)"""
+        with self._write_lock:
+            if not self._dirty:
+                return
+            self._save(self._table)
+            self._dirty = False
+
+    def _save(self, table: _VectorTable) -> None:
+        rows = np.flatnonzero(table.live)
+        header = {
+            "ids": [table.ids[row] for row in rows],
+            "documents": [table.documents[row] for row in rows],
+            "metadatas": [table.metadatas[row] for row in rows],
+        }
+        write_snapshot(self.path, header, {"embeddings": table.matrix[rows]})
+
+    def count(self) -> int:
+        return len(self._table.rows)
+
+    def upsert(self, ids, documents, metadatas, embeddings) -> None:
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        with self._write_lock:
+            old = self._table
+            if old.rows and vectors.shape[1] != old.matrix.shape[1]:
+                raise ValueError(f"Embedding dimension mismatch: {vectors.shape[1]} != {old.matrix.shape[1]}")
+
+            # 배치 안에서 같은 ID는 마지막 값 사용, 기존 행은 삭제 표시
+            latest = {doc_id: i for i, doc_id in enumerate(ids)}
+            rows = dict(old.rows)
+            live = np.concatenate([old.live, np.ones(len(latest), dtype=bool)])
+            for doc_id in latest:
+                row = rows.pop(doc_id, None)
+                if row is not None:
+                    live[row] = False
+
+            matrix = self._reserve(old.matrix, old.size, len(latest), vectors.shape[1])
+            order = list(latest.values())
+            matrix[old.size:old.size + len(order)] = vectors[order]
+            for row, (doc_id, i) in enumerate(latest.items(), start=old.size):
+                rows[doc_id] = row
+                old.ids.append(doc_id)
+                old.documents.append(documents[i])
+                old.metadatas.append(metadatas[i])
+                old.attributes.add(row, EquipmentRecord(doc_id, metadatas[i]))
+
+            table = _VectorTable(
+                matrix, old.size + len(order), live, old.ids, old.documents, old.metadatas, rows, old.attributes
+            )
+            self._table = self._compact_if_needed(table)
+            self._dirty = True
+
+    def delete(self, ids: List[str]) -> None:
+        with self._write_lock:
+            old = self._table
+            rows = dict(old.rows)
+            live = old.live.copy()
+            for doc_id in ids:
+                row = rows.pop(doc_id, None)
+                if row is not None:
+                    live[row] = False
+            if len(rows) == len(old.rows):
+                return
+            table = _VectorTable(
+                old.matrix, old.size, live, old.ids, old.documents, old.metadatas, rows, old.attributes
+            )
+            self._table = self._compact_if_needed(table)
+            self._dirty = True
+
+    @staticmethod
+    def _reserve(matrix: np.ndarray, size: int, extra: int, dim: int) -> np.ndarray:
+        """행 extra개를 추가할 수 있는 행렬 (용량이 부족하거나 읽기 전용이면 두 배로 늘려 복사)"""
+        needed = size + extra
+        if matrix.shape[0] >= needed and matrix.shape[1] == dim and matrix.flags.writeable:
+            return matrix
+        grown = np.empty((max(needed, 2 * matrix.shape[0], 16), dim), dtype=np.float32)
+        if size:
+            grown[:size] = matrix[:size]
+        return grown
+
+    def _compact_if_needed(self, table: _VectorTable) -> _VectorTable:
+        """삭제된 행이 충분히 쌓이면 활성 행만 남긴 새 상태로 교체 (비용 상각)"""
+        if table.size - len(table.rows) <= max(self.COMPACT_MIN_DELETED, len(table.rows)):
+            return table
+        rows = np.flatnonzero(table.live)
+        return _VectorTable.build(
+            [table.ids[row] for row in rows],
+            [table.documents[row] for row in rows],
+            [table.metadatas[row] for row in rows],
+            table.matrix[rows]
+        )
+
+    def get(self, ids=None, limit=None, offset=0) -> Dict[str, list]:
+        table = self._table
+        if ids is not None:
+            rows = [table.rows[doc_id] for doc_id in ids if doc_id in table.rows]
+        else:
+            end = None if limit is None else offset + limit
+            rows = np.flatnonzero(table.live)[offset:end].tolist()
+        return {
+            "ids": [table.ids[row] for row in rows],
+            "documents": [table.documents[row] for row in rows],
+            "metadatas": [table.metadatas[row] for row in rows],
+        }
+
+    def query(self, embedding, top_k, filters=None):
+        return self.query_many(np.asarray(embedding)[None, :], top_k, filters)[0]
+
+    def query_many(self, embeddings, top_k, filters=None):
+        """(문서 수 x 차원) x (차원 x 질의 수) 행렬 곱 한 번으로 모든 질의 점수 계산"""
+        table = self._table
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        if not table.rows:
+            return [[] for _ in range(len(embeddings))]
+
+        queries = _normalize_rows(embeddings)
+        mask = table.attributes.mask(normalize_filters(filters), table.size)
+        if mask is None and len(table.rows) == table.size:
+            rows = None
+            scores = table.matrix[:table.size] @ queries.T
+        else:
+            rows = np.flatnonzero(table.live if mask is None else mask & table.live)
+            scores = table.matrix[rows] @ queries.T
+
+        results = []
+        for q in range(len(queries)):
+            column = scores[:, q]
+            hits = []
+            for i in top_k_indices(column, top_k):
+                row = int(i) if rows is None else int(rows[i])
+                hits.append((table.ids[row], table.metadatas[row], max(0.0, float(column[i]))))
+            results.append(hits)
+        return results
+
+    def query_ids_many(self, embeddings, ids, top_k):
+        table = self._table
+        rows = [table.rows[doc_id] for doc_id in ids if doc_id in table.rows]
+        return _rank_rows(
+            [table.ids[row] for row in rows],
+            [table.metadatas[row] for row in rows],
+            table.matrix[rows] if rows else table.matrix[:0],
+            embeddings,
+            top_k
+        )
+
+    def clear(self) -> None:
+        with self._write_lock:
+            table = self._empty_table()
+            self._save(table)
+            self._table = table
+            self._dirty = False
+
+
+VECTOR_BACKENDS = ("chroma", "numpy")
 
 
 class RAGPipeline:
     """RAG 파이프라인 (벡터 검색 + BM25 하이브리드)"""
 
     def __init__(self):
-        self.client = None
-        self.collection = None
+        self.vector_store: Optional[VectorStore] = None
         self.embedding_fn = None
+        self.query_batcher: Optional[EmbeddingBatcher] = None  # 질의 임베딩 마이크로 배처 (QUERY_BATCHING)
+        self.embedding_store: Optional[DocumentEmbeddingStore] = None  # 문서 임베딩 영속 캐시
+        self.records = EquipmentRecordStore()  # ID -> 파싱된 장비 레코드 (검색 결과가 참조)
+        # 필터 선택도에 따른 벡터 검색 계획 (레코드 통계 사용)
+        self.filter_planner = FilterPlanner(
+            exact_max_candidates=settings.FILTER_EXACT_MAX_CANDIDATES,
+            postfilter_min_selectivity=settings.FILTER_POSTFILTER_MIN_SELECTIVITY,
+            max_candidate_pool=settings.FILTER_MAX_CANDIDATE_POOL
+        )
+        # 하이브리드 검색의 벡터 / BM25 단계 병렬 실행용 (처음 사용할 때 생성)
+        self._leg_pool: Optional[ThreadPoolExecutor] = None
+        self._leg_pool_lock = threading.Lock()
         self._initialized = False
         self._hybrid_initialized = False
+        # 카탈로그 해시 + BM25 인덱스 갱신을 영속화와 직렬화 (해시와 저장 내용이 어긋나지 않도록)
+        self._catalog_lock = threading.RLock()
+        # 지연 영속화 (PERSIST_DELAY): 벡터 저장소 파일 / 카탈로그 해시 / BM25 스냅샷
+        self._persist_timer: Optional[threading.Timer] = None
+        self._pending_writes = False
+        # 카탈로그 내용 해시 (레코드 해시의 합, 순서 무관 / 증분 갱신), None이면 미확인
+        self._catalog_sum: Optional[int] = None
+        self._stored_catalog_hash: Optional[str] = None  # 카탈로그 상태 파일에 마지막으로 기록한 값
+        # 질의 임베딩 캐시 (반복 질의 인코딩 생략)
+        self.query_cache = QueryEmbeddingCache(
+            max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl=settings.QUERY_EMBEDDING_CACHE_TTL
+        )
 
     def initialize(self):
         """RAG 파이프라인 초기화"""
         if self._initialized:
             return
 
-        # ChromaDB 클라이언트 생성
-        persist_dir = Path(settings.CHROMA_PERSIST_DIR)
-        persist_dir.mkdir(parents=True, exist_ok=True)
+        # 임베딩 함수 설정 (multilingual-e5-large, settings.EMBEDDING_BACKEND)
+        self.embedding_fn = create_embedding_function()
+        if settings.QUERY_BATCHING:
+            self.query_batcher = EmbeddingBatcher(
+                self.embedding_fn,
+                window_ms=settings.QUERY_BATCH_WINDOW_MS,
+                max_batch_size=settings.QUERY_BATCH_MAX_SIZE
+            )
+        self.embedding_store = DocumentEmbeddingStore(Path(settings.EMBEDDING_CACHE_PATH))
 
-        self.client = chromadb.PersistentClient(path=str(persist_dir))
+        # 벡터 저장소 (settings.VECTOR_BACKEND)
+        self.vector_store = self._create_vector_store(settings.VECTOR_BACKEND)
 
-        # 임베딩 함수 설정 (multilingual-e5-large)
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=settings.EMBEDDING_MODEL
-        )
+        self._catalog_sum = self._load_catalog_hash()
+        self._stored_catalog_hash = self.catalog_hash
+        if self._catalog_sum is None and self.vector_store.count() == 0:
+            self._catalog_sum = 0
 
-        # 컬렉션 가져오기 또는 생성
-        self.collection = self.client.get_or_create_collection(
-            name=settings.CHROMA_COLLECTION_NAME,
-            embedding_function=self.embedding_fn,
-            metadata={"description": "KION 팹서비스 장비 데이터"}
+        self._initialized = True
+        print(
+            f"[RAG] Initialized. Backend: {settings.VECTOR_BACKEND}, "
+            f"Collection: {settings.CHROMA_COLLECTION_NAME}, Documents: {self.vector_store.count()}"
         )
 
-        self._initialized = True
-        print(f"[RAG] Initialized. Collection: {settings.CHROMA_COLLECTION_NAME}, Documents: {self.collection.count()}")
+    def _create_vector_store(self, backend: str) -> VectorStore:
+        if backend == "chroma":
+            return ChromaVectorStore(
+                Path(settings.CHROMA_PERSIST_DIR), settings.CHROMA_COLLECTION_NAME, self.embedding_fn
+            )
+        if backend == "numpy":
+            return NumpyVectorStore(Path(settings.VECTOR_STORE_PATH))
+        raise ValueError(f"Unknown vector backend: {backend} (available: {list(VECTOR_BACKENDS)})")
 
     def add_equipment(self, equipment: Equipment) -> None:
         """장비 데이터 추가"""
-        if not self._initialized:
-            self.initialize()
-
-        # 검색용 텍스트 생성
-        search_text = self._create_search_text(equipment)
-
-        # 메타데이터 생성
-        metadata = {
-            "equipment_id": equipment.equipment_id,
-            "name": equipment.name,
-            "category": equipment.category,
-            "part": equipment.part,
-            "wafer_sizes": ",".join(equipment.wafer_sizes),
-            "materials": ",".join(equipment.materials),
-            "temp_min": equipment.temp_min or 0,
-            "temp_max": equipment.temp_max or 9999,
-            "institution": equipment.institution,
-            "tags": ",".join(equipment.tags),
-        }
-
-        # ChromaDB에 추가
-        self.collection.upsert(
-            ids=[equipment.equipment_id],
-            documents=[search_text],
-            metadatas=[metadata]
-        )
+        self.add_equipments_batch([equipment])
 
     def add_equipments_batch(self, equipments: List[Equipment]) -> int:
         """장비 데이터 일괄 추가"""
         if not self._initialized:
             self.initialize()
 
+        ids, documents, metadatas = self.prepare_records(equipments)
+        if not ids:
+            return 0
+
+        return self.upsert_records(ids, documents, metadatas, self.embed_documents(documents))
+
+    def prepare_records(self, equipments: List[Equipment]) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """장비 -> (ID, 검색 텍스트, 메타데이터) 변환 (메타데이터에 content_hash 포함)"""
         ids = []
         documents = []
         metadatas = []
@@ -90,31 +590,259 @@ class RAGPipeline:
         for eq in equipments:
             ids.append(eq.equipment_id)
             documents.append(self._create_search_text(eq))
-            metadatas.append({
-                "equipment_id": eq.equipment_id,
-                "name": eq.name,
-                "name_en": eq.name_en or "",
-                "category": eq.category,
-                "part": eq.part,
-                "wafer_sizes": ",".join(eq.wafer_sizes),
-                "materials": ",".join(eq.materials),
-                "temp_min": eq.temp_min or 0,
-                "temp_max": eq.temp_max or 9999,
-                "institution": eq.institution,
-                "location": eq.location or "",
-                "tags": ",".join(eq.tags),
-                "reservation_url": eq.reservation_url or "",
-                "description": eq.description[:500],  # 설명은 500자 제한
-            })
+            metadatas.append(self._create_metadata(eq))
 
-        self.collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+        # 레코드 내용 해시 (스냅샷 유효성 / 변경 감지용)
+        for eq_id, text, metadata in zip(ids, documents, metadatas):
+            metadata["content_hash"] = content_hash(eq_id, text, metadata)
+
+        return ids, documents, metadatas
+
+    def upsert_records(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+        persist: bool = True
+    ) -> int:
+        """
+        임베딩이 계산된 레코드 upsert (벡터 저장소 + 카탈로그 해시 + BM25 인덱스)
+
+        Args:
+            persist: 지연 영속화 예약 여부 (대량 적재는 마지막에 flush() 한 번)
+        """
+        if not self._initialized:
+            self.initialize()
+
+        # 해시 계산 ~ 저장소 쓰기 ~ 해시 갱신을 한 잠금 안에서 (동시 쓰기가 같은 기준 해시를 쓰지 않도록)
+        with self._catalog_lock:
+            catalog_sum = self._catalog_sum_after(ids, metadatas)
+            self._invalidate_catalog_hash()  # 쓰기 도중 중단되면 스냅샷을 신뢰하지 않도록
+            self.vector_store.upsert(ids, documents, metadatas, embeddings)
+            self._pending_writes = True
+            self._store_catalog_hash(catalog_sum)
+            self.records.upsert(ids, metadatas)
+            self._sync_hybrid_index(ids, documents, metadatas)
+        if persist:
+            self.schedule_persist()
 
         return len(ids)
 
+    def delete_equipments(self, equipment_ids: List[str]) -> int:
+        """장비 데이터 삭제 (벡터 저장소 + BM25 인덱스)"""
+        if not self._initialized:
+            self.initialize()
+
+        if not equipment_ids:
+            return 0
+
+        with self._catalog_lock:
+            catalog_sum = self._catalog_sum_after(equipment_ids, [])
+            self._invalidate_catalog_hash()
+            self.vector_store.delete(equipment_ids)
+            self._pending_writes = True
+            self._store_catalog_hash(catalog_sum)
+            self.records.delete(equipment_ids)
+            if self._hybrid_initialized:
+                hybrid_searcher.delete_documents(equipment_ids)
+        self.schedule_persist()
+
+        return len(equipment_ids)
+
+    def sync_catalog(self, equipments: List[Equipment]) -> Dict[str, int]:
+        """
+        카탈로그 동기화 (내용 해시 비교 후 변경분만 반영)
+
+        - 새 레코드 / 내용이 바뀐 레코드만 upsert (임베딩 + BM25 증분)
+        - 입력에 없는 기존 레코드는 삭제
+        - 카탈로그 해시가 같으면 저장소 조회 없이 종료
+
+        Returns:
+            {"added", "updated", "deleted", "unchanged"} 건수
+        """
+        if not self._initialized:
+            self.initialize()
+
+        # 같은 ID가 여러 번 나오면 마지막 레코드 사용
+        incoming: Dict[str, Equipment] = {eq.equipment_id: eq for eq in equipments}
+        hashes: Dict[str, str] = {}
+        for eq_id, eq in incoming.items():
+            hashes[eq_id] = content_hash(eq_id, self._create_search_text(eq), self._create_metadata(eq))
+
+        counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        incoming_sum = sum(int(h, 16) for h in hashes.values()) % _HASH_MOD
+        if self._catalog_sum is not None and incoming_sum == self._catalog_sum:
+            counts["unchanged"] = len(hashes)
+            print(f"[RAG] Catalog sync: unchanged ({len(hashes)} records)")
+            return counts
+
+        existing = self._stored_hashes()
+        changed = []
+        for eq_id, new_hash in hashes.items():
+            old_hash = existing.get(eq_id)
+            if old_hash == new_hash:
+                counts["unchanged"] += 1
+                continue
+            counts["updated" if eq_id in existing else "added"] += 1
+            changed.append(incoming[eq_id])
+        removed = [eq_id for eq_id in existing if eq_id not in incoming]
+        counts["deleted"] = len(removed)
+
+        batch_size = settings.CATALOG_SYNC_BATCH_SIZE
+        for start in range(0, len(changed), batch_size):
+            self.add_equipments_batch(changed[start:start + batch_size])
+        for start in range(0, len(removed), batch_size):
+            self.delete_equipments(removed[start:start + batch_size])
+        self.flush()
+
+        print(
+            f"[RAG] Catalog sync: +{counts['added']} ~{counts['updated']} "
+            f"-{counts['deleted']} ={counts['unchanged']}"
+        )
+        return counts
+
+    def _stored_hashes(self) -> Dict[str, str]:
+        """저장된 레코드별 내용 해시 (ID -> content_hash, 메타데이터만 페이지 단위 조회)"""
+        hashes: Dict[str, str] = {}
+        page_size = settings.CATALOG_SYNC_BATCH_SIZE
+        offset = 0
+        while True:
+            page = self.vector_store.get(limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            for i, eq_id in enumerate(ids):
+                metadata = page["metadatas"][i] or {}
+                # 해시가 없는 예전 레코드는 빈 값 -> 변경으로 간주하여 다시 색인
+                hashes[eq_id] = metadata.get("content_hash", "")
+            if len(ids) < page_size:
+                return hashes
+            offset += page_size
+
+    def _sync_hybrid_index(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """벡터 저장소 upsert 내용을 BM25 인덱스에 증분 반영 (초기화 전이면 생략)"""
+        if not self._hybrid_initialized:
+            return
+
+        hybrid_searcher.upsert_documents([
+            {"id": eq_id, "text": text, "metadata": metadata}
+            for eq_id, text, metadata in zip(ids, documents, metadatas)
+        ])
+
+    # === 카탈로그 해시 / 렉시컬 인덱스 스냅샷 ===
+
+    @property
+    def catalog_hash(self) -> Optional[str]:
+        """현재 카탈로그 내용 해시 (미확인이면 None)"""
+        if self._catalog_sum is None:
+            return None
+        return f"{self._catalog_sum:016x}"
+
+    def _catalog_sum_after(self, ids: List[str], new_metadatas: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        ids 레코드를 new_metadatas로 교체(없으면 삭제)한 후의 카탈로그 해시 계산 (_catalog_lock 안에서 호출)
+
+        기존 레코드 해시는 해당 ids만 조회 (전체 카탈로그 스캔 없음)
+        """
+        if self._catalog_sum is None:
+            return None
+
+        existing = self.vector_store.get(ids=ids)
+        total = self._catalog_sum
+        for i, eq_id in enumerate(existing.get("ids") or []):
+            metadata = existing["metadatas"][i] or {}
+            old_hash = metadata.get("content_hash") or content_hash(
+                eq_id, existing["documents"][i] or "", metadata
+            )
+            total -= int(old_hash, 16)
+        for metadata in new_metadatas:
+            total += int(metadata["content_hash"], 16)
+        return total % _HASH_MOD
+
+    def _catalog_state_path(self) -> Path:
+        return self.vector_store.catalog_state_path
+
+    def _load_catalog_hash(self) -> Optional[int]:
+        try:
+            with open(self._catalog_state_path(), "r", encoding="utf-8") as f:
+                value = json.load(f).get("catalog_hash")
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return int(value, 16) if value else None
+
+    def _store_catalog_hash(self, value: Optional[int]) -> None:
+        """
+        카탈로그 해시 갱신 (_catalog_lock 안에서 호출)
+
+        영속화되지 않은 쓰기가 있으면 메모리에만 반영하고 파일은 flush()에서 한 번 기록
+        """
+        self._catalog_sum = value
+        if not self._pending_writes and not self.vector_store.dirty:
+            self._write_catalog_state(self.catalog_hash)
+
+    def _invalidate_catalog_hash(self) -> None:
+        """저장소 쓰기 전 파일의 해시를 미확인으로 기록 (flush 전까지 한 번만)"""
+        self._write_catalog_state(None)
+
+    def _write_catalog_state(self, stored: Optional[str]) -> None:
+        if stored == self._stored_catalog_hash:
+            return
+        with open(self._catalog_state_path(), "w", encoding="utf-8") as f:
+            json.dump({"catalog_hash": stored}, f)
+        self._stored_catalog_hash = stored
+
+    def save_lexical_snapshot(self) -> None:
+        """BM25 인덱스 스냅샷 즉시 저장 (BM25 인덱스가 초기화되고 카탈로그 해시가 확인된 경우만)"""
+        with self._catalog_lock:
+            catalog_hash = self.catalog_hash
+            snapshot = hybrid_searcher.snapshot
+        if not self._hybrid_initialized or catalog_hash is None:
+            return
+        try:
+            hybrid_searcher.save_snapshot(Path(settings.LEXICAL_INDEX_PATH), catalog_hash, snapshot)
+        except OSError as e:
+            print(f"[RAG] Lexical snapshot save error: {e}")
+
+    # === 지연 영속화 ===
+
+    def schedule_persist(self) -> None:
+        """
+        영속화 예약 (증분 갱신 후 호출)
+
+        PERSIST_DELAY 초 안의 변경은 모아서 한 번만 저장 (갱신마다 전체 파일을 다시 쓰지 않음)
+        """
+        if settings.PERSIST_DELAY <= 0:
+            self.flush()
+            return
+        with self._catalog_lock:
+            if self._persist_timer is None:
+                self._persist_timer = threading.Timer(settings.PERSIST_DELAY, self.flush)
+                self._persist_timer.daemon = True
+                self._persist_timer.start()
+
+    def flush(self) -> None:
+        """
+        보류 중인 쓰기 영속화 (적재 완료 / 종료 시, 또는 예약 후 PERSIST_DELAY 초 뒤)
+
+        벡터 저장소 -> 카탈로그 해시 -> BM25 스냅샷 순서로 저장
+        """
+        if not self._initialized:
+            return
+        with self._catalog_lock:
+            timer, self._persist_timer = self._persist_timer, None
+            pending, self._pending_writes = self._pending_writes, False
+            if pending:
+                self.vector_store.flush()
+                self._store_catalog_hash(self._catalog_sum)
+        if timer is not None:
+            timer.cancel()
+        if pending:
+            self.save_lexical_snapshot()
+
     def search(
         self,
         query: str,
@@ -127,91 +855,238 @@ class RAGPipeline:
         Args:
             query: 검색 쿼리
             top_k: 반환할 결과 수
-            filters: 메타데이터 필터 (예: {"category": "증착"})
+            filters: 메타데이터 필터 (예: {"category": "증착", "wafer_sizes": ["6 inch"]},
+                키와 의미는 filter_planner.normalize_filters 참고)
+
+        Returns:
+            검색된 장비 리스트 (일반 dict, 목록 필드는 list)
+        """
+        return _to_dicts(self.search_hits(query, top_k, filters))
+
+    def search_hits(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[EquipmentHit]:
+        """search와 같은 검색, 결과는 레코드를 참조하는 EquipmentHit (목록 필드는 튜플, 하이브리드 / 필터 단계용)"""
+        if not self._initialized:
+            self.initialize()
+
+        # 필터 계획 (조건을 만족하는 장비 수에 따라 실행 방식 선택, 만족하는 장비가 없으면 임베딩 생략)
+        plan = self._plan_filters(filters, top_k)
+        if plan.candidate_ids == []:
+            return []
+
+        # 검색 실행 (질의 임베딩은 캐시 사용)
+        embedding = self.embed_query(query)
+        return self._to_hits(self._execute_plan(plan, embedding[None, :], top_k)[0])
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 질의 일괄 검색 (평가 / 캐시 예열용)
+
+        캐시에 없는 질의를 인코더 한 번에 임베딩하고, 벡터 검색도 질의 행렬로 한 번에 실행
 
         Returns:
-            검색된 장비 리스트
+            질의 순서대로 search와 같은 형식의 결과 리스트
         """
+        return [_to_dicts(hits) for hits in self._search_hits_many(queries, top_k, filters)]
+
+    def _search_hits_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[EquipmentHit]]:
+        """search_many의 EquipmentHit 버전"""
         if not self._initialized:
             self.initialize()
+        if not queries:
+            return []
 
-        # ChromaDB where 필터 구성
-        where_filter = None
-        if filters:
-            where_conditions = []
-            for key, value in filters.items():
-                if key == "wafer_size" and value:
-                    # 웨이퍼 사이즈는 포함 여부로 검색
-                    where_conditions.append({"wafer_sizes": {"$contains": value}})
-                elif key == "material" and value:
-                    where_conditions.append({"materials": {"$contains": value}})
-                elif key == "temp_min" and value:
-                    where_conditions.append({"temp_max": {"$gte": float(value)}})
-                elif key == "temp_max" and value:
-                    where_conditions.append({"temp_min": {"$lte": float(value)}})
-                elif key == "category" and value:
-                    where_conditions.append({"category": {"$eq": value}})
-                elif key == "institution" and value:
-                    where_conditions.append({"institution": {"$eq": value}})
-
-            if len(where_conditions) == 1:
-                where_filter = where_conditions[0]
-            elif len(where_conditions) > 1:
-                where_filter = {"$and": where_conditions}
-
-        # 검색 실행
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"]
+        plan = self._plan_filters(filters, top_k)
+        if plan.candidate_ids == []:
+            return [[] for _ in queries]
+
+        hits = self._execute_plan(plan, self.embed_queries(queries), top_k)
+        return [self._to_hits(query_hits) for query_hits in hits]
+
+    def _plan_filters(self, filters: Optional[Dict[str, Any]], top_k: int) -> FilterPlan:
+        return self.filter_planner.plan(
+            filters,
+            top_k,
+            self._record_store(),
+            self.vector_store.pushable_filters,
+            exact_store=self.vector_store.exact_filters,
+            exact_max_candidates=self.vector_store.exact_max_candidates
         )
 
-        # 결과 포맷팅
-        equipments = []
-        if results and results["ids"] and results["ids"][0]:
-            for i, eq_id in enumerate(results["ids"][0]):
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i] if results["distances"] else 0
+    def _execute_plan(
+        self,
+        plan: FilterPlan,
+        embeddings: np.ndarray,
+        top_k: int
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """
+        필터 계획 실행 (질의 순서대로 결과)
 
-                # 유사도 점수 계산 (거리 → 유사도)
-                similarity = max(0, 1 - distance / 2)
-
-                equipments.append({
-                    "equipment_id": eq_id,
-                    "name": metadata.get("name", ""),
-                    "name_en": metadata.get("name_en", ""),
-                    "category": metadata.get("category", ""),
-                    "part": metadata.get("part", ""),
-                    "wafer_sizes": metadata.get("wafer_sizes", "").split(",") if metadata.get("wafer_sizes") else [],
-                    "materials": metadata.get("materials", "").split(",") if metadata.get("materials") else [],
-                    "temp_min": metadata.get("temp_min"),
-                    "temp_max": metadata.get("temp_max"),
-                    "institution": metadata.get("institution", ""),
-                    "location": metadata.get("location", ""),
-                    "description": metadata.get("description", ""),
-                    "tags": metadata.get("tags", "").split(",") if metadata.get("tags") else [],
-                    "reservation_url": metadata.get("reservation_url", ""),
-                    "score": round(similarity, 4),
-                })
+        후처리 결과가 top_k보다 적은 질의는 다시 검색
+        - 조건을 만족하는 장비가 저장소의 exact_max_candidates 이하: 해당 장비만 전수 비교
+        - 그보다 많으면: 후보를 전체 장비 수로 늘려 검색 후 후처리 (ChromaDB에서 임베딩 대량 조회 방지)
+        """
+        if plan.strategy == "exact":
+            return self.vector_store.query_ids_many(embeddings, plan.candidate_ids, top_k)
+
+        results = self.vector_store.query_many(embeddings, plan.candidate_k, plan.pushdown or None)
+        if not plan.residual:
+            return results
+
+        records = self._record_store()
+        results = [self._residual_hits(hits, plan.residual, top_k) for hits in results]
+        short = [q for q, hits in enumerate(results) if len(hits) < top_k]
+        if short and plan.candidate_k < len(records):
+            if plan.feasible <= self.vector_store.exact_max_candidates:
+                retried = self.vector_store.query_ids_many(
+                    embeddings[short], self.filter_planner.candidate_ids(plan.filters, records), top_k
+                )
+            else:
+                retried = [
+                    self._residual_hits(hits, plan.residual, top_k)
+                    for hits in self.vector_store.query_many(embeddings[short], len(records), plan.pushdown or None)
+                ]
+            for q, hits in zip(short, retried):
+                results[q] = hits
+        return results
+
+    def _residual_hits(
+        self,
+        hits: List[Tuple[str, Dict[str, Any], float]],
+        residual: Dict[str, Any],
+        top_k: int
+    ) -> List[Tuple[str, Dict[str, Any], float]]:
+        """저장소가 처리하지 못한 조건으로 검색 결과 후처리"""
+        records = self._record_store()
+        return [hit for hit in hits if matches(records.record_for(hit[0], hit[1]), residual)][:top_k]
+
+    def _to_hits(self, hits: List[Tuple[str, Dict[str, Any], float]]) -> List[EquipmentHit]:
+        """결과는 레코드 참조 + 점수 (레코드는 ID별로 한 번만 파싱)"""
+        records = self._record_store()
+        return [
+            EquipmentHit(records.record_for(eq_id, metadata), score=round(similarity, 4))
+            for eq_id, metadata, similarity in hits
+        ]
+
+    def build_attribute_index(self) -> None:
+        """장비 속성 인덱스 미리 생성 (적재 직후 호출 -> 첫 검색에서 생성 비용 없음)"""
+        index = self.filter_planner.index(self._record_store())
+        print(f"[RAG] Attribute index built ({index.size} equipment)")
+
+    def _record_store(self) -> EquipmentRecordStore:
+        """장비 레코드 저장소 (처음 사용할 때 벡터 저장소에서 한 번 적재)"""
+        if not self.records.loaded:
+            all_docs = self.vector_store.get()
+            self.records.load(all_docs.get("ids") or [], all_docs.get("metadatas") or [])
+        return self.records
+
+    def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        """
+        문서 임베딩 (영속 캐시 우선, 없는 문서만 배치 인코딩)
+
+        키는 (임베딩 모델, 검색 텍스트) 해시 -> 내용이 바뀌지 않은 레코드는 다시 인코딩하지 않음
+        """
+        if not self._initialized:
+            self.initialize()
+
+        keys = [embedding_key(embedding_model_key(), text) for text in documents]
+        cached = self.embedding_store.get_many(keys)
+
+        # 캐시에 없는 문서만 (중복 텍스트는 한 번) 배치 인코딩
+        missing = list(dict.fromkeys(
+            (key, text) for key, text in zip(keys, documents) if key not in cached
+        ))
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            vectors = self.embedding_fn([text for _, text in batch])
+            encoded = [(key, np.asarray(vector, dtype=np.float32)) for (key, _), vector in zip(batch, vectors)]
+            self.embedding_store.put_many(encoded)
+            cached.update(encoded)
+
+        if missing:
+            print(f"[RAG] Embedded {len(missing)} documents ({len(documents) - len(missing)} cached)")
+        return [cached[key].tolist() for key in keys]
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        질의 임베딩 (LRU + TTL 캐시)
+
+        정규화된 질의 + 모델명을 키로 사용하고, 실패 시에만 인코딩
+        (QUERY_BATCHING이면 동시에 들어온 다른 요청의 질의와 함께 배치 인코딩)
+        """
+        if not self._initialized:
+            self.initialize()
+
+        text = normalize_query(query)
+        model = embedding_model_key()
+        embedding = self.query_cache.get(model, text)
+        if embedding is None:
+            encode = self.query_batcher.encode if self.query_batcher else self.embedding_fn
+            embedding = self.query_cache.put(model, text, encode([text])[0])
+        return embedding
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        질의 여러 개 임베딩 (질의 순서대로 (질의 수 x 차원) 행렬)
+
+        캐시에 없는 질의만 (중복은 한 번) 인코더 한 번 호출로 임베딩
+        """
+        if not self._initialized:
+            self.initialize()
 
-        return equipments
+        texts = [normalize_query(query) for query in queries]
+        model = embedding_model_key()
+        embeddings = {text: self.query_cache.get(model, text) for text in dict.fromkeys(texts)}
+        missing = [text for text, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for text, vector in zip(missing, self.embedding_fn(missing)):
+                embeddings[text] = self.query_cache.put(model, text, vector)
+        return np.stack([np.asarray(embeddings[text], dtype=np.float32) for text in texts])
 
     def initialize_hybrid_search(self) -> None:
         """하이브리드 검색을 위한 BM25 인덱스 초기화"""
         if not self._initialized:
             self.initialize()
 
-        # ChromaDB에서 모든 문서 가져오기
-        all_docs = self.collection.get(include=["documents", "metadatas"])
+        # 카탈로그가 바뀌지 않았으면 저장된 스냅샷을 메모리 매핑으로 로드
+        # (장비 레코드 / 속성 인덱스도 스냅샷에서 가져옴 -> 벡터 저장소 전체 조회 / 메타데이터 디코딩 없음)
+        if self.catalog_hash is not None and hybrid_searcher.load_snapshot(
+            Path(settings.LEXICAL_INDEX_PATH), self.catalog_hash
+        ):
+            snap = hybrid_searcher.snapshot
+            # 레코드는 처음 조회할 때 파싱, 속성 인덱스는 스냅샷의 메모리 매핑 인덱스 그대로 사용
+            self.records.load_lazy(list(snap.id_to_doc), snap.doc_metadata)
+            self.filter_planner.set_index(snap.attributes, self.records.version)
+            self._hybrid_initialized = True
+            self.build_attribute_index()
+            return
+
+        # 벡터 저장소에서 모든 문서 가져오기
+        all_docs = self.vector_store.get() or {}
+        ids = all_docs.get("ids") or []
 
-        if not all_docs or not all_docs.get("ids"):
+        # 문서가 없어도 빈 인덱스로 초기화 (이후 추가는 증분 반영, 검색마다 다시 초기화하지 않음)
+        if not ids:
             print("[RAG] No documents to initialize hybrid search")
-            return
 
         # BM25용 문서 구성
         documents = []
-        for i, doc_id in enumerate(all_docs["ids"]):
+        for i, doc_id in enumerate(ids):
             text = all_docs["documents"][i] if all_docs.get("documents") else ""
             metadata = all_docs["metadatas"][i] if all_docs.get("metadatas") else {}
 
@@ -221,9 +1096,20 @@ class RAGPipeline:
                 "metadata": metadata
             })
 
-        # 하이브리드 검색 초기화
+        # 전체 문서를 읽은 김에 카탈로그 해시 재계산
+        catalog_sum = sum(
+            int(doc["metadata"].get("content_hash") or content_hash(doc["id"], doc["text"], doc["metadata"]), 16)
+            for doc in documents
+        ) % _HASH_MOD
+        with self._catalog_lock:
+            self._store_catalog_hash(catalog_sum)
+
+        # 하이브리드 검색 초기화 (장비 레코드도 함께 적재)
+        self.records.load(ids, [doc["metadata"] for doc in documents])
         hybrid_searcher.initialize(documents)
         self._hybrid_initialized = True
+        self.save_lexical_snapshot()
+        self.build_attribute_index()
         print(f"[RAG] Hybrid search initialized with {len(documents)} documents")
 
     def hybrid_search(
@@ -232,7 +1118,9 @@ class RAGPipeline:
         top_k: int = 10,
         filters: Optional[Dict[str, Any]] = None,
         vector_weight: float = 0.5,
-        bm25_weight: float = 0.5
+        bm25_weight: float = 0.5,
+        fusion: Optional[str] = None,
+        candidate_k: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         하이브리드 검색 (BM25 + 벡터)
@@ -243,9 +1131,30 @@ class RAGPipeline:
             filters: 메타데이터 필터
             vector_weight: 벡터 검색 가중치 (기본 0.5)
             bm25_weight: BM25 가중치 (기본 0.5)
+            fusion: 점수 결합 방식 ("weighted", "rrf", "zscore", 기본 settings.HYBRID_FUSION)
+            candidate_k: 검색별 후보 수 (기본 top_k * 2)
 
         Returns:
-            hybrid_score가 포함된 검색 결과
+            hybrid_score가 포함된 검색 결과 (일반 dict, 목록 필드는 list)
+        """
+        return _to_dicts(self.hybrid_search_hits(
+            query, top_k, filters, vector_weight, bm25_weight, fusion, candidate_k
+        ))
+
+    def hybrid_search_hits(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        vector_weight: float = 0.5,
+        bm25_weight: float = 0.5,
+        fusion: Optional[str] = None,
+        candidate_k: Optional[int] = None
+    ) -> List[EquipmentHit]:
+        """
+        hybrid_search와 같은 검색, 결과는 레코드를 참조하는 EquipmentHit (목록 필드는 튜플)
+
+        결과를 바로 필터 / 리랭킹하는 호출자용 (필터가 레코드의 미리 계산된 집합 사용)
         """
         if not self._initialized:
             self.initialize()
@@ -253,12 +1162,10 @@ class RAGPipeline:
         if not self._hybrid_initialized:
             self.initialize_hybrid_search()
 
-        # 1. 벡터 검색 (더 많이 가져옴)
-        vector_results = self.search(
-            query=query,
-            top_k=top_k * 2,
-            filters=filters
-        )
+        candidate_k = candidate_k or top_k * 2
+
+        # 1. 벡터 검색 / BM25 검색 (병렬, 단계별 제한 시간 - 한쪽이 실패하면 다른 쪽 결과만 사용)
+        vector_results, lexical = self._retrieve_legs(query, candidate_k, filters)
 
         # 2. 하이브리드 결합
         hybrid_results = hybrid_searcher.hybrid_search(
@@ -266,22 +1173,148 @@ class RAGPipeline:
             vector_results=vector_results,
             top_k=top_k,
             vector_weight=vector_weight,
-            bm25_weight=bm25_weight
+            bm25_weight=bm25_weight,
+            fusion=fusion or settings.HYBRID_FUSION,
+            candidate_k=candidate_k,
+            filters=filters,
+            lexical=lexical
         )
 
+        return self._record_hits(hybrid_results)
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        vector_weight: float = 0.5,
+        bm25_weight: float = 0.5,
+        fusion: Optional[str] = None,
+        candidate_k: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 질의 일괄 하이브리드 검색 (인자는 hybrid_search와 동일, 모든 질의에 같은 필터 적용)
+
+        벡터 단계는 search_many (인코더 1회 + 행렬 곱 1회), BM25 단계는 희소 행렬 곱 1회로 실행하고
+        질의별 결합만 따로 수행
+
+        Returns:
+            질의 순서대로 hybrid_search와 같은 형식의 결과 리스트
+        """
+        if not self._initialized:
+            self.initialize()
+
+        if not self._hybrid_initialized:
+            self.initialize_hybrid_search()
+
+        if not queries:
+            return []
+
+        candidate_k = candidate_k or top_k * 2
+        vector_results, lexicals = self._retrieve_legs(queries, candidate_k, filters, batched=True)
+
+        return [
+            _to_dicts(self._record_hits(hybrid_searcher.hybrid_search(
+                query=query,
+                vector_results=vector_hits,
+                top_k=top_k,
+                vector_weight=vector_weight,
+                bm25_weight=bm25_weight,
+                fusion=fusion or settings.HYBRID_FUSION,
+                candidate_k=candidate_k,
+                filters=filters,
+                lexical=lexical
+            )))
+            for query, vector_hits, lexical in zip(queries, vector_results, lexicals)
+        ]
+
+    def _record_hits(self, hybrid_results: List[Dict[str, Any]]) -> List[EquipmentHit]:
+        """BM25에서만 찾은 항목(메타데이터 dict)도 레코드 참조로 변환"""
+        records = self._record_store()
+        for i, result in enumerate(hybrid_results):
+            if isinstance(result, dict):
+                hybrid_results[i] = EquipmentHit(
+                    records.record_for(result["equipment_id"], result),
+                    **{k: v for k, v in result.items() if k.endswith("score")}
+                )
         return hybrid_results
 
+    def _retrieve_legs(
+        self,
+        query: Any,
+        candidate_k: int,
+        filters: Optional[Dict[str, Any]],
+        batched: bool = False
+    ) -> Tuple[Any, Any]:
+        """
+        벡터 / BM25 후보 검색
+
+        HYBRID_PARALLEL_LEGS면 두 단계를 스레드 풀에서 동시에 실행하고 각각 제한 시간까지 대기
+        (제한 시간은 두 단계를 시작한 시점 기준). 둘 다 실패하면 벡터 검색 오류를 그대로 전달
+
+        batched면 query는 질의 리스트이고 각 단계 결과도 질의 순서대로의 리스트
+        """
+        search = self._search_hits_many if batched else self.search_hits
+        lexical_candidates = (
+            hybrid_searcher.lexical_candidates_many if batched else hybrid_searcher.lexical_candidates
+        )
+        if not settings.HYBRID_PARALLEL_LEGS:
+            return search(query, candidate_k, filters), lexical_candidates(query, candidate_k, filters)
+
+        start = time.perf_counter()
+        vector_future = self._leg_executor().submit(search, query, candidate_k, filters)
+        lexical_future = self._leg_executor().submit(lexical_candidates, query, candidate_k, filters)
+
+        vector_results, vector_error = self._leg_result(
+            "vector", vector_future, start + settings.VECTOR_LEG_TIMEOUT
+        )
+        lexical, lexical_error = self._leg_result(
+            "lexical", lexical_future, start + settings.LEXICAL_LEG_TIMEOUT
+        )
+        if vector_error and lexical_error:
+            raise vector_error
+
+        if vector_error:
+            vector_results = [[] for _ in query] if batched else []
+        if lexical_error:
+            empty = (hybrid_searcher.snapshot, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+            lexical = [empty] * len(query) if batched else empty
+        return vector_results, lexical
+
+    def _leg_executor(self) -> ThreadPoolExecutor:
+        if self._leg_pool is None:
+            with self._leg_pool_lock:
+                if self._leg_pool is None:
+                    self._leg_pool = ThreadPoolExecutor(
+                        max_workers=settings.RETRIEVAL_WORKERS, thread_name_prefix="retrieval"
+                    )
+        return self._leg_pool
+
+    @staticmethod
+    def _leg_result(name: str, future: Future, deadline: float) -> Tuple[Any, Optional[BaseException]]:
+        """검색 단계 결과 대기 (제한 시간 초과 / 예외 시 (None, 오류))"""
+        try:
+            return future.result(timeout=max(0.0, deadline - time.perf_counter())), None
+        except FutureTimeoutError as e:
+            # 실행 중인 작업은 취소할 수 없으므로 결과만 버림
+            future.cancel()
+            print(f"[RAG] {name} search timed out, degrading to the other leg")
+            return None, e
+        except Exception as e:
+            print(f"[RAG] {name} search failed ({e}), degrading to the other leg")
+            return None, e
+
     def get_count(self) -> int:
         """저장된 장비 수 반환"""
         if not self._initialized:
             self.initialize()
-        return self.collection.count()
+        return self.vector_store.count()
 
     def get_all(self) -> list:
         """모든 장비 메타데이터 반환"""
         if not self._initialized:
             self.initialize()
-        results = self.collection.get()
+        results = self.vector_store.get()
         equipment_list = []
         if results and results.get("ids"):
             for i, eq_id in enumerate(results["ids"]):
@@ -299,13 +1332,39 @@ class RAGPipeline:
         """모든 데이터 삭제"""
         if not self._initialized:
             self.initialize()
-        # 컬렉션 삭제 후 재생성
-        self.client.delete_collection(settings.CHROMA_COLLECTION_NAME)
-        self.collection = self.client.get_or_create_collection(
-            name=settings.CHROMA_COLLECTION_NAME,
-            embedding_function=self.embedding_fn,
-            metadata={"description": "KION 팹서비스 장비 데이터"}
-        )
+        with self._catalog_lock:
+            self._invalidate_catalog_hash()
+            self.vector_store.clear()
+            self._store_catalog_hash(0)
+            self.records.load([], [])
+            # 빈 인덱스로 초기화 완료 처리 (다음 검색에서 스냅샷 로드 / 재구축을 다시 시도하지 않음)
+            hybrid_searcher.initialize([])
+            self._hybrid_initialized = True
+        self.build_attribute_index()
+        self.save_lexical_snapshot()
+
+    def _create_metadata(self, eq: Equipment) -> Dict[str, Any]:
+        """
+        ChromaDB 메타데이터 생성
+
+        온도 정보가 없으면 기본값 저장 (records.MISSING_TEMP_MIN / MISSING_TEMP_MAX, 실제 0도는 그대로)
+        """
+        return {
+            "equipment_id": eq.equipment_id,
+            "name": eq.name,
+            "name_en": eq.name_en or "",
+            "category": eq.category,
+            "part": eq.part,
+            "wafer_sizes": ",".join(eq.wafer_sizes),
+            "materials": ",".join(eq.materials),
+            "temp_min": MISSING_TEMP_MIN if eq.temp_min is None else eq.temp_min,
+            "temp_max": MISSING_TEMP_MAX if eq.temp_max is None else eq.temp_max,
+            "institution": eq.institution,
+            "location": eq.location or "",
+            "tags": ",".join(eq.tags),
+            "reservation_url": eq.reservation_url or "",
+            "description": eq.description[:500],  # 설명은 500자 제한
+        }
 
     def _create_search_text(self, equipment: Equipment) -> str:
         """검색용 텍스트 생성"""
@@ -0,0 +1,237 @@
+"""
+KION RAG - Equipment Record Store
+
+장비 레코드를 ID별로 한 번만 파싱해 보관
+- 쉼표로 연결된 wafer_sizes / materials / tags는 튜플로 미리 분리
+- 필터용 조회 구조(소문자 재료 / 웨이퍼 사이즈 frozenset) 미리 계산
+- 검색 결과는 레코드를 참조하는 EquipmentHit (dict처럼 사용, 점수 등만 별도 보관)
+  RAGPipeline 공개 검색 결과는 to_dict()로 변환한 일반 dict (목록 필드는 list, 기존 형식 유지)
+
+모든 필터 경로(filters / filter_planner.matches / AttributeIndex) 공통 규칙
+- 온도 (temperature_bounds)
+  - 요청 최소 온도(temp_min) 조건은 장비 최고 온도, 요청 최대 온도(temp_max) 조건은 장비 최저 온도로 판정
+  - 온도 정보가 없는 쪽은 기본값 (최저 MISSING_TEMP_MIN / 최고 MISSING_TEMP_MAX, 해당 조건 통과)
+    메타데이터에도 같은 기본값을 저장 (ChromaDB where 결과와 동일)
+- 기관 (institution_matches): 공백 제거 + 소문자로 정규화한 뒤 부분 문자열 일치 ("나노종합" -> "나노종합기술원")
+"""
+
+import threading
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 검색 결과로 노출되는 레코드 필드 (RAGPipeline.search 결과 키와 동일)
+RECORD_FIELDS = (
+    "equipment_id",
+    "name",
+    "name_en",
+    "category",
+    "part",
+    "wafer_sizes",
+    "materials",
+    "temp_min",
+    "temp_max",
+    "institution",
+    "location",
+    "description",
+    "tags",
+    "reservation_url",
+)
+_RECORD_FIELD_SET = frozenset(RECORD_FIELDS)
+# 레코드에는 튜플, 공개 결과(to_dict)에는 list로 노출되는 필드
+LIST_FIELDS = ("wafer_sizes", "materials", "tags")
+# 온도 정보가 없을 때 메타데이터에 저장하는 기본값 (온도 조건 통과)
+MISSING_TEMP_MIN = 0
+MISSING_TEMP_MAX = 9999
+
+
+def temperature_bounds(temp_min: Any, temp_max: Any) -> Tuple[float, float]:
+    """
+    필터 판정용 장비 온도 범위 (최저, 최고)
+
+    정보가 없는 쪽(None / 빈 문자열)은 기본값 (MISSING_TEMP_MIN / MISSING_TEMP_MAX)
+    """
+    low = MISSING_TEMP_MIN if temp_min is None or temp_min == "" else temp_min
+    high = MISSING_TEMP_MAX if temp_max is None or temp_max == "" else temp_max
+    return float(low), float(high)
+
+
+def normalize_institution(value: Any) -> str:
+    """기관명 비교 키 (공백 제거, 소문자)"""
+    return "".join(str(value or "").split()).lower()
+
+
+def institution_matches(required: Any, institution: Any) -> bool:
+    """요청 기관명이 장비 기관명에 포함되는지 (정규화 후 부분 문자열, 빈 요청은 불일치)"""
+    key = normalize_institution(required)
+    return bool(key) and key in normalize_institution(institution)
+
+
+def _split(value: Any) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(str(v) for v in value)
+    return tuple(str(value).split(","))
+
+
+class EquipmentRecord:
+    """장비 레코드 (불변으로 취급, 메타데이터 변경 시 새 레코드로 교체)"""
+
+    __slots__ = RECORD_FIELDS + ("material_set", "wafer_size_set", "institution_key")
+
+    def __init__(self, equipment_id: str, metadata: Dict[str, Any]):
+        self.equipment_id = equipment_id
+        self.name = metadata.get("name", "")
+        self.name_en = metadata.get("name_en", "")
+        self.category = metadata.get("category", "")
+        self.part = metadata.get("part", "")
+        self.wafer_sizes = _split(metadata.get("wafer_sizes"))
+        self.materials = _split(metadata.get("materials"))
+        self.temp_min = metadata.get("temp_min")
+        self.temp_max = metadata.get("temp_max")
+        self.institution = metadata.get("institution", "")
+        self.location = metadata.get("location", "")
+        self.description = metadata.get("description", "")
+        self.tags = _split(metadata.get("tags"))
+        self.reservation_url = metadata.get("reservation_url", "")
+        # 필터용 (재료는 대소문자 무시)
+        self.material_set = frozenset(m.lower() for m in self.materials)
+        self.wafer_size_set = frozenset(self.wafer_sizes)
+        self.institution_key = normalize_institution(self.institution)
+
+    def __repr__(self) -> str:
+        return f"EquipmentRecord({self.equipment_id!r}, {self.name!r})"
+
+
+class EquipmentHit(MutableMapping):
+    """
+    검색 결과 항목 (레코드 참조 + 질의별 값)
+
+    dict처럼 읽고 쓸 수 있으며, 쓰기(score, filter_passed 등)는 질의별 값에만 반영되고
+    공유 레코드는 바뀌지 않음
+    """
+
+    __slots__ = ("record", "_values")
+
+    def __init__(self, record: EquipmentRecord, **values: Any):
+        self.record = record
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        if key in _RECORD_FIELD_SET:
+            return getattr(self.record, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from RECORD_FIELDS
+        for key in self._values:
+            if key not in _RECORD_FIELD_SET:
+                yield key
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS) + sum(1 for key in self._values if key not in _RECORD_FIELD_SET)
+
+    def copy(self) -> "EquipmentHit":
+        return EquipmentHit(self.record, **self._values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """일반 dict로 변환 (목록 필드는 list, 질의별 값 포함)"""
+        result = {key: getattr(self.record, key) for key in RECORD_FIELDS}
+        for key in LIST_FIELDS:
+            result[key] = list(result[key])
+        result.update(self._values)
+        return result
+
+    def __repr__(self) -> str:
+        return f"EquipmentHit({self.record.equipment_id!r}, {self._values!r})"
+
+
+class EquipmentRecordStore:
+    """
+    ID -> EquipmentRecord (벡터 저장소와 함께 갱신)
+
+    load_lazy로 적재하면 레코드는 처음 조회할 때 메타데이터에서 파싱 (값이 None인 항목 = 아직 파싱 전)
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Optional[EquipmentRecord]] = {}
+        self._source: Mapping[str, Dict[str, Any]] = {}  # 파싱 전 레코드의 메타데이터
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.version = 0  # 쓰기마다 증가 (레코드에서 계산한 통계 캐시 무효화용)
+
+    def load(self, ids: List[str], metadatas: List[Optional[Dict[str, Any]]]) -> None:
+        """전체 레코드 적재 (기존 내용 교체)"""
+        records = {eq_id: EquipmentRecord(eq_id, metadata or {}) for eq_id, metadata in zip(ids, metadatas)}
+        with self._lock:
+            self._records = records
+            self._source = {}
+            self.loaded = True
+            self.version += 1
+
+    def load_lazy(self, ids: List[str], metadatas: Mapping[str, Dict[str, Any]]) -> None:
+        """
+        전체 레코드 적재 (기존 내용 교체), 메타데이터는 ID로 조회할 수 있는 매핑
+        (예: 스냅샷 파일의 SnapshotMetadata - 조회할 때 디코딩, 이후 변경되지 않아야 함)
+        """
+        with self._lock:
+            self._records = dict.fromkeys(ids)
+            self._source = metadatas
+            self.loaded = True
+            self.version += 1
+
+    def upsert(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        records = {eq_id: EquipmentRecord(eq_id, metadata) for eq_id, metadata in zip(ids, metadatas)}
+        with self._lock:
+            self._records.update(records)
+            self.version += 1
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for eq_id in ids:
+                self._records.pop(eq_id, None)
+            self.version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = {}
+            self._source = {}
+            self.version += 1
+
+    def get(self, eq_id: str) -> Optional[EquipmentRecord]:
+        record = self._records.get(eq_id)
+        if record is None and eq_id in self._records:
+            # 파싱 전 레코드 (동시에 파싱되어도 같은 값이므로 마지막 대입만 남음)
+            source = self._source
+            if eq_id in source:
+                record = EquipmentRecord(eq_id, source[eq_id] or {})
+                with self._lock:
+                    if eq_id in self._records and self._source is source:
+                        self._records[eq_id] = record
+        return record
+
+    def record_for(self, eq_id: str, metadata: Dict[str, Any]) -> EquipmentRecord:
+        """레코드 조회 (없으면 메타데이터로 생성해 저장)"""
+        record = self.get(eq_id)
+        if record is None:
+            record = EquipmentRecord(eq_id, metadata)
+            with self._lock:
+                self._records[eq_id] = record
+                self.version += 1
+        return record
+
+    def all(self) -> List[EquipmentRecord]:
+        """모든 레코드 (파싱 전 레코드도 파싱)"""
+        records = [record or self.get(eq_id) for eq_id, record in list(self._records.items())]
+        return [record for record in records if record is not None]
+
+    def __len__(self) -> int:
+        return len(self._records)
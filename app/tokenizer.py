@@ -0,0 +1,157 @@
+"""
+KION RAG - Tokenizer
+
+BM25 / 하이브리드 검색용 토큰화
+- 정규식 / 불용어는 모듈 로드 시 한 번만 컴파일
+- 용어를 int32 ID로 인턴(Vocabulary)하여 문서를 정수 배열로 보관
+- 반복 질의 토큰화는 LRU 캐시
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+
+
+# 숫자+단위 보존: 6 inch -> 6inch, 400 ℃ -> 400℃
+_UNIT_PATTERN = re.compile(r'(\d+)\s*(inch|인치|nm|um|mm|cm|℃|도|°c|°)')
+
+# 영문(+숫자), 숫자+단위, 한글 단어
+_TOKEN_PATTERN = re.compile(r'[a-zA-Z]+[\d]*|[\d]+[a-zA-Z℃°]+|[가-힣]+')
+
+STOPWORDS = frozenset({
+    '의', '가', '이', '은', '는', '을', '를', '에', '에서', '로', '으로',
+    '와', '과', '도', '만', '까지', 'the', 'a', 'an', 'is', 'are', 'for',
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    텍스트 토큰화 (기술 용어 보존)
+
+    - 숫자+단위 보존 (6inch, 400℃, 5nm 등)
+    - 영문 약어 보존 (MOCVD, RTA, PECVD 등)
+    - 한글 단어 분리
+    """
+    if not text:
+        return []
+
+    text = _UNIT_PATTERN.sub(r'\1\2', text.lower())
+    return [t for t in _TOKEN_PATTERN.findall(text) if len(t) > 1 and t not in STOPWORDS]
+
+
+@lru_cache(maxsize=settings.QUERY_TOKEN_CACHE_SIZE)
+def tokenize_query(query: str) -> Tuple[str, ...]:
+    """질의 토큰화 (LRU 캐시, 불변 튜플 반환)"""
+    return tuple(tokenize(query))
+
+
+class Vocabulary:
+    """
+    용어 <-> int32 ID 사전 (추가만 가능, ID는 변하지 않음)
+
+    스냅샷에서 로드한 사전(from_column)은 기본 용어를 메모리 매핑된 정렬 순서에서 이진 탐색하고,
+    찾은 용어 / 새 용어만 dict에 보관
+    """
+
+    def __init__(self, terms: Optional[Iterable[str]] = None):
+        self._ids: Dict[str, int] = {}
+        self._terms = []  # ID 순서의 용어 (list 또는 StringColumn)
+        self._order: Optional[np.ndarray] = None  # 기본 용어 ID (UTF-8 바이트 정렬 순서)
+        for term in terms or []:
+            self.intern(term)
+
+    @classmethod
+    def from_column(cls, terms, order: np.ndarray) -> "Vocabulary":
+        """
+        스냅샷 배열 섹션으로 사전 생성
+
+        Args:
+            terms: ID 순서의 용어 (index_store.StringColumn)
+            order: 용어 ID를 UTF-8 바이트 순으로 정렬한 배열 (sorted_term_order)
+        """
+        vocab = cls()
+        vocab._terms = terms
+        vocab._order = order
+        return vocab
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    @property
+    def terms(self):
+        """ID 순서의 용어 목록"""
+        return self._terms
+
+    def intern(self, term: str) -> int:
+        """용어 ID 반환 (없으면 새로 부여)"""
+        tid = self.get(term)
+        if tid is None:
+            tid = len(self._terms)
+            self._ids[term] = tid
+            self._terms.append(term)
+        return tid
+
+    def get(self, term: str) -> Optional[int]:
+        tid = self._ids.get(term)
+        if tid is None and self._order is not None:
+            tid = self._base_id(term)
+            if tid is not None:
+                self._ids[term] = tid
+        return tid
+
+    def _base_id(self, term: str) -> Optional[int]:
+        """기본 용어 이진 탐색 (UTF-8 바이트 비교)"""
+        key = term.encode("utf-8")
+        order = self._order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._terms.raw(int(order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self._terms.raw(int(order[lo])) == key:
+            return int(order[lo])
+        return None
+
+    def encode(self, tokens: Iterable[str]) -> np.ndarray:
+        """문서 토큰 -> int32 ID 배열 (새 용어는 인턴)"""
+        return np.fromiter((self.intern(t) for t in tokens), dtype=np.int32)
+
+    def lookup(self, tokens: Iterable[str]) -> List[int]:
+        """질의 토큰 -> ID 목록 (사전에 없는 용어는 제외, 중복은 유지)"""
+        ids = self._ids
+        if self._order is None:
+            return [ids[t] for t in tokens if t in ids]
+        return [tid for tid in map(self.get, tokens) if tid is not None]
+
+
+def sorted_term_order(terms: List[str]) -> np.ndarray:
+    """용어 ID를 UTF-8 바이트 순으로 정렬한 int32 배열 (Vocabulary.from_column용)"""
+    encoded = [term.encode("utf-8") for term in terms]
+    return np.asarray(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int32)
+
+
+_HANGUL_PATTERN = re.compile(r'[가-힣]+')
+
+
+def hangul_ngrams(tokens: Iterable[str], sizes: Tuple[int, ...] = (2, 3)) -> List[str]:
+    """
+    한글 토큰의 글자 n-gram (복합명사 부분 일치용)
+
+    예: "급속열처리" -> 급속, 속열, 열처, 처리, 급속열, 속열처, 열처리
+    """
+    grams = []
+    for token in tokens:
+        if not _HANGUL_PATTERN.fullmatch(token):
+            continue
+        for n in sizes:
+            grams.extend(token[i:i + n] for i in range(len(token) - n + 1))
+    return grams
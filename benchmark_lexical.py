@@ -0,0 +1,164 @@
+"""
+키워드 검색 벤치마크: 일반 역색인(flat) vs 위치 포스팅(구문/근접 가산)
+
+목적: ICP-RIE / ICP-CVD처럼 여러 토큰으로 나뉘는 장비명 질의에서
+      위치 포스팅 재순위의 정확도 / 지연 시간 / 메모리 비용 비교
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+import numpy as np
+
+from app.config import settings
+from app.hybrid_search import HybridSearcher
+from app.tokenizer import tokenize
+
+DATA_DIR = Path(__file__).parent / "data"
+EQUIPMENT_FILE = DATA_DIR / "kion_equipment.json"
+TEST_QUERIES_FILE = DATA_DIR / "test_queries.json"
+
+# 반복 측정 횟수 (지연 시간)
+REPEAT = 20
+
+
+def load_equipment() -> List[Dict]:
+    """장비 데이터 로드"""
+    with open(EQUIPMENT_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_test_queries() -> List[Dict]:
+    """테스트 쿼리 로드"""
+    with open(TEST_QUERIES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)["test_queries"]
+
+
+def create_search_text(eq: Dict) -> str:
+    """검색용 텍스트 생성"""
+    parts = [
+        eq.get("name", ""),
+        eq.get("name_en", ""),
+        eq.get("category", ""),
+        eq.get("part", ""),
+        eq.get("description", ""),
+        " ".join(eq.get("wafer_sizes", [])),
+        " ".join(eq.get("materials", [])),
+        " ".join(eq.get("tags", [])),
+        eq.get("institution", ""),
+    ]
+    return " ".join(filter(None, parts))
+
+
+def build_name_queries(equipments: List[Dict]) -> List[Dict]:
+    """
+    여러 토큰으로 나뉘는 장비명 질의 생성
+
+    "ICP-RIE" -> "ICP RIE 장비" (정답: 해당 장비)
+    """
+    queries = []
+    for eq in equipments:
+        tokens = tokenize(eq["name"])
+        if len(tokens) < 2:
+            continue
+        queries.append({
+            "query": " ".join(eq["name"].replace("-", " ").split()) + " 장비",
+            "expected_ids": [eq["equipment_id"]],
+        })
+    return queries
+
+
+def build_searcher(equipments: List[Dict]) -> HybridSearcher:
+    searcher = HybridSearcher()
+    searcher.initialize([
+        {"id": eq["equipment_id"], "text": create_search_text(eq), "metadata": {"category": eq["category"]}}
+        for eq in equipments
+    ])
+    return searcher
+
+
+def evaluate(searcher: HybridSearcher, queries: List[Dict], top_k: int = 5) -> Dict[str, Any]:
+    """hit@1 / hit@3 / MRR / 평균·p95 검색 시간"""
+    hit_1 = hit_3 = 0
+    reciprocal_ranks = []
+    timings = []
+
+    for q in queries:
+        expected = set(q.get("expected_ids", []))
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            results = searcher.search_bm25(q["query"], top_k=top_k)
+            timings.append(time.perf_counter() - start)
+
+        ids = [r["id"] for r in results]
+        hit_1 += bool(ids[:1]) and ids[0] in expected
+        hit_3 += any(i in expected for i in ids[:3])
+        rank = next((i + 1 for i, doc_id in enumerate(ids) if doc_id in expected), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    n = len(queries) or 1
+    return {
+        "hit@1": hit_1 / n,
+        "hit@3": hit_3 / n,
+        "mrr": sum(reciprocal_ranks) / n,
+        "avg_ms": float(np.mean(timings)) * 1000 if timings else 0.0,
+        "p95_ms": float(np.percentile(timings, 95)) * 1000 if timings else 0.0,
+    }
+
+
+def run_benchmark():
+    """flat vs positional 비교"""
+    print("=" * 60)
+    print("키워드 검색 벤치마크 (flat vs positional)")
+    print("=" * 60)
+
+    equipments = load_equipment()
+    query_sets = {
+        "test_queries": load_test_queries(),
+        "name_queries": build_name_queries(equipments),
+    }
+    print(f"\n장비 수: {len(equipments)}")
+    for name, queries in query_sets.items():
+        print(f"{name}: {len(queries)}개")
+
+    phrase_boost = settings.PHRASE_BOOST or 0.5
+    results = {}
+    for mode, boost in (("flat", 0.0), ("positional", phrase_boost)):
+        settings.PHRASE_BOOST = boost
+        searcher = build_searcher(equipments)
+        results[mode] = {name: evaluate(searcher, queries) for name, queries in query_sets.items()}
+        if boost:
+            # 첫 질의에서 생성된 위치 포스팅 크기
+            bm25_bytes = sum(a.nbytes for a in searcher.bm25.export_arrays().values())
+            results[mode]["memory"] = {
+                "bm25_bytes": bm25_bytes,
+                "positional_bytes": searcher.snapshot.positional_index().nbytes,
+            }
+    settings.PHRASE_BOOST = phrase_boost
+
+    print("\n" + "=" * 60)
+    print("결과 요약")
+    print("=" * 60)
+    print(f"\n{'모드':<12} {'질의셋':<14} {'hit@1':<8} {'hit@3':<8} {'MRR':<8} {'평균':<10} {'p95':<10}")
+    print("-" * 72)
+    for mode, by_set in results.items():
+        for name in query_sets:
+            r = by_set[name]
+            print(
+                f"{mode:<12} {name:<14} {r['hit@1']:<8.2%} {r['hit@3']:<8.2%} {r['mrr']:<8.3f} "
+                f"{r['avg_ms']:<10.3f} {r['p95_ms']:<10.3f}"
+            )
+
+    memory = results["positional"]["memory"]
+    print(
+        f"\n메모리: BM25 역색인 {memory['bm25_bytes'] / 1024:.1f}KB, "
+        f"위치 포스팅 추가 {memory['positional_bytes'] / 1024:.1f}KB "
+        f"(+{memory['positional_bytes'] / max(memory['bm25_bytes'], 1):.0%})"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,247 @@
+"""
+ONNX 임베딩 모델 변환 및 검증: SentenceTransformer(fp32) vs ONNX(fp32 / int8)
+
+사용법:
+    python export_onnx_embedding.py export    # EMBEDDING_MODEL -> ONNX_MODEL_DIR (model.onnx + model_int8.onnx)
+    python export_onnx_embedding.py compare   # 코사인 유사도 일치도 + test_queries Recall@K + 질의 인코딩 시간
+                                              # (합격 기준 미달이면 종료 코드 1)
+
+변환에는 torch / transformers / onnxruntime이 필요하고, 서비스 실행 시에는 onnxruntime + tokenizers만 필요
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.config import settings
+from app.embeddings import (
+    ONNX_CONFIG_FILE,
+    ONNX_MODEL_FILE,
+    ONNX_QUANTIZED_FILE,
+    OnnxEmbeddingFunction,
+)
+
+DATA_DIR = Path(__file__).parent / "data"
+EQUIPMENT_FILE = DATA_DIR / "kion_equipment.json"
+TEST_QUERIES_FILE = DATA_DIR / "test_queries.json"
+
+MAX_LENGTH = 512
+
+# 질의 인코딩 시간 측정 반복 횟수
+REPEAT = 3
+
+# 합격 기준 (SentenceTransformer fp32 기준)
+# - 같은 텍스트의 문서 / 질의 임베딩 코사인 유사도 최솟값
+# - Recall@1 / Recall@3 허용 하락폭
+MIN_COSINE = {"onnx-fp32": 0.999, "onnx-int8": 0.99}
+MAX_RECALL_DROP = 0.02
+
+
+def export(model_name: str, out_dir: Path) -> None:
+    """HuggingFace 모델 -> ONNX (fp32) + int8 동적 양자화"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"[Export] 모델 로딩 중: {model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["샘플 문장"], return_tensors="pt")
+    onnx_path = out_dir / ONNX_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(onnx_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    print(f"[Export] fp32 저장: {onnx_path}")
+
+    # fp32 모델은 2GB를 넘어 가중치가 외부 데이터 파일로 저장될 수 있음 (int8은 단일 파일)
+    quantize_dynamic(
+        str(onnx_path),
+        str(out_dir / ONNX_QUANTIZED_FILE),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"[Export] int8 저장: {out_dir / ONNX_QUANTIZED_FILE}")
+
+    tokenizer.save_pretrained(str(out_dir))
+    with open(out_dir / ONNX_CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "max_length": MAX_LENGTH,
+            "pad_token": tokenizer.pad_token,
+            "pad_id": tokenizer.pad_token_id,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"[Export] 완료: {out_dir}")
+
+
+def load_equipment() -> List[Dict]:
+    """장비 데이터 로드"""
+    with open(EQUIPMENT_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_test_queries() -> List[Dict]:
+    """테스트 쿼리 로드"""
+    with open(TEST_QUERIES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)["test_queries"]
+
+
+def create_search_text(eq: Dict) -> str:
+    """검색용 텍스트 생성"""
+    parts = [
+        eq.get("name", ""),
+        eq.get("name_en", ""),
+        eq.get("category", ""),
+        eq.get("part", ""),
+        eq.get("description", ""),
+        " ".join(eq.get("wafer_sizes", [])),
+        " ".join(eq.get("materials", [])),
+        " ".join(eq.get("tags", [])),
+        eq.get("institution", ""),
+    ]
+    return " ".join(filter(None, parts))
+
+
+def calculate_recall(retrieved: List[str], expected: List[str], k: int) -> float:
+    """Recall@K 계산"""
+    if not expected:
+        return 1.0
+
+    hits = len(set(retrieved[:k]) & set(expected))
+    return hits / min(len(expected), k)
+
+
+def normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def evaluate(embedding_fn, doc_ids: List[str], documents: List[str], queries: List[Dict]) -> Dict:
+    """문서 / 질의 임베딩 + 정확 검색 Recall@1,3 + 질의당 인코딩 시간"""
+    doc_vectors = normalize(embedding_fn(documents))
+
+    timings = []
+    query_vectors = []
+    for q in queries:
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            vector = embedding_fn([q["query"]])
+            timings.append(time.perf_counter() - start)
+        query_vectors.append(vector[0])
+    query_vectors = normalize(query_vectors)
+
+    recall_1, recall_3 = [], []
+    for q, scores in zip(queries, query_vectors @ doc_vectors.T):
+        retrieved = [doc_ids[i] for i in np.argsort(-scores)[:5]]
+        recall_1.append(calculate_recall(retrieved, q["expected_ids"], 1))
+        recall_3.append(calculate_recall(retrieved, q["expected_ids"], 3))
+
+    return {
+        "doc_vectors": doc_vectors,
+        "query_vectors": query_vectors,
+        "recall@1": float(np.mean(recall_1)),
+        "recall@3": float(np.mean(recall_3)),
+        "query_ms": float(np.mean(timings)) * 1000,
+    }
+
+
+def compare(model_dir: Path) -> Dict[str, Dict]:
+    """SentenceTransformer 기준으로 ONNX fp32 / int8 비교"""
+    from chromadb.utils import embedding_functions
+
+    print("=" * 60)
+    print("ONNX 임베딩 검증 (SentenceTransformer 기준)")
+    print("=" * 60)
+
+    equipments = load_equipment()
+    queries = load_test_queries()
+    doc_ids = [eq["equipment_id"] for eq in equipments]
+    documents = [create_search_text(eq) for eq in equipments]
+    print(f"\n장비 수: {len(equipments)}, 테스트 쿼리 수: {len(queries)}")
+
+    backends = {
+        "torch-fp32": lambda: embedding_functions.SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDING_MODEL),
+        "onnx-fp32": lambda: OnnxEmbeddingFunction(model_dir, quantized=False, batch_size=settings.EMBEDDING_BATCH_SIZE),
+        "onnx-int8": lambda: OnnxEmbeddingFunction(model_dir, quantized=True, batch_size=settings.EMBEDDING_BATCH_SIZE),
+    }
+
+    results = {}
+    for name, factory in backends.items():
+        print(f"\n[{name}] 모델 로딩 및 평가 중...")
+        start = time.perf_counter()
+        embedding_fn = factory()
+        load_s = time.perf_counter() - start
+        results[name] = {"load_s": load_s, **evaluate(embedding_fn, doc_ids, documents, queries)}
+        del embedding_fn
+
+    reference = results["torch-fp32"]
+    print("\n" + "=" * 60)
+    print("결과 요약")
+    print("=" * 60)
+    print(
+        f"\n{'백엔드':<12} {'문서cos평균':<12} {'문서cos최소':<12} {'질의cos평균':<12} "
+        f"{'Recall@1':<10} {'Recall@3':<10} {'질의(ms)':<10} {'속도':<8} {'로딩(s)':<8}"
+    )
+    print("-" * 100)
+    for name, r in results.items():
+        # 같은 텍스트에 대한 기준 임베딩과의 코사인 유사도
+        doc_cos = np.sum(r["doc_vectors"] * reference["doc_vectors"], axis=1)
+        query_cos = np.sum(r["query_vectors"] * reference["query_vectors"], axis=1)
+        r["doc_cos_mean"] = float(doc_cos.mean())
+        r["doc_cos_min"] = float(doc_cos.min())
+        r["query_cos_mean"] = float(query_cos.mean())
+        r["query_cos_min"] = float(query_cos.min())
+        r["speedup"] = reference["query_ms"] / r["query_ms"] if r["query_ms"] else 0.0
+        print(
+            f"{name:<12} {r['doc_cos_mean']:<12.4f} {r['doc_cos_min']:<12.4f} {r['query_cos_mean']:<12.4f} "
+            f"{r['recall@1']:<10.2%} {r['recall@3']:<10.2%} {r['query_ms']:<10.2f} "
+            f"{r['speedup']:<8.2f} {r['load_s']:<8.1f}"
+        )
+
+    return results
+
+
+def check(results: Dict[str, Dict]) -> List[str]:
+    """합격 기준 확인 (MIN_COSINE / MAX_RECALL_DROP), 미달 항목 목록 반환"""
+    reference = results["torch-fp32"]
+    failures = []
+    for name, min_cosine in MIN_COSINE.items():
+        r = results[name]
+        for key in ("doc_cos_min", "query_cos_min"):
+            if r[key] < min_cosine:
+                failures.append(f"{name} {key} {r[key]:.4f} < {min_cosine}")
+        for key in ("recall@1", "recall@3"):
+            if r[key] < reference[key] - MAX_RECALL_DROP:
+                failures.append(f"{name} {key} {r[key]:.2%} < {reference[key]:.2%} - {MAX_RECALL_DROP:.0%}")
+    return failures
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "compare"
+    model_dir = Path(settings.ONNX_MODEL_DIR)
+    if command == "export":
+        export(settings.EMBEDDING_MODEL, model_dir)
+    else:
+        failures = check(compare(model_dir))
+        print()
+        if failures:
+            print("불합격:")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print("합격: 모든 백엔드가 기준을 만족합니다.")
@@ -5,7 +5,7 @@ KION RAG PoC - 서버 실행 스크립트
 
 import uvicorn
 from pathlib import Path
-from app.data_loader import load_from_json
+from app.data_loader import load_from_json, sync_from_json
 from app.rag import rag_pipeline
 
 # 장비 데이터 JSON 파일 경로
@@ -19,6 +19,9 @@ def main():
     if rag_pipeline.get_count() == 0:
         print("[Run] 장비 데이터 로드 중...")
         load_from_json(str(DATA_FILE))
+    else:
+        # 기존 데이터가 있으면 JSON 파일 기준 변경분만 반영
+        sync_from_json(str(DATA_FILE))
 
     print(f"[Run] 장비 데이터: {rag_pipeline.get_count()}개")
     print("[Run] 서버 시작: http://localhost:8000")
@@ -0,0 +1,63 @@
+"""
+KION RAG - 테스트 공통 픽스처
+
+data/kion_equipment.json 카탈로그를 BM25 / 필터 테스트 데이터로 사용
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.records import MISSING_TEMP_MAX, MISSING_TEMP_MIN  # noqa: E402
+
+DATA_FILE = ROOT / "data" / "kion_equipment.json"
+
+
+def search_text(eq: Dict[str, Any]) -> str:
+    """검색 텍스트 (RAGPipeline._create_search_text와 같은 필드)"""
+    parts = [
+        eq["name"], eq.get("name_en") or "", eq["category"], eq["part"], eq["description"],
+        " ".join(eq.get("wafer_sizes", [])), " ".join(eq.get("materials", [])),
+        " ".join(eq.get("tags", [])), eq["institution"],
+    ]
+    return " ".join(filter(None, parts))
+
+
+def equipment_metadata(eq: Dict[str, Any]) -> Dict[str, Any]:
+    """벡터 저장소 메타데이터 형식 (RAGPipeline._create_metadata와 같은 필드, 목록은 쉼표 구분 문자열)"""
+    return {
+        "equipment_id": eq["equipment_id"],
+        "name": eq["name"],
+        "name_en": eq.get("name_en") or "",
+        "category": eq["category"],
+        "part": eq["part"],
+        "wafer_sizes": ",".join(eq.get("wafer_sizes", [])),
+        "materials": ",".join(eq.get("materials", [])),
+        "temp_min": MISSING_TEMP_MIN if eq.get("temp_min") is None else eq["temp_min"],
+        "temp_max": MISSING_TEMP_MAX if eq.get("temp_max") is None else eq["temp_max"],
+        "institution": eq["institution"],
+        "location": eq.get("location") or "",
+        "tags": ",".join(eq.get("tags", [])),
+        "reservation_url": eq.get("reservation_url") or "",
+        "description": eq["description"][:500],
+    }
+
+
+@pytest.fixture(scope="session")
+def equipments() -> List[Dict[str, Any]]:
+    with open(DATA_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def documents(equipments) -> List[Dict[str, Any]]:
+    return [
+        {"id": eq["equipment_id"], "text": search_text(eq), "metadata": equipment_metadata(eq)}
+        for eq in equipments
+    ]
@@ -0,0 +1,91 @@
+"""
+BM25Index 테스트 - rank_bm25.BM25Okapi와 점수 / 순위 비교 (전체 생성, 증분 추가 / 삭제, MaxScore 사용 여부)
+"""
+
+import pytest
+
+from app.config import settings
+from app.hybrid_search import HybridSearcher
+from app.tokenizer import tokenize, tokenize_query
+
+rank_bm25 = pytest.importorskip("rank_bm25")
+
+QUERIES = [
+    "범프", "금속", "열처리", "급속열처리 장비", "식각", "증착 장비", "GaN MOCVD",
+    "리소그래피", "6인치 웨이퍼 PECVD", "SiC 고온 열처리", "플라즈마 식각 장비", "없는용어",
+]
+
+
+@pytest.fixture(autouse=True)
+def plain_bm25(monkeypatch):
+    """구문 가산 / n-gram 보완 없이 BM25 점수만 비교"""
+    monkeypatch.setattr(settings, "PHRASE_BOOST", 0.0)
+    monkeypatch.setattr(settings, "NGRAM_FALLBACK_MIN_HITS", 0)
+
+
+def _searcher(documents):
+    searcher = HybridSearcher()
+    searcher.scoring = "bm25"
+    searcher.initialize(documents)
+    return searcher
+
+
+def _update(searcher, documents):
+    """갱신 / 신규 추가 / 삭제 (델타 포스팅 + 삭제 마스크 상태)"""
+    searcher.upsert_documents([
+        {"id": documents[3]["id"], "text": documents[3]["text"] + " 급속열처리 범프", "metadata": documents[3]["metadata"]},
+        {"id": "NEW-1", "text": "GaN MOCVD 증착 장비 6인치 웨이퍼", "metadata": {}},
+        {"id": "NEW-2", "text": "플라즈마 식각 장비 SiC 금속", "metadata": {}},
+    ])
+    searcher.delete_documents([documents[5]["id"], documents[40]["id"], "NEW-2"])
+
+
+def _okapi(snap):
+    """현재 스냅샷의 활성 문서로 만든 BM25Okapi (문서 번호 순)"""
+    doc_nos = [i for i, doc_id in enumerate(snap.doc_ids) if doc_id is not None]
+    corpus = [tokenize(snap.documents[i]) for i in doc_nos]
+    return doc_nos, rank_bm25.BM25Okapi(corpus)
+
+
+def _expected(snap, query, top_k):
+    """BM25Okapi 기준 search_bm25 결과 (양수 점수, 최고점 대비 정규화, 동점은 문서 순서)"""
+    doc_nos, okapi = _okapi(snap)
+    scores = okapi.get_scores(list(tokenize_query(query)))
+    hits = [(doc_no, score) for doc_no, score in zip(doc_nos, scores.tolist()) if score > 0]
+    if not hits:
+        return []
+    best = max(score for _, score in hits)
+    hits.sort(key=lambda hit: (-hit[1], hit[0]))
+    return [(snap.doc_ids[doc_no], score / best) for doc_no, score in hits[:top_k]]
+
+
+@pytest.mark.parametrize("updated", [False, True])
+def test_scores_match_okapi(documents, updated):
+    searcher = _searcher(documents)
+    if updated:
+        _update(searcher, documents)
+    snap = searcher.snapshot
+    doc_nos, okapi = _okapi(snap)
+
+    for query in QUERIES:
+        tokens = tokenize_query(query)
+        expected = okapi.get_scores(list(tokens))
+        hit_docs, hit_scores = snap.bm25.score(snap.vocab.lookup(tokens))
+        actual = dict(zip(hit_docs.tolist(), hit_scores.tolist()))
+        assert [actual.get(doc_no, 0.0) for doc_no in doc_nos] == pytest.approx(expected.tolist()), query
+
+
+@pytest.mark.parametrize("pruning", [True, False])
+@pytest.mark.parametrize("updated", [False, True])
+@pytest.mark.parametrize("top_k", [1, 5, 20])
+def test_ranking_matches_okapi(documents, monkeypatch, pruning, updated, top_k):
+    monkeypatch.setattr(settings, "LEXICAL_TOPK_PRUNING", pruning)
+    searcher = _searcher(documents)
+    if updated:
+        _update(searcher, documents)
+
+    for query in QUERIES:
+        expected = _expected(searcher.snapshot, query, top_k)
+        actual = [(r["id"], r["bm25_score"]) for r in searcher.search_bm25(query, top_k)]
+        assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected], query
+        assert [score for _, score in actual] == pytest.approx([score for _, score in expected], abs=1e-4), query
@@ -0,0 +1,123 @@
+"""
+임베딩 테스트 - EmbeddingBatcher: 인코더 실패 / 결과 수 불일치 / 종료 시에도 모든 Future가 완료되는지,
+RemoteEmbeddingFunction: 잘못된 서비스 응답 처리
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.embeddings import EmbeddingBatcher  # noqa: E402
+
+
+def _run_batch(encode, texts):
+    batcher = EmbeddingBatcher(encode, window_ms=1.0)
+    try:
+        futures = [batcher.submit(text) for text in texts]
+        return [future.exception(timeout=5) or future.result() for future in futures]
+    finally:
+        batcher.close()
+
+
+def test_results_follow_input_order():
+    results = _run_batch(lambda texts: [[float(len(t))] for t in texts], ["a", "bb", "a"])
+    assert [float(r[0]) for r in results] == [1.0, 2.0, 1.0]
+
+
+def test_encoder_error_is_set_on_every_future():
+    def encode(texts):
+        raise ValueError("boom")
+
+    results = _run_batch(encode, ["a", "b", "c"])
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_short_result_is_reported_as_error():
+    results = _run_batch(lambda texts: [[1.0]], ["a", "b"])
+    assert all(isinstance(r, RuntimeError) and "mismatch" in str(r) for r in results)
+
+
+def test_base_exception_resolves_futures_and_closes():
+    def encode(texts):
+        raise KeyboardInterrupt
+
+    batcher = EmbeddingBatcher(encode, window_ms=1.0)
+    future = batcher.submit("a")
+    assert isinstance(future.exception(timeout=5), KeyboardInterrupt)
+    batcher._worker.join(timeout=5)
+    assert not batcher._worker.is_alive()
+    with pytest.raises(RuntimeError):
+        batcher.submit("b")
+
+
+def test_close_during_submit_resolves_every_future():
+    """close()와 동시에 들어온 질의도 결과 또는 예외로 완료 (큐에 남아 무한 대기하지 않음)"""
+    for _ in range(20):
+        batcher = EmbeddingBatcher(lambda texts: [[1.0] for _ in texts], window_ms=0.5)
+        futures = []
+        start = threading.Barrier(5)
+
+        def submit():
+            start.wait()
+            for i in range(50):
+                try:
+                    futures.append(batcher.submit(str(i)))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        batcher.close()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            assert future.exception(timeout=5) is None or isinstance(future.exception(), RuntimeError)
+
+
+def _remote(responses, fallback):
+    """응답을 순서대로 돌려주는 가짜 서비스에 연결된 RemoteEmbeddingFunction"""
+    httpx = pytest.importorskip("httpx")
+    from app.embeddings import RemoteEmbeddingFunction
+
+    replies = iter(responses)
+    fn = RemoteEmbeddingFunction(url="http://embedding-service", fallback=fallback)
+    fn.client = httpx.Client(
+        base_url="http://embedding-service",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=next(replies)))
+    )
+    fn._local = lambda texts: [[0.0] * 4 for _ in texts]
+    return fn
+
+
+def _response(fn, vectors, **overrides):
+    from app.embeddings import encode_vectors
+    return {"model": fn.model_key, "embeddings": encode_vectors(vectors), **overrides}
+
+
+@pytest.mark.parametrize("fallback", [False, True])
+def test_remote_rejects_malformed_responses(fallback):
+    probe = _remote([], fallback)
+    good = _response(probe, np.ones((2, 4)))
+    bad = [
+        {"embeddings": good["embeddings"]},            # model 없음
+        {"model": probe.model_key},                     # embeddings 없음
+        [good],                                         # dict가 아님
+        {**good, "model": "other-model"},               # 모델 불일치
+        {**good, "embeddings": "not base64!"},          # 디코딩 불가
+        _response(probe, np.ones((3, 4))),              # 벡터 수 불일치
+        _response(probe, np.ones((2, 8))),              # 차원 불일치 (첫 응답은 4차원)
+        _response(probe, np.ones((2, 0))),              # 빈 벡터
+    ]
+    for response in bad:
+        fn = _remote([good, response], fallback)
+        assert np.asarray(fn(["a", "b"])).shape == (2, 4)
+        if fallback:
+            assert np.asarray(fn(["a", "b"])).tolist() == [[0.0] * 4, [0.0] * 4]
+        else:
+            with pytest.raises(ValueError):
+                fn(["a", "b"])
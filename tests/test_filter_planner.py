@@ -0,0 +1,186 @@
+"""
+필터 경로 일치 테스트 - 같은 조건이 모든 필터 경로(레코드 판정 / 속성 인덱스 / BM25 후보 /
+검색 결과 필터 / 실행 계획)에서 같은 장비 집합을 만드는지 (온도 정보가 없는 장비, 기관명 일부 포함),
+질의 파싱 결과의 검색 필터 변환 (FILTER_ALL_QUERY_CONSTRAINTS)
+"""
+
+import numpy as np
+import pytest
+
+from app.attribute_index import AttributeIndex
+from app.config import settings
+from app.filter_planner import FilterPlan, FilterPlanner, matches, normalize_filters
+from app.filters import check_institution, check_temperature
+from app.hybrid_search import HybridSearcher
+from app.query_parser import ParsedQuery, parsed_to_filters
+from app.records import EquipmentRecord, EquipmentRecordStore
+
+FILTERS = [
+    {"temp_min": 300},
+    {"temp_max": 100},
+    {"temp_min": 0, "temp_max": 0},
+    {"temp_min": 150, "temp_max": 250},
+    {"temp_min": 300, "category": ["증착"]},
+    {"institution": "나노종합"},
+    {"institution": ["광주 나노", "서울대"]},
+    {"institution": "나노", "temp_max": 100},
+]
+
+
+def _metadatas(documents):
+    """카탈로그 메타데이터 + 온도 정보가 없는(한쪽 / 양쪽) 장비"""
+    metadatas = [dict(doc["metadata"]) for doc in documents]
+    for i, metadata in enumerate(metadatas):
+        if i % 5 == 0:
+            metadata.pop("temp_min", None)
+        if i % 7 == 0:
+            metadata.pop("temp_max", None)
+        if i % 11 == 0:
+            metadata["temp_max"] = 0  # 0도는 정보 없음이 아님
+    return metadatas
+
+
+def _expected(ids, metadatas, filters):
+    """filters.check_temperature / check_institution 기준 (+ 카테고리)"""
+    return sorted(
+        eq_id for eq_id, metadata in zip(ids, metadatas)
+        if check_temperature(metadata, filters.get("temp_min"), filters.get("temp_max")).passed
+        and check_institution(metadata, list(filters.get("institution", ()))).passed
+        and ("category" not in filters or metadata["category"] in filters["category"])
+    )
+
+
+@pytest.mark.parametrize("raw_filters", FILTERS)
+def test_missing_temperature_same_rule_everywhere(documents, raw_filters):
+    ids = [doc["id"] for doc in documents]
+    metadatas = _metadatas(documents)
+    filters = normalize_filters(raw_filters)
+    expected = _expected(ids, metadatas, filters)
+
+    records = [EquipmentRecord(eq_id, metadata) for eq_id, metadata in zip(ids, metadatas)]
+    assert sorted(r.equipment_id for r in records if matches(r, filters)) == expected
+    assert sorted(AttributeIndex(records).ids_for(filters)) == expected
+    assert _lexical_candidates(documents, metadatas, filters) == expected
+
+
+def _lexical_candidates(documents, metadatas, filters):
+    """BM25 스냅샷 속성 인덱스의 후보 (증분 추가 / 갱신 / 삭제 후, 삭제된 문서 번호 제외)"""
+    searcher = HybridSearcher()
+    docs = [{"id": doc["id"], "text": doc["text"], "metadata": m} for doc, m in zip(documents, metadatas)]
+    searcher.initialize(docs[:len(docs) // 2] + [{"id": "GONE", "text": "삭제 예정", "metadata": {}}])
+    searcher.upsert_documents(docs[len(docs) // 3:])
+    searcher.delete_documents(["GONE"])
+    snap = searcher.snapshot
+    mask = snap.attributes.mask(filters)
+    return sorted(snap.doc_ids[row] for row in np.flatnonzero(mask) if snap.doc_ids[row] in snap.id_to_doc)
+
+
+def test_missing_temperature_passes():
+    """온도 정보가 없는 쪽은 기본값 (0 / 9999) - 해당 쪽 온도 조건 통과, 실제 0도는 그대로 판정"""
+    metadatas = {
+        "NONE": {},
+        "LOW-ONLY": {"temp_min": 200},
+        "HIGH-ONLY": {"temp_max": 150},
+        "ZERO": {"temp_min": 0, "temp_max": 0},
+    }
+    records = [EquipmentRecord(eq_id, metadata) for eq_id, metadata in metadatas.items()]
+    cases = [
+        ({"temp_min": 300}, ["LOW-ONLY", "NONE"]),
+        ({"temp_max": 100}, ["HIGH-ONLY", "NONE", "ZERO"]),
+        ({"temp_min": 100, "temp_max": 250}, ["HIGH-ONLY", "LOW-ONLY", "NONE"]),
+    ]
+    for raw_filters, expected in cases:
+        filters = normalize_filters(raw_filters)
+        assert sorted(r.equipment_id for r in records if matches(r, filters)) == expected
+        assert sorted(
+            eq_id for eq_id, metadata in metadatas.items()
+            if check_temperature(metadata, filters.get("temp_min"), filters.get("temp_max")).passed
+        ) == expected
+        assert sorted(AttributeIndex(records).ids_for(filters)) == expected
+
+
+@pytest.mark.parametrize("all_constraints", [False, True])
+def test_parsed_to_filters(monkeypatch, all_constraints):
+    monkeypatch.setattr(settings, "FILTER_ALL_QUERY_CONSTRAINTS", all_constraints)
+    parsed = ParsedQuery(
+        original="", normalized="", wafer_sizes=["6"], temp_min=300.0, temp_max=800.0, materials=["GaN"],
+        categories=["증착"], institutions=["나노종합기술원", "서울대"], mapped_categories=["식각"],
+    )
+    expected = {"wafer_sizes": ["6"], "category": "증착", "institution": "나노종합기술원"}
+    if all_constraints:
+        expected.update(
+            materials=["GaN"], temp_min=300.0, temp_max=800.0, institution=["나노종합기술원", "서울대"]
+        )
+    assert parsed_to_filters(parsed) == expected
+
+    parsed.categories = []
+    assert parsed_to_filters(parsed)["category"] == "식각"
+    assert parsed_to_filters(ParsedQuery(original="", normalized="", temp_min=300.0)) == (
+        {"temp_min": 300.0} if all_constraints else {}
+    )
+
+
+@pytest.mark.parametrize("raw_filters", FILTERS)
+def test_filtered_query_same_ids_under_every_plan(tmp_path, documents, raw_filters):
+    pytest.importorskip("chromadb")
+    from app.rag import NumpyVectorStore, RAGPipeline
+
+    ids = [doc["id"] for doc in documents]
+    metadatas = _metadatas(documents)
+    filters = normalize_filters(raw_filters)
+    expected = _expected(ids, metadatas, filters)
+
+    rng = np.random.default_rng(0)
+    pipeline = RAGPipeline()
+    pipeline.vector_store = NumpyVectorStore(tmp_path / "vectors.bin")
+    pipeline.vector_store.upsert(
+        ids, [doc["text"] for doc in documents], metadatas, rng.normal(size=(len(ids), 8)).astype(np.float32)
+    )
+    pipeline.records = EquipmentRecordStore()
+    pipeline.records.load(ids, metadatas)
+
+    top_k = len(ids)
+    embeddings = rng.normal(size=(2, 8)).astype(np.float32)
+    plans = [
+        FilterPlan("pushdown", filters, filters, {}, top_k),
+        FilterPlan("exact", filters, candidate_k=top_k, candidate_ids=pipeline.filter_planner.candidate_ids(
+            filters, pipeline.records
+        )),
+        FilterPlan("postfilter", filters, {}, filters, top_k),
+        pipeline._plan_filters(raw_filters, top_k),
+    ]
+    for plan in plans:
+        for hits in pipeline._execute_plan(plan, embeddings, top_k):
+            assert sorted(hit[0] for hit in hits) == expected, plan.strategy
+
+    # 벡터 저장소 필터와 BM25 후보는 같은 AttributeIndex 구현 -> 같은 후보 집합
+    table = pipeline.vector_store._table
+    mask = table.attributes.mask(filters, table.size) & table.live[:table.size]
+    assert sorted(table.ids[row] for row in np.flatnonzero(mask)) == expected
+    assert _lexical_candidates(documents, metadatas, filters) == expected
+
+
+def test_exact_plan_respects_store_limit(documents):
+    records = EquipmentRecordStore()
+    records.load([doc["id"] for doc in documents], [doc["metadata"] for doc in documents])
+    planner = FilterPlanner(exact_max_candidates=1000)
+    pushable = ("category", "institution", "temp_min", "temp_max")
+    filters = {"category": [documents[0]["metadata"]["category"]]}
+    feasible = planner.index(records).count(normalize_filters(filters))
+
+    assert planner.plan(filters, 5, records, pushable).strategy == "exact"
+    plan = planner.plan(filters, 5, records, pushable, exact_max_candidates=feasible - 1)
+    assert plan.strategy in ("pushdown", "postfilter") and plan.candidate_ids is None
+
+
+def test_partial_institution_name(documents):
+    ids = [doc["id"] for doc in documents]
+    metadatas = [doc["metadata"] for doc in documents]
+    filters = normalize_filters({"institution": "나노종합"})
+    expected = sorted(eq_id for eq_id, m in zip(ids, metadatas) if m["institution"] == "나노종합기술원")
+    assert expected
+
+    records = [EquipmentRecord(eq_id, metadata) for eq_id, metadata in zip(ids, metadatas)]
+    assert sorted(r.equipment_id for r in records if matches(r, filters)) == expected
+    assert sorted(AttributeIndex(records).ids_for(filters)) == expected
+    assert _lexical_candidates(documents, metadatas, filters) == expected
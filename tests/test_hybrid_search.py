@@ -0,0 +1,179 @@
+"""
+BM25 검색 테스트 - MaxScore 상위 K 검색과 전체 점수 계산 결과 비교, 구문 가산 / n-gram 보완 사용 여부,
+스냅샷 파일 저장 / 로드 (속성 인덱스 메모리 매핑)
+"""
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.filter_planner import normalize_filters
+from app.hybrid_search import HybridSearcher, SnapshotMetadata
+from app.tokenizer import tokenize_query
+
+QUERIES = [
+    "범프", "금속", "열처리", "급속열처리 장비", "식각", "증착 장비", "GaN MOCVD",
+    "리소그래피", "6인치 웨이퍼 PECVD", "SiC 고온 열처리", "플라즈마 식각 장비",
+]
+
+
+@pytest.fixture(scope="module", params=["bm25", "bm25f"])
+def searcher(request, documents):
+    searcher = HybridSearcher()
+    searcher.scoring = request.param
+    searcher.initialize(documents)
+    # 삭제된 문서 번호가 있는 상태도 확인
+    searcher.delete_documents([documents[5]["id"], documents[40]["id"]])
+    return searcher
+
+
+@pytest.fixture
+def lexical_features(monkeypatch):
+    """구문 가산 + n-gram 보완 사용 (기본값은 둘 다 사용 안 함)"""
+    monkeypatch.setattr(settings, "PHRASE_BOOST", 0.5)
+    monkeypatch.setattr(settings, "NGRAM_FALLBACK_MIN_HITS", 3)
+
+
+def _small_searcher():
+    """같은 용어를 순서만 다르게 가진 문서 (B, A) + 복합명사 문서 (C) + 무관한 문서"""
+    texts = ["CVD 장비 ICP", "ICP CVD 장비", "급속열처리 장비 RTA",
+             "스퍼터 증착", "전자빔 리소그래피", "습식 세정", "이온 주입기", "SEM 분석"]
+    ids = ["B", "A", "C", "F1", "F2", "F3", "F4", "F5"]
+    searcher = HybridSearcher()
+    searcher.initialize([{"id": doc_id, "text": text} for doc_id, text in zip(ids, texts)])
+    return searcher
+
+
+def _ranked(searcher, query, top_k, filters, pruning, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_TOPK_PRUNING", pruning)
+    return [(r["id"], round(r["bm25_score"], 9)) for r in searcher.search_bm25(query, top_k, filters)]
+
+
+@pytest.mark.parametrize("top_k", [1, 2, 3, 5, 10])
+@pytest.mark.parametrize("filters", [None, {"category": "증착"}])
+@pytest.mark.parametrize("features", [False, True])
+def test_pruned_matches_exhaustive(request, searcher, top_k, filters, features, monkeypatch):
+    """작은 top_k에서도 MaxScore 결과가 전체 점수 계산 결과와 같음 (구문 가산 / n-gram 보완 포함)"""
+    if features:
+        request.getfixturevalue("lexical_features")
+    for query in QUERIES:
+        pruned = _ranked(searcher, query, top_k, filters, True, monkeypatch)
+        exhaustive = _ranked(searcher, query, top_k, filters, False, monkeypatch)
+        assert pruned == exhaustive, query
+
+
+def test_ngram_fallback_uses_untruncated_hit_count(searcher, lexical_features, monkeypatch):
+    """기본 결과가 NGRAM_FALLBACK_MIN_HITS 이상이면 top_k가 작아도 n-gram 보완을 하지 않음"""
+    calls = []
+    merge = searcher._merge_ngram_hits
+    monkeypatch.setattr(settings, "LEXICAL_TOPK_PRUNING", True)
+    monkeypatch.setattr(searcher, "_merge_ngram_hits", lambda *args: calls.append(args) or merge(*args))
+
+    searcher.search_bm25("금속", top_k=1)
+    assert not calls
+
+
+def test_ngram_hits_rank_below_primary_hits(searcher, lexical_features, monkeypatch):
+    """n-gram으로만 찾은 문서는 기본 결과보다 항상 뒤"""
+    monkeypatch.setattr(settings, "LEXICAL_TOPK_PRUNING", False)
+    snap = searcher.snapshot
+    query = "급속열처리 장비"
+    primary_docs, _ = snap.bm25.score(snap.vocab.lookup(tokenize_query(query)))
+    primary = {snap.doc_ids[doc_no] for doc_no in primary_docs}
+
+    ranked = [r["id"] for r in searcher.search_bm25(query, top_k=10)]
+    assert len(ranked) > len(primary)
+    assert set(ranked[:len(primary)]) == primary
+
+
+def test_lexical_features_off_by_default():
+    assert settings.PHRASE_BOOST == 0
+    assert settings.NGRAM_FALLBACK_MIN_HITS == 0
+
+
+def test_phrase_boost_off_keeps_bm25_order():
+    """구문 가산을 쓰지 않으면 같은 용어 문서는 동점 (문서 순서)"""
+    results = _small_searcher().search_bm25("ICP CVD", top_k=5)
+    assert [(r["id"], r["bm25_score"]) for r in results] == [("B", 1.0), ("A", 1.0)]
+
+
+def test_phrase_boost_on_ranks_adjacent_terms_first(monkeypatch):
+    """질의 용어가 같은 순서로 붙어 있는 문서가 앞으로"""
+    monkeypatch.setattr(settings, "PHRASE_BOOST", 0.5)
+    results = _small_searcher().search_bm25("ICP CVD", top_k=5)
+    assert [r["id"] for r in results] == ["A", "B"]
+    assert results[0]["bm25_score"] == 1.0 > results[1]["bm25_score"]
+
+
+def test_ngram_fallback_off_returns_nothing_for_split_compound():
+    assert _small_searcher().search_bm25("급속 열처리", top_k=5) == []
+
+
+def test_ngram_fallback_on_finds_split_compound(monkeypatch):
+    """띄어쓰기가 다른 복합명사 (급속 열처리 -> 급속열처리)"""
+    monkeypatch.setattr(settings, "NGRAM_FALLBACK_MIN_HITS", 3)
+    results = _small_searcher().search_bm25("급속 열처리", top_k=5)
+    assert [r["id"] for r in results] == ["C"]
+
+
+@pytest.mark.parametrize("fusion", ["weighted", "rrf", "zscore"])
+def test_duplicate_vector_hits_use_first_hit(fusion):
+    """벡터 결과에 같은 장비가 여러 번 있으면 첫 항목의 점수 / 순위 / 필드만 사용"""
+    searcher = _small_searcher()
+    vector_results = [
+        {"equipment_id": "F1", "score": 0.9, "name": "first"},
+        {"equipment_id": "F2", "score": 0.8},
+        {"equipment_id": "F1", "score": 0.1, "name": "duplicate"},
+    ]
+    deduplicated = [vector_results[0], vector_results[1]]
+    results = searcher.hybrid_search("스퍼터", vector_results, top_k=5, fusion=fusion)
+    expected = searcher.hybrid_search("스퍼터", deduplicated, top_k=5, fusion=fusion)
+
+    assert results == expected
+    first = next(r for r in results if r["equipment_id"] == "F1")
+    assert first["name"] == "first" and first["vector_score"] == 0.9
+
+
+SNAPSHOT_FILTERS = [
+    {"category": "증착"},
+    {"institution": "나노종합", "temp_min": 300},
+    {"materials": ["GaN"], "wafer_sizes": ["6 inch", "8 inch"]},
+    {"temp_max": 100},
+]
+
+
+def _candidates(searcher, filters):
+    snap = searcher.snapshot
+    return sorted(snap.doc_ids[row] for row in np.flatnonzero(snap.attributes.mask(normalize_filters(filters))))
+
+
+def test_snapshot_maps_attribute_index(tmp_path, documents, monkeypatch):
+    """로드한 속성 인덱스는 메모리 매핑 (메타데이터 디코딩 없음), 이후 증분 갱신도 재구축과 같은 결과"""
+    built = HybridSearcher()
+    built.initialize(documents)
+    built.delete_documents([documents[3]["id"]])
+    path = tmp_path / "lexical_index.bin"
+    built.save_snapshot(path, "hash")
+
+    def no_decode(self, doc_id):
+        raise AssertionError("metadata decoded while loading the snapshot")
+
+    loaded = HybridSearcher()
+    with monkeypatch.context() as m:
+        m.setattr(SnapshotMetadata, "__getitem__", no_decode)
+        assert loaded.load_snapshot(path, "hash")
+    attributes = loaded.snapshot.attributes
+    assert all(isinstance(bitmap, np.memmap) for bitmap in attributes._bitmaps.values())
+    assert attributes.num_live == len(documents) - 1
+    for filters in SNAPSHOT_FILTERS:
+        assert _candidates(loaded, filters) == _candidates(built, filters) != []
+
+    update = [{**documents[10], "metadata": {**documents[10]["metadata"], "category": "증착"}}]
+    for searcher in (built, loaded):
+        searcher.upsert_documents(update)
+        searcher.delete_documents([documents[20]["id"]])
+    removed = {documents[i]["id"] for i in (3, 10, 20)}
+    rebuilt = HybridSearcher()
+    rebuilt.initialize([doc for doc in documents if doc["id"] not in removed] + update)
+    for filters in SNAPSHOT_FILTERS:
+        assert _candidates(loaded, filters) == _candidates(built, filters) == _candidates(rebuilt, filters)
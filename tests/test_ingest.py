@@ -0,0 +1,69 @@
+"""
+대량 적재 테스트 - JSON 배열 증분 디코딩, 검증 프로세스 풀 사용 여부와 무관한 적재 결과
+"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.config import settings  # noqa: E402
+from app.embedding_cache import DocumentEmbeddingStore  # noqa: E402
+from app.ingest import _iter_json_array, ingest_file, iter_records  # noqa: E402
+from app.rag import NumpyVectorStore, rag_pipeline  # noqa: E402
+from app.records import EquipmentRecordStore  # noqa: E402
+
+
+def _embed(texts):
+    return [np.random.default_rng(sum(map(ord, text))).normal(size=8).tolist() for text in texts]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_chars", [1, 7, 1 << 16])
+def test_json_array_streams_elements(equipments, indent, chunk_chars):
+    values = equipments[:20] + [123, "문자열", [], {}]
+    text = json.dumps(values, ensure_ascii=False, indent=indent)
+    assert list(_iter_json_array(io.StringIO(text), chunk_chars)) == values
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1, 2", "[1 2]", '[{"a": ', "", "[1,]"])
+def test_json_array_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO(text), 2))
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_PATH", str(tmp_path / "lexical_index.bin"))
+    monkeypatch.setattr(rag_pipeline, "vector_store", NumpyVectorStore(tmp_path / "vectors.bin"))
+    monkeypatch.setattr(rag_pipeline, "embedding_fn", _embed)
+    monkeypatch.setattr(rag_pipeline, "embedding_store", DocumentEmbeddingStore(tmp_path / "embeddings.db"))
+    monkeypatch.setattr(rag_pipeline, "records", EquipmentRecordStore())
+    monkeypatch.setattr(rag_pipeline, "_catalog_sum", 0)
+    monkeypatch.setattr(rag_pipeline, "_initialized", True)
+    return rag_pipeline
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+@pytest.mark.parametrize("validation_workers", [0, 1])
+def test_ingest_file(tmp_path, pipeline, equipments, suffix, validation_workers):
+    rows = equipments + [{"equipment_id": "BAD"}, {**equipments[0], "name": "마지막 레코드"}]
+    path = tmp_path / f"catalog{suffix}"
+    with open(path, "w", encoding="utf-8") as f:
+        if suffix == ".jsonl":
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        else:
+            json.dump(rows, f, ensure_ascii=False)
+    assert list(iter_records(str(path))) == rows
+
+    stats = ingest_file(
+        str(path), chunk_size=10, validation_workers=validation_workers, embedding_workers=0, progress=None
+    )
+    assert (stats["read"], stats["valid"], stats["invalid"]) == (len(rows), len(rows) - 1, 1)
+    assert pipeline.vector_store.count() == len(equipments)
+    # 같은 ID는 읽은 순서상 마지막 레코드 유지
+    stored = pipeline.vector_store.get(ids=[equipments[0]["equipment_id"]])
+    assert stored["metadatas"][0]["name"] == "마지막 레코드"
@@ -0,0 +1,55 @@
+"""
+ONNX 임베딩 검증 테스트 - export_onnx_embedding.py compare 합격 기준 (MIN_COSINE / MAX_RECALL_DROP)
+
+변환된 모델(ONNX_MODEL_DIR)과 onnxruntime이 있을 때만 실제 비교 실행
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.config import settings  # noqa: E402
+from app.embeddings import ONNX_MODEL_FILE, ONNX_QUANTIZED_FILE  # noqa: E402
+import export_onnx_embedding as onnx_export  # noqa: E402
+
+
+def _results(cos=1.0, recall=0.8, reference_recall=0.8):
+    onnx = {"doc_cos_min": cos, "query_cos_min": cos, "recall@1": recall, "recall@3": recall}
+    return {
+        "torch-fp32": {"recall@1": reference_recall, "recall@3": reference_recall},
+        "onnx-fp32": dict(onnx),
+        "onnx-int8": dict(onnx),
+    }
+
+
+def test_check_thresholds():
+    assert onnx_export.check(_results()) == []
+    assert onnx_export.check(_results(recall=0.8 - onnx_export.MAX_RECALL_DROP)) == []
+    assert len(onnx_export.check(_results(recall=0.8 - onnx_export.MAX_RECALL_DROP - 0.01))) == 4
+
+    results = _results()
+    results["onnx-int8"]["query_cos_min"] = onnx_export.MIN_COSINE["onnx-int8"] - 0.001
+    assert onnx_export.check(results) == [
+        f"onnx-int8 query_cos_min {results['onnx-int8']['query_cos_min']:.4f} < {onnx_export.MIN_COSINE['onnx-int8']}"
+    ]
+
+
+@pytest.fixture(scope="module")
+def compared():
+    pytest.importorskip("onnxruntime")
+    model_dir = Path(settings.ONNX_MODEL_DIR)
+    if not all((model_dir / name).exists() for name in (ONNX_MODEL_FILE, ONNX_QUANTIZED_FILE)):
+        pytest.skip(f"ONNX 모델 없음 ({model_dir}, export_onnx_embedding.py export로 생성)")
+    return onnx_export.compare(model_dir)
+
+
+@pytest.mark.parametrize("backend", sorted(onnx_export.MIN_COSINE))
+def test_onnx_matches_reference(compared, backend):
+    reference, result = compared["torch-fp32"], compared[backend]
+    min_cosine = onnx_export.MIN_COSINE[backend]
+    assert result["doc_cos_min"] >= min_cosine
+    assert result["query_cos_min"] >= min_cosine
+    for key in ("recall@1", "recall@3"):
+        assert result[key] >= reference[key] - onnx_export.MAX_RECALL_DROP
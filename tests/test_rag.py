@@ -0,0 +1,181 @@
+"""
+RAGPipeline 테스트 - NumpyVectorStore + 결정적 임베딩으로 초기화 / 삭제 / 하이브리드 검색 상태 확인
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.config import settings  # noqa: E402
+from app.hybrid_search import hybrid_searcher  # noqa: E402
+from app.rag import _HASH_MOD, NumpyVectorStore, RAGPipeline, content_hash  # noqa: E402
+from app.records import EquipmentRecordStore  # noqa: E402
+
+DIM = 8
+
+
+def _embed(texts):
+    """텍스트별 고정 난수 벡터 (같은 텍스트 -> 같은 벡터)"""
+    return [np.random.default_rng(sum(map(ord, text))).normal(size=DIM).tolist() for text in texts]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_PATH", str(tmp_path / "lexical_index.bin"))
+    monkeypatch.setattr(settings, "PERSIST_DELAY", 0)
+    pipeline = RAGPipeline()
+    pipeline.embedding_fn = _embed
+    pipeline.vector_store = NumpyVectorStore(tmp_path / "vectors.bin")
+    pipeline._catalog_sum = 0
+    pipeline._write_catalog_state(pipeline.catalog_hash)  # 빈 카탈로그 (해시 확인됨)
+    pipeline._initialized = True
+    return pipeline
+
+
+def _upsert(pipeline, documents):
+    ids = [doc["id"] for doc in documents]
+    texts = [doc["text"] for doc in documents]
+    metadatas = [
+        {**doc["metadata"], "content_hash": content_hash(doc["id"], doc["text"], doc["metadata"])}
+        for doc in documents
+    ]
+    pipeline.upsert_records(ids, texts, metadatas, _embed(texts))
+
+
+def test_clear_leaves_hybrid_search_initialized(pipeline, documents, monkeypatch):
+    """clear() 후 검색마다 BM25 인덱스를 다시 초기화하지 않음"""
+    _upsert(pipeline, documents[:20])
+    pipeline.initialize_hybrid_search()
+    pipeline.clear()
+
+    def reinitialize():
+        raise AssertionError("initialize_hybrid_search called after clear()")
+
+    monkeypatch.setattr(pipeline, "initialize_hybrid_search", reinitialize)
+    assert pipeline.hybrid_search("증착 장비", top_k=5) == []
+    assert pipeline.hybrid_search("식각", top_k=5) == []
+
+    # 이후 추가는 증분 반영
+    _upsert(pipeline, documents[:3])
+    assert {hit["equipment_id"] for hit in pipeline.hybrid_search(documents[0]["text"], top_k=3)} == {
+        doc["id"] for doc in documents[:3]
+    }
+
+
+def test_empty_catalog_initializes_once(pipeline, monkeypatch):
+    calls = []
+    load = hybrid_searcher.load_snapshot
+    monkeypatch.setattr(hybrid_searcher, "load_snapshot", lambda *args: calls.append(args) or load(*args))
+
+    pipeline.hybrid_search("증착 장비", top_k=5)
+    pipeline.hybrid_search("식각", top_k=5)
+    assert pipeline._hybrid_initialized and len(calls) == 1
+
+
+def test_snapshot_startup_parses_records_lazily(pipeline, documents, monkeypatch):
+    """스냅샷으로 시작하면 벡터 저장소 전체 조회 / 레코드 파싱 없이 필터 계획까지 가능"""
+    _upsert(pipeline, documents[:40])
+    pipeline.initialize_hybrid_search()
+
+    # 재시작 (레코드 / 속성 인덱스 없이 스냅샷에서 다시 로드)
+    pipeline._hybrid_initialized = False
+    pipeline.records = EquipmentRecordStore()
+    pipeline.filter_planner = type(pipeline.filter_planner)()
+    monkeypatch.setattr(pipeline.vector_store, "get", lambda *args, **kwargs: pytest.fail("full fetch"))
+    pipeline.initialize_hybrid_search()
+    assert len(pipeline.records) == 40
+    assert all(record is None for record in pipeline.records._records.values())
+
+    category = documents[0]["metadata"]["category"]
+    expected = [doc["id"] for doc in documents[:40] if doc["metadata"]["category"] == category]
+    plan = pipeline.filter_planner.plan({"category": category}, 5, pipeline.records, ("category",))
+    assert plan.strategy == "exact" and plan.candidate_ids == expected
+    assert all(record is None for record in pipeline.records._records.values())
+
+    # 검색 결과 레코드만 파싱
+    results = pipeline.hybrid_search(documents[0]["text"], top_k=3, filters={"category": category})
+    assert results and all(result["category"] == category for result in results)
+    parsed = [eq_id for eq_id, record in pipeline.records._records.items() if record is not None]
+    assert 0 < len(parsed) < 40
+    assert pipeline.records.get(expected[-1]).category == category
+
+
+def _recomputed_hash(pipeline):
+    """저장소 전체 레코드 해시로 다시 계산한 카탈로그 해시"""
+    stored = pipeline.vector_store.get()
+    total = sum(int(metadata["content_hash"], 16) for metadata in stored["metadatas"]) % _HASH_MOD
+    return f"{total:016x}"
+
+
+def test_catalog_state_written_once_per_flush(pipeline, documents, monkeypatch):
+    monkeypatch.setattr(settings, "PERSIST_DELAY", 3600)
+    writes = []
+    write = pipeline._write_catalog_state
+
+    def spy(stored):
+        if stored != pipeline._stored_catalog_hash:
+            writes.append(stored)
+        write(stored)
+
+    monkeypatch.setattr(pipeline, "_write_catalog_state", spy)
+    for start in range(0, 30, 10):
+        _upsert(pipeline, documents[start:start + 10])
+    pipeline.delete_equipments([documents[0]["id"]])
+    assert writes == [None]
+
+    pipeline.flush()
+    assert writes == [None, _recomputed_hash(pipeline)]
+    assert pipeline.catalog_hash == _recomputed_hash(pipeline)
+    with open(pipeline._catalog_state_path(), encoding="utf-8") as f:
+        assert json.load(f)["catalog_hash"] == pipeline.catalog_hash
+
+
+def test_concurrent_writes_keep_catalog_hash(pipeline, documents):
+    batches = [documents[i:i + 7] for i in range(0, 60, 5)]  # 겹치는 배치
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda batch: _upsert(pipeline, batch), batches))
+        list(pool.map(lambda i: pipeline.delete_equipments([documents[i]["id"]]), range(0, 60, 9)))
+    assert pipeline.catalog_hash == _recomputed_hash(pipeline)
+
+
+RESULT_KEYS = {
+    "equipment_id", "name", "name_en", "category", "part", "wafer_sizes", "materials", "temp_min", "temp_max",
+    "institution", "location", "description", "tags", "reservation_url", "score",
+}
+
+
+def _assert_plain_results(results, keys):
+    assert results
+    for result in results:
+        assert type(result) is dict and set(result) == keys
+        for key in ("wafer_sizes", "materials", "tags"):
+            assert type(result[key]) is list and all(isinstance(v, str) for v in result[key])
+    json.dumps(results, ensure_ascii=False)
+
+
+def test_search_returns_plain_dicts(pipeline, documents, equipments):
+    _upsert(pipeline, documents[:20])
+    pipeline.initialize_hybrid_search()
+    hybrid_keys = RESULT_KEYS | {"hybrid_score", "vector_score", "bm25_score"}
+
+    results = pipeline.search("증착 장비", top_k=5)
+    _assert_plain_results(results, RESULT_KEYS)
+    by_id = {eq["equipment_id"]: eq for eq in equipments}
+    for result in results:
+        assert result["materials"] == by_id[result["equipment_id"]]["materials"]
+
+    for results in pipeline.search_many(["증착 장비", "식각"], top_k=5):
+        _assert_plain_results(results, RESULT_KEYS)
+    _assert_plain_results(pipeline.hybrid_search("증착 장비", top_k=5), hybrid_keys)
+    for results in pipeline.hybrid_search_many(["증착 장비", "식각"], top_k=5):
+        _assert_plain_results(results, hybrid_keys)
+
+    # 필터 / 리랭킹용 결과는 레코드 참조 (공유 레코드는 변경되지 않음)
+    hits = pipeline.hybrid_search_hits("증착 장비", top_k=5)
+    hits[0]["score"] = -1.0
+    assert hits[0].record is pipeline.records.get(hits[0]["equipment_id"])
+    assert pipeline.hybrid_search_hits("증착 장비", top_k=5)[0]["score"] != -1.0
@@ -0,0 +1,65 @@
+"""
+NumpyVectorStore 테스트 - 추가 / 갱신 / 삭제 / 압축 후 전수 계산 결과와 비교, flush 후 재로드
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.rag import NumpyVectorStore  # noqa: E402
+
+CATEGORIES = ["증착", "식각", "열처리"]
+
+
+def _brute_force(reference, query, top_k, category=None):
+    query = query / np.linalg.norm(query)
+    scored = [
+        (max(0.0, float(vector @ query)), doc_id)
+        for doc_id, (vector, metadata) in reference.items()
+        if category is None or metadata["category"] == category
+    ]
+    return [round(score, 5) for score, _ in sorted(scored, reverse=True)[:top_k]]
+
+
+def test_random_writes_match_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    rand = random.Random(0)
+    store = NumpyVectorStore(tmp_path / "vectors.bin")
+    store.COMPACT_MIN_DELETED = 32
+    reference = {}
+
+    for step in range(200):
+        if rand.random() < 0.7:
+            ids = [f"EQ{rand.randrange(300)}" for _ in range(rand.randrange(1, 10))]
+            vectors = rng.normal(size=(len(ids), 8)).astype(np.float32)
+            metadatas = [{"category": rand.choice(CATEGORIES)} for _ in ids]
+            store.upsert(ids, [f"doc {i}" for i in ids], metadatas, vectors)
+            for doc_id, vector, metadata in zip(ids, vectors, metadatas):
+                reference[doc_id] = (vector / np.linalg.norm(vector), metadata)
+        else:
+            ids = rand.sample(sorted(reference), min(len(reference), rand.randrange(1, 12)))
+            store.delete(ids + ["missing"])
+            for doc_id in ids:
+                reference.pop(doc_id)
+
+        assert store.count() == len(reference)
+        if step % 20 == 0:
+            query = rng.normal(size=8).astype(np.float32)
+            hits = store.query(query, 5)
+            assert [round(h[2], 5) for h in hits] == _brute_force(reference, query, 5)
+            hits = store.query(query, 5, {"category": ("식각",)})
+            assert [round(h[2], 5) for h in hits] == _brute_force(reference, query, 5, "식각")
+            assert all(h[1]["category"] == "식각" for h in hits)
+
+    assert store.dirty
+    store.flush()
+    assert not store.dirty
+
+    reloaded = NumpyVectorStore(tmp_path / "vectors.bin")
+    assert sorted(reloaded.get()["ids"]) == sorted(reference)
+    # 메모리 매핑된 행렬에도 추가 가능
+    reloaded.upsert(["NEW"], ["new"], [{"category": "식각"}], rng.normal(size=(1, 8)))
+    assert reloaded.count() == len(reference) + 1